@@ -0,0 +1,20 @@
+"""Shared fixtures for the pytest-benchmark suite."""
+
+import pytest
+
+
+class NullLog:
+    """Stands in for the RichLog widget, so only handler work is timed."""
+
+    border_title = ""
+
+    def write(self, text, scroll_end=None) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+@pytest.fixture
+def null_log() -> NullLog:
+    return NullLog()
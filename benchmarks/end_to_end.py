@@ -0,0 +1,133 @@
+"""
+End-to-end timings of InteractiveCats commands against the fixture server.
+
+Starts the stand-in catalogue server, mounts the app headlessly and drives
+it through Textual's Pilot. Each command is typed into the input and timed
+until it, and any background work it started (e.g. connection warm-up),
+has finished and the screen has refreshed. Every HTTP request goes to the
+fixture server, so results don't depend on the network.
+
+The first run starts from an empty cache directory; later runs reuse it
+and show the effect of the listing and dataset caches.
+
+Usage:
+    python -m benchmarks.end_to_end [--latency 0.05] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+
+from typing import Iterator, List
+
+from benchmarks.fixture_server import FixtureConfig, FixtureServer, redirect_requests
+
+
+DEFAULT_SCRIPT = [
+    "connect london-datastore",
+    "list packages",
+    "list orgs",
+    "search transport 50",
+    "package info dataset-00001",
+    "load dataset-00001 csv",
+    "sql SELECT area, count(*) FROM dataset_00001 GROUP BY area",
+    "connect paris",
+    "list datasets",
+    "dataset info dataset-00002",
+    "load dataset-00002 csv",
+    "connect french-gov",
+    "list datasets",
+    "dataset meta dataset-00003",
+    "search --all crime 20",
+]
+
+
+async def drive(commands: List[str]) -> List[float]:
+    """Run commands one after another in a mounted app, returning seconds each."""
+    from textual.widgets import Input
+
+    from herding_cats_interactive.app.interactive_cats import InteractiveCats
+
+    app = InteractiveCats()
+    timings = []
+    async with app.run_test(size=(160, 50)) as pilot:
+        command_input = app.query_one(Input)
+        for command in commands:
+            # Loading a dataset moves focus to the table
+            command_input.focus()
+            command_input.value = command
+            start = time.perf_counter()
+            await pilot.press("enter")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+@contextlib.contextmanager
+def temporary_cache_dir() -> Iterator[str]:
+    """
+    Point the app's caches at a fresh directory, removing it afterwards and
+    restoring the previous setting.
+    """
+    previous = os.environ.get("HERDING_CATS_CACHE_DIR")
+    with tempfile.TemporaryDirectory(prefix="hc-bench-") as cache_dir:
+        os.environ["HERDING_CATS_CACHE_DIR"] = cache_dir
+        try:
+            yield cache_dir
+        finally:
+            if previous is None:
+                del os.environ["HERDING_CATS_CACHE_DIR"]
+            else:
+                os.environ["HERDING_CATS_CACHE_DIR"] = previous
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--datasets", type=int, default=FixtureConfig.datasets)
+    parser.add_argument("--page-size", type=int, default=FixtureConfig.max_page_size)
+    parser.add_argument("--csv-rows", type=int, default=FixtureConfig.csv_rows)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--script", help="File of commands, one per line")
+    args = parser.parse_args()
+
+    config = FixtureConfig(
+        latency=args.latency,
+        datasets=args.datasets,
+        max_page_size=args.page_size,
+        csv_rows=args.csv_rows,
+    )
+    # The cache directory must be set before the app's caches are imported
+    with temporary_cache_dir():
+        commands = DEFAULT_SCRIPT
+        if args.script:
+            from herding_cats_interactive.app.headless import read_commands
+
+            with open(args.script) as script:
+                commands = read_commands(script)
+
+        with FixtureServer(config) as server, redirect_requests(server.url):
+            runs = [asyncio.run(drive(commands)) for _ in range(args.runs)]
+
+    print(
+        f"{len(commands)} commands, {args.datasets} datasets, "
+        f"{args.latency * 1000:.0f} ms latency, {args.runs} runs\n"
+    )
+    print(f"{'command':<60} {'cold ms':>10} {'warm ms':>10}")
+    for index, command in enumerate(commands):
+        cold = runs[0][index] * 1000
+        warm = [run[index] * 1000 for run in runs[1:]]
+        warm_text = f"{statistics.median(warm):10.1f}" if warm else f"{'-':>10}"
+        print(f"{command[:60]:<60} {cold:10.1f} {warm_text}")
+    totals = [sum(run) * 1000 for run in runs]
+    warm_total = f"{statistics.median(totals[1:]):10.1f}" if totals[1:] else ""
+    print(f"{'total':<60} {totals[0]:10.1f} {warm_total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""
+Local stand-in for the CKAN, OpenDataSoft and data.gouv.fr APIs.
+
+Serves generated catalogues from a background thread so end-to-end runs
+are reproducible and work offline. Latency, page size limits and payload
+sizes are configurable. redirect_requests() sends every outgoing requests
+call to the server, so the app and HerdingCats are used unchanged with
+their real catalogue URLs.
+
+Usage:
+    python -m benchmarks.fixture_server [--port 8765] [--latency 0.05]
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import re
+import threading
+import time
+
+from dataclasses import dataclass
+from functools import cached_property
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+TOPICS = ("transport", "crime", "housing", "energy", "air quality", "schools")
+
+
+@dataclass
+class FixtureConfig:
+    """Shape of the generated catalogues and how the server responds."""
+
+    # Seconds added to every response
+    latency: float = 0.0
+    datasets: int = 2_000
+    organisations: int = 50
+    # Largest page any listing or search returns, whatever was asked for
+    max_page_size: int = 1_000
+    resources: int = 3
+    description_bytes: int = 500
+    csv_rows: int = 10_000
+    csv_columns: int = 8
+
+
+class FixtureCatalogue:
+    """Generated datasets shared by every emulated API."""
+
+    def __init__(self, config: FixtureConfig):
+        self.config = config
+        self.datasets = [self._dataset(i) for i in range(config.datasets)]
+        self.by_id = {dataset["id"]: dataset for dataset in self.datasets}
+
+    def _dataset(self, i: int) -> Dict[str, Any]:
+        topic = TOPICS[i % len(TOPICS)]
+        organisation = i % self.config.organisations
+        return {
+            "id": f"dataset-{i:05d}",
+            "title": f"{topic.title()} statistics {i}",
+            "description": (f"Figures on {topic}. " * self.config.description_bytes)[
+                : self.config.description_bytes
+            ],
+            "tags": [topic, f"area-{i % 14}", "open-data"],
+            "organisation": f"organisation-{organisation:03d}",
+        }
+
+    def matching(self, query: str) -> List[Dict[str, Any]]:
+        """Datasets whose title or tags contain every query term."""
+        terms = query.lower().split()
+        return [
+            dataset
+            for dataset in self.datasets
+            if all(
+                term in dataset["title"].lower() or term in dataset["tags"]
+                for term in terms
+            )
+        ]
+
+    def page(self, datasets: List, offset: int, size: int) -> List:
+        return datasets[offset : offset + min(size, self.config.max_page_size)]
+
+    @cached_property
+    def csv(self) -> bytes:
+        """Body of every CSV resource."""
+        return self._write_csv(",")
+
+    @cached_property
+    def export_csv(self) -> bytes:
+        """Body of every OpenDataSoft CSV export, which is semicolon separated."""
+        return self._write_csv(";")
+
+    def _write_csv(self, delimiter: str) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=delimiter)
+        columns = self.config.csv_columns
+        writer.writerow(
+            ["id", "area", "value", *(f"col_{j}" for j in range(3, columns))]
+        )
+        for row in range(self.config.csv_rows):
+            writer.writerow(
+                [
+                    row,
+                    f"Area {row % 33}",
+                    row * 0.5,
+                    *(f"value-{row % 97}-{j}" for j in range(3, columns)),
+                ]
+            )
+        return buffer.getvalue().encode("utf-8")
+
+    @cached_property
+    def records(self) -> bytes:
+        """Body of every JSON export, the CSV rows as records."""
+        rows = csv.DictReader(io.StringIO(self.csv.decode("utf-8")))
+        return json.dumps(list(rows)).encode("utf-8")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Routes requests to the emulated catalogue APIs."""
+
+    server: "FixtureServer"
+
+    def log_message(self, format: str, *args) -> None:
+        # Keep benchmark output clean
+        pass
+
+    @property
+    def catalogue(self) -> FixtureCatalogue:
+        return self.server.catalogue
+
+    def _resource_url(self, path: str) -> str:
+        return f"{self.server.url}{path}"
+
+    def _ckan(self, dataset: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": dataset["id"],
+            "name": dataset["id"],
+            "title": dataset["title"],
+            "notes": dataset["description"],
+            "tags": [{"name": tag, "display_name": tag} for tag in dataset["tags"]],
+            "organization": {
+                "name": dataset["organisation"],
+                "title": dataset["organisation"].replace("-", " ").title(),
+            },
+            "metadata_modified": "2024-01-01T00:00:00",
+            "resources": [
+                {
+                    "id": f"{dataset['id']}-{j}",
+                    "name": f"{dataset['title']} part {j}",
+                    "format": "CSV",
+                    "url": self._resource_url(f"/files/{dataset['id']}-{j}.csv"),
+                    "last_modified": "2024-01-01T00:00:00",
+                }
+                for j in range(self.catalogue.config.resources)
+            ],
+        }
+
+    def _opendatasoft(self, dataset: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "dataset_id": dataset["id"],
+            "has_records": True,
+            "features": ["analyze"],
+            "metas": {
+                "default": {
+                    "title": dataset["title"],
+                    "description": dataset["description"],
+                    "keyword": dataset["tags"],
+                    "publisher": dataset["organisation"],
+                    "modified": "2024-01-01T00:00:00+00:00",
+                    "records_count": self.catalogue.config.csv_rows,
+                }
+            },
+            "fields": [
+                {"name": f"col_{j}", "type": "text", "label": f"Column {j}"}
+                for j in range(self.catalogue.config.csv_columns)
+            ],
+        }
+
+    def _french_gov(self, dataset: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": dataset["id"],
+            "slug": dataset["id"],
+            "title": dataset["title"],
+            "description": dataset["description"],
+            "tags": dataset["tags"],
+            "organization": {
+                "id": dataset["organisation"],
+                "name": dataset["organisation"],
+            },
+            "last_modified": "2024-01-01T00:00:00",
+            "resources": [
+                {
+                    "id": f"{dataset['id']}-{j}",
+                    "title": f"{dataset['title']} part {j}",
+                    "format": "csv",
+                    "url": self._resource_url(f"/files/{dataset['id']}-{j}.csv"),
+                }
+                for j in range(self.catalogue.config.resources)
+            ],
+        }
+
+    def _route(self, path: str, query: Dict[str, str]) -> Optional[Tuple[str, Any]]:
+        """Content type and body for a request, or None when not found."""
+        catalogue = self.catalogue
+        datasets = catalogue.datasets
+
+        def number(name: str, default: int) -> int:
+            return int(query.get(name, default))
+
+        # Resources
+        if path.startswith("/files/"):
+            return "text/csv", catalogue.csv
+
+        # CKAN
+        if path == "/api/3/action/package_list":
+            return "json", {"success": True, "result": [d["id"] for d in datasets]}
+        if path == "/api/3/action/organization_list":
+            organisations = sorted({d["organisation"] for d in datasets})
+            return "json", {"success": True, "result": organisations}
+        if path == "/api/3/action/package_show":
+            dataset = catalogue.by_id.get(query.get("id", ""))
+            if dataset is None:
+                return None
+            return "json", {"success": True, "result": self._ckan(dataset)}
+        if path == "/api/3/action/package_search":
+            found = catalogue.matching(query.get("q", ""))
+            page = catalogue.page(found, number("start", 0), number("rows", 10))
+            return "json", {
+                "success": True,
+                "result": {
+                    "count": len(found),
+                    "results": [self._ckan(d) for d in page],
+                },
+            }
+
+        # OpenDataSoft
+        ods = re.fullmatch(
+            r"/api/explore/v2\.1/catalog/datasets(?:/([^/]+)(/exports(?:/(\w+))?)?)?/?",
+            path,
+        )
+        if ods:
+            dataset_id, exports, export_format = ods.groups()
+            if dataset_id is None:
+                search = re.search(r'search\("(.*)"\)', query.get("where", ""))
+                found = catalogue.matching(search.group(1) if search else "")
+                page = catalogue.page(found, number("offset", 0), number("limit", 10))
+                return "json", {
+                    "total_count": len(found),
+                    "results": [self._opendatasoft(d) for d in page],
+                }
+            if dataset_id not in catalogue.by_id:
+                return None
+            if export_format == "csv":
+                return "text/csv", catalogue.export_csv
+            if export_format == "json":
+                return "json", catalogue.records
+            if exports:
+                exports_url = f"{self.server.url}{path.rstrip('/')}"
+                return "json", {
+                    "links": [
+                        {"rel": fmt, "href": f"{exports_url}/{fmt}"}
+                        for fmt in ("csv", "json")
+                    ]
+                }
+            return "json", self._opendatasoft(catalogue.by_id[dataset_id])
+
+        # data.gouv.fr
+        french = re.fullmatch(r"/api/1/(datasets|organizations)/(?:([^/]+)/)?", path)
+        if french:
+            kind, dataset_id = french.groups()
+            if kind == "organizations":
+                organisations = sorted({d["organisation"] for d in datasets})
+                items: List = [{"id": o, "name": o} for o in organisations]
+            elif dataset_id is not None:
+                dataset = catalogue.by_id.get(dataset_id)
+                return ("json", self._french_gov(dataset)) if dataset else None
+            else:
+                items = catalogue.matching(query.get("q", ""))
+            # Pages are never larger than the server's cap, whatever was asked
+            page_size = min(number("page_size", 20), catalogue.config.max_page_size)
+            current = number("page", 1)
+            page = catalogue.page(items, (current - 1) * page_size, page_size)
+            if kind == "datasets":
+                page = [self._french_gov(d) for d in page]
+            more = current * page_size < len(items)
+            next_page = f"{self.server.url}{path}?page={current + 1}" if more else None
+            return "json", {
+                "data": page,
+                "total": len(items),
+                "page": current,
+                "page_size": page_size,
+                "next_page": next_page,
+            }
+        return None
+
+    def _respond(self, send_body: bool) -> None:
+        time.sleep(self.catalogue.config.latency)
+        parts = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        routed = self._route(parts.path, query)
+        if routed is None:
+            content_type = "application/json"
+            body = json.dumps({"success": False, "error": "Not found"}).encode()
+            self.send_response(404)
+        else:
+            content_type, content = routed
+            if content_type == "json":
+                content_type = "application/json"
+                if not isinstance(content, bytes):
+                    content = json.dumps(content).encode("utf-8")
+            body = content
+            self.send_response(200)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self._respond(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._respond(send_body=False)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    The stand-in catalogue server, run on a background thread.
+
+    Usable as a context manager, which starts and stops it.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        config: Optional[FixtureConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        super().__init__((host, port), FixtureHandler)
+        self.catalogue = FixtureCatalogue(config or FixtureConfig())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+@contextlib.contextmanager
+def redirect_requests(base_url: str) -> Iterator[None]:
+    """
+    Send every requests call to base_url, keeping its path and query.
+
+    Patches HTTPAdapter.send, which every requests session ends up in, so
+    sessions created inside HerdingCats are covered too.
+    """
+    local = urlsplit(base_url)
+    send = HTTPAdapter.send
+
+    def redirected_send(self, request, *args, **kwargs):
+        parts = urlsplit(request.url)
+        if parts.netloc != local.netloc:
+            request.url = urlunsplit(
+                (local.scheme, local.netloc, parts.path, parts.query, "")
+            )
+        return send(self, request, *args, **kwargs)
+
+    HTTPAdapter.send = redirected_send
+    try:
+        yield
+    finally:
+        HTTPAdapter.send = send
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--datasets", type=int, default=FixtureConfig.datasets)
+    parser.add_argument("--csv-rows", type=int, default=FixtureConfig.csv_rows)
+    args = parser.parse_args()
+    config = FixtureConfig(
+        latency=args.latency, datasets=args.datasets, csv_rows=args.csv_rows
+    )
+    with FixtureServer(config, port=args.port) as server:
+        print(f"Serving fixture catalogues on {server.url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
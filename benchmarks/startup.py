@@ -0,0 +1,109 @@
+"""
+Startup time of the interactive app, checked against a budget.
+
+Imports the app with -X importtime to list the slowest modules, confirms
+that heavy dependencies (HerdingCats, polars, duckdb, ...) stay unimported
+until a command needs them, then measures time-to-first-frame by mounting
+the app headlessly. Exits with status 1 when the budget is exceeded or a
+heavy module is imported at startup, so it can gate CI.
+
+Usage:
+    python -m benchmarks.startup [--budget 1.5] [--top 15]
+
+The budget (seconds to first frame) can also be set with
+HERDING_CATS_STARTUP_BUDGET.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from typing import List, Tuple
+
+
+APP_MODULE = "herding_cats_interactive.app.interactive_cats"
+HEAVY_MODULES = ("HerdingCats", "polars", "duckdb", "pandas", "pyarrow", "boto3")
+DEFAULT_BUDGET = float(os.getenv("HERDING_CATS_STARTUP_BUDGET", 1.5))
+
+# Mounts the app without a terminal and reports timings as JSON
+FIRST_FRAME = f"""
+import json, sys, time
+start = time.perf_counter()
+from {APP_MODULE} import InteractiveCats
+imported = time.perf_counter()
+
+async def main():
+    app = InteractiveCats()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        mounted = time.perf_counter()
+        loaded = sorted(name for name in sys.modules if name.split(".")[0] in {HEAVY_MODULES!r})
+        print(json.dumps({{
+            "import": imported - start,
+            "first_frame": mounted - start,
+            "heavy": loaded,
+        }}))
+
+import asyncio
+asyncio.run(main())
+"""
+
+
+def import_times(top: int) -> List[Tuple[float, str]]:
+    """Cumulative import time (seconds) of the slowest modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    # Lines look like: "import time:   self [us] |  cumulative | package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        times.append((int(cumulative) / 1e6, module.strip()))
+    return sorted(times, reverse=True)[:top]
+
+
+def first_frame() -> dict:
+    """Import and mount the app in a fresh interpreter, returning timings."""
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_FRAME],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"Slowest imports of {APP_MODULE}:")
+    for seconds, module in import_times(args.top):
+        print(f"  {seconds * 1000:8.1f} ms  {module}")
+
+    timings = first_frame()
+    print(f"\nimport         {timings['import'] * 1000:8.1f} ms")
+    print(f"first frame    {timings['first_frame'] * 1000:8.1f} ms")
+    print(f"budget         {args.budget * 1000:8.1f} ms")
+
+    failed = False
+    if timings["heavy"]:
+        print(f"\nHeavy modules imported at startup: {', '.join(timings['heavy'])}")
+        failed = True
+    if timings["first_frame"] > args.budget:
+        print("\nStartup is over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Throughput of ExtendedRichLogHandler.write_structured_data.
+
+Renders synthetic CKAN-style payloads of increasing size: wide package
+lists, wide package_show dictionaries and deeply nested structures.
+
+Usage:
+    python -m benchmarks.structured_data
+"""
+
+import time
+
+from herding_cats_interactive.handlers.rich_log_handler import (
+    ExtendedRichLogHandler,
+)
+
+
+def package_list(size: int) -> list:
+    """A package_list style payload of dataset slugs."""
+    return [f"dataset-number-{i}-of-the-catalogue" for i in range(size)]
+
+
+def package_show(resources: int) -> dict:
+    """A package_show style payload with many resources."""
+    return {
+        "id": "8a7c4e1d-london-crime",
+        "name": "london-crime",
+        "title": "London Crime Statistics",
+        "notes": "Recorded crime by borough. " * 20,
+        "tags": [{"name": f"tag-{i}", "display_name": f"Tag {i}"} for i in range(25)],
+        "organization": {"name": "metropolitan-police", "title": "Met Police"},
+        "resources": [
+            {
+                "id": f"resource-{i}",
+                "format": "CSV",
+                "url": f"https://example.org/datasets/london-crime/{i}.csv",
+                "size": i * 1024,
+                "last_modified": "2024-01-01T00:00:00",
+            }
+            for i in range(resources)
+        ],
+    }
+
+
+def nested(depth: int, width: int = 3) -> dict:
+    """A dictionary nested depth levels deep."""
+    node: dict = {"leaf": "value"}
+    for level in range(depth):
+        node = {f"level-{level}-{i}": node if i == 0 else i for i in range(width)}
+    return node
+
+
+def bench(name: str, data, repeat: int = 3) -> None:
+    handler = ExtendedRichLogHandler(None)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = handler.write_structured_data(data)
+        best = min(best, time.perf_counter() - start)
+    size = len(text.plain)
+    print(
+        f"{name:<28} {size / 1e6:8.2f} MB chars {best * 1000:10.1f} ms "
+        f"{size / best / 1e6:8.1f} M chars/s"
+    )
+
+
+def main() -> None:
+    for size in (1_000, 10_000, 40_000, 100_000):
+        bench(f"package list {size}", package_list(size))
+    for resources in (100, 1_000, 10_000):
+        bench(f"package show {resources}", package_show(resources))
+    for depth in (50, 200, 800):
+        bench(f"nested depth {depth}", nested(depth))
+
+
+if __name__ == "__main__":
+    main()
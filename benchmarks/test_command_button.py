@@ -0,0 +1,32 @@
+"""
+Benchmarks for formatting the command list shown by CommandButton.
+
+Usage:
+    pytest benchmarks/test_command_button.py
+"""
+
+import pytest
+
+from herding_cats_interactive.ui.components.command_button import CommandButton
+from herding_cats_interactive.utils import herding_cats as hc
+
+
+EXPLORERS = {
+    "disconnected": None,
+    "ckan": "CkanCatExplorer",
+    "opendatasoft": "OpenDataSoftCatExplorer",
+    "french-gov": "FrenchGouvCatExplorer",
+}
+
+
+@pytest.mark.parametrize("explorer", EXPLORERS)
+def test_format_commands_list(benchmark, explorer):
+    name = EXPLORERS[explorer]
+    if name:
+        # The explorer classes come from HerdingCats itself
+        pytest.importorskip("HerdingCats")
+    # Only the explorer's type matters, so skip creating a session
+    instance = object.__new__(getattr(hc, name)) if name else None
+    button = CommandButton(instance)
+    text = benchmark(button._format_commands_list)
+    assert "Basic Commands" in text.plain
@@ -0,0 +1,64 @@
+"""
+Benchmarks for populating and scrolling the FrameTable from Polars frames.
+
+Times the work set_frame and render_line do for a loaded dataset: column
+formatting and sizing from the first block, and laying out screens of
+rows. The widget itself is not mounted.
+
+Usage:
+    pytest benchmarks/test_frame_table.py
+"""
+
+import polars as pl
+import pytest
+
+from herding_cats_interactive.ui.components.frame_table import FrameTable
+
+
+SCREEN_ROWS = 50
+
+
+def frame(rows: int) -> pl.DataFrame:
+    """A dataset with the mix of column types catalogues tend to serve."""
+    return pl.DataFrame(
+        {
+            "id": range(rows),
+            "borough": [f"Borough {i % 33}" for i in range(rows)],
+            "category": [f"Category {i % 9}\nwith a line break" for i in range(rows)],
+            "value": [i * 0.5 for i in range(rows)],
+            "count": [None if i % 7 == 0 else i for i in range(rows)],
+            "tags": [[f"tag-{i % 5}", "open-data"] for i in range(rows)],
+        }
+    )
+
+
+def populate(table: FrameTable, df: pl.DataFrame) -> None:
+    """Size the columns and lay out the first screen, as set_frame does."""
+    table._layout(df)
+    for index in range(min(SCREEN_ROWS, df.height)):
+        table._line(str(index), table._row(index))
+
+
+def scroll(table: FrameTable, offsets: list) -> None:
+    """Lay out a screen of rows at each offset, as render_line does."""
+    for offset in offsets:
+        for index in range(offset, min(offset + SCREEN_ROWS, table.frame.height)):
+            table._line(str(index), table._row(index))
+
+
+@pytest.mark.parametrize("rows", [1_000, 100_000, 1_000_000])
+def test_populate(benchmark, rows):
+    table = FrameTable()
+    df = frame(rows)
+    benchmark(populate, table, df)
+    assert table._widths
+
+
+@pytest.mark.parametrize("rows", [100_000, 1_000_000])
+def test_scroll(benchmark, rows):
+    table = FrameTable()
+    df = frame(rows)
+    populate(table, df)
+    # Jumps far apart so most screens need a block formatted
+    offsets = [(i * 7919 * FrameTable.BLOCK_ROWS) % rows for i in range(20)]
+    benchmark(scroll, table, offsets)
@@ -0,0 +1,104 @@
+"""
+Benchmarks for ExtendedRichLogHandler rendering and history navigation.
+
+Usage:
+    pytest benchmarks/test_log_handler.py
+"""
+
+import pytest
+
+from rich.text import Text
+
+from benchmarks.structured_data import nested, package_list, package_show
+from herding_cats_interactive.handlers.rich_log_handler import (
+    ExtendedRichLogHandler,
+)
+
+
+def ods_datasets(size: int) -> list:
+    """An OpenDataSoft catalog/datasets style payload."""
+    return [
+        {
+            "dataset_id": f"dataset-{i}",
+            "has_records": True,
+            "features": ["analyze", "geo", "timeserie"],
+            "metas": {
+                "default": {
+                    "title": f"Substation Load {i}",
+                    "description": "Half-hourly load by substation. " * 5,
+                    "modified": "2024-01-01T00:00:00+00:00",
+                    "records_count": i * 100,
+                    "keyword": ["energy", "network", f"area-{i % 14}"],
+                    "publisher": "UK Power Networks",
+                }
+            },
+            "fields": [
+                {"name": f"field_{j}", "type": "text", "label": f"Field {j}"}
+                for j in range(8)
+            ],
+        }
+        for i in range(size)
+    ]
+
+
+PAYLOADS = {
+    "ckan-package-list-10k": lambda: package_list(10_000),
+    "ckan-package-list-100k": lambda: package_list(100_000),
+    "ckan-package-show-1k": lambda: package_show(1_000),
+    "ods-datasets-100": lambda: ods_datasets(100),
+    "ods-datasets-1k": lambda: ods_datasets(1_000),
+    "nested-depth-200": lambda: nested(200),
+}
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_write_structured_data(benchmark, null_log, payload):
+    handler = ExtendedRichLogHandler(null_log)
+    data = PAYLOADS[payload]()
+    text = benchmark(handler.write_structured_data, data)
+    assert text.plain
+
+
+def test_write_structured_data_crlf(benchmark, null_log):
+    handler = ExtendedRichLogHandler(null_log)
+    # CKAN notes often use Windows line endings
+    crlf = package_show(1_000)
+    crlf["notes"] = "Recorded crime by borough.\r\n" * 20
+    lf = dict(crlf, notes=crlf["notes"].replace("\r\n", "\n"))
+    text = benchmark(handler.write_structured_data, crlf)
+    expected = handler.write_structured_data(lf)
+    assert text.plain == expected.plain
+    assert text.spans == expected.spans
+
+
+def history(null_log, pages: int, budget: int) -> ExtendedRichLogHandler:
+    """A handler with pages of archived command output."""
+    handler = ExtendedRichLogHandler(null_log, history_budget=budget)
+    listing = package_list(200)
+    for page in range(pages):
+        handler.write(Text(f"> list packages {page}\n"))
+        handler.write(handler.write_structured_data(listing))
+        handler.clear()
+    return handler
+
+
+def browse(handler: ExtendedRichLogHandler) -> int:
+    """Step back through every page, then forward to the live page."""
+    steps = 0
+    while handler.show_previous() is not None:
+        steps += 1
+    while handler._viewing is not None:
+        handler.show_next()
+        steps += 1
+    return steps
+
+
+@pytest.mark.parametrize(
+    "pages, budget",
+    [(100, None), (1_000, None), (1_000, 1024 * 1024)],
+    ids=["100-pages", "1k-pages", "1k-pages-spilled"],
+)
+def test_show_previous_next(benchmark, null_log, pages, budget):
+    handler = history(null_log, pages, budget)
+    steps = benchmark(browse, handler)
+    assert steps == 2 * len(handler.history)
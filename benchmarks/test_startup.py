@@ -0,0 +1,15 @@
+"""
+Startup budget of the interactive app: time to first frame and heavy imports.
+
+Usage:
+    pytest benchmarks/test_startup.py
+"""
+
+from benchmarks.startup import DEFAULT_BUDGET, first_frame
+
+
+def test_first_frame(benchmark):
+    # Each round starts a fresh interpreter, so one is enough
+    timings = benchmark.pedantic(first_frame, rounds=1, iterations=1)
+    assert timings["heavy"] == []
+    assert timings["first_frame"] <= DEFAULT_BUDGET
@@ -1,3 +1,10 @@
-from herding_cats_interactive.app.interactive_cats import InteractiveCats
-
 __all__ = ["InteractiveCats"]
+
+
+def __getattr__(name):
+    # Importing the package stays cheap until the app itself is needed
+    if name == "InteractiveCats":
+        from herding_cats_interactive.app.interactive_cats import InteractiveCats
+
+        return InteractiveCats
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
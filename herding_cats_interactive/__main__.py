@@ -1,9 +1,70 @@
+import argparse
+import sys
+
 from herding_cats_interactive.app.interactive_cats import InteractiveCats
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="herding-cats-interactive",
+        description="Interactive shell interface for the HerdingCats library.",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run commands without the UI and print the results as JSON",
+    )
+    parser.add_argument(
+        "script",
+        nargs="?",
+        help="file of commands to run headless, one per line or separated by "
+        "';' (default: read from stdin)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=4,
+        help="maximum commands running at once in headless mode (default: 4)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("ndjson", "json"),
+        default="ndjson",
+        help="ndjson streams a record per command as it finishes, json prints "
+        "one array in script order (default: ndjson)",
+    )
+    parser.add_argument(
+        "--frame-rows",
+        type=int,
+        default=10,
+        help="rows of each loaded or queried dataset to include (default: 10)",
+    )
+    return parser.parse_args(argv)
+
+
 def main():
-    app = InteractiveCats()
-    app.run()
+    args = parse_args()
+    if not args.headless and not args.script:
+        app = InteractiveCats()
+        app.run()
+        return
+
+    from herding_cats_interactive.app.headless import run_headless
+
+    if args.script and args.script != "-":
+        with open(args.script, encoding="utf-8") as script:
+            lines = script.readlines()
+    else:
+        lines = sys.stdin
+    sys.exit(
+        run_headless(
+            lines,
+            sys.stdout,
+            parallel=max(1, args.parallel),
+            output_format=args.format,
+            frame_rows=args.frame_rows,
+        )
+    )
 
 
 if __name__ == "__main__":
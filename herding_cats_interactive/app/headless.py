@@ -0,0 +1,320 @@
+import asyncio
+import json
+import time
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from rich.style import Style
+from rich.text import Text
+
+from herding_cats_interactive.app.interactive_cats import InteractiveCats
+from herding_cats_interactive.handlers.command_scheduler import (
+    ScheduledCommand,
+    current_command,
+)
+from herding_cats_interactive.handlers.history_store import HistoryStore
+from herding_cats_interactive.handlers.input_handler import (
+    InputHandler,
+    runs_alone,
+    waits_for,
+)
+
+
+FRAME_ROWS = 10
+
+
+@dataclass
+class CommandRecord:
+    """Everything one headless command produced."""
+
+    index: int
+    command: str
+    ok: bool = True
+    elapsed: float = 0.0
+    bytes_received: int = 0
+    output: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    data: List[Any] = field(default_factory=list)
+    frames: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class RecordingLog:
+    """
+    Log sink for headless runs.
+
+    Stands in for ExtendedRichLogHandler: each write is recorded against
+    the command running in the current context, plain text for messages
+    and the raw value for structured data, which is never rendered.
+    """
+
+    def __init__(self):
+        self.records: Dict[int, CommandRecord] = {}
+        self.history = HistoryStore()
+        self.has_next_page = False
+
+    def _record(self) -> Optional[CommandRecord]:
+        command = current_command.get()
+        return self.records.get(command.id) if command else None
+
+    def write(self, message, scroll_end: Optional[bool] = None) -> None:
+        """Record a message against the running command."""
+        record = self._record()
+        text = message if isinstance(message, Text) else Text(str(message))
+        plain = text.plain.strip()
+        if record is None or not plain:
+            return
+        record.output.append(plain)
+        if isinstance(text.style, Style) and text.style.color:
+            if text.style.color.name == "red":
+                record.errors.append(plain)
+
+    def write_structured_data(self, data: Any, indent: int = 0) -> Text:
+        """Record structured data as is; nothing is rendered."""
+        record = self._record()
+        if record is not None:
+            record.data.append(data)
+        return Text()
+
+    def write_paginated(self, data: Any, page_size: Optional[int] = None) -> None:
+        """Record a whole listing; there are no pages without a display."""
+        self.write_structured_data(data)
+
+    def write_next_page(self) -> bool:
+        return False
+
+    def discard_listing(self) -> None:
+        pass
+
+    def continue_page(self) -> None:
+        pass
+
+    def finish(self, command: ScheduledCommand) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class FrameRecorder:
+    """Stands in for the FrameTable, recording a summary of each frame shown."""
+
+    def __init__(self, log: RecordingLog, rows: int = FRAME_ROWS):
+        self.log = log
+        self.rows = rows
+
+    def set_frame(self, frame) -> None:
+        record = self.log._record()
+        if record is not None:
+            record.frames.append(
+                {
+                    "rows": frame.height,
+                    "columns": dict(zip(frame.columns, map(str, frame.dtypes))),
+                    "head": frame.head(self.rows).to_dicts(),
+                }
+            )
+
+    def clear(self) -> None:
+        pass
+
+    def focus(self) -> None:
+        pass
+
+
+class HeadlessCats(InteractiveCats):
+    """
+    Runs InteractiveCats commands without the Textual UI.
+
+    The app is never mounted or rendered: the widgets the commands write
+    to are replaced with recorders, and UI-only hooks do nothing. Commands
+    run concurrently up to a limit and in the same order as in the app:
+    connection commands wait for everything before them and run alone, and
+    other commands wait only for the earlier ones they depend on (see
+    waits_for).
+    """
+
+    def __init__(self, parallel: int = 4, frame_rows: int = FRAME_ROWS):
+        super().__init__()
+        self.parallel = parallel
+        self.logger_handler = RecordingLog()
+        self.data_table = FrameRecorder(self.logger_handler, frame_rows)
+        self.input_handler = InputHandler(self)
+        self._tasks: List[asyncio.Task] = []
+        self._stopped = False
+
+    # UI hooks
+
+    def update_catalog_button(self, catalog: str):
+        pass
+
+    def _update_command_button(self) -> None:
+        pass
+
+    def _show_disconnected(self) -> None:
+        pass
+
+    def set_timer(self, *args, **kwargs):
+        return None
+
+    def profile_output(self) -> RecordingLog:
+        # There is no panel; keep the summary with the command's output
+        return self.logger_handler
+
+    def format_catalog_list(self) -> Text:
+        return Text("Available catalogs: " + ", ".join(self.catalogs))
+
+    def format_commands_list(self) -> Text:
+        return Text("See the README for available commands")
+
+    def call_from_thread(self, callback: Callable, *args, **kwargs):
+        # There is no event loop thread to hand over to
+        return callback(*args, **kwargs)
+
+    def run_worker(self, work, *args, **kwargs):
+        task = asyncio.ensure_future(work)
+        self._tasks.append(task)
+        return task
+
+    def exit(self, *args, **kwargs) -> None:
+        self._stopped = True
+
+    # Running commands
+
+    async def _run_one(self, index: int, text: str) -> CommandRecord:
+        """Run a single command, recording its output."""
+        command = ScheduledCommand(index, text)
+        command.started_at = time.monotonic()
+        record = CommandRecord(index, text)
+        self.logger_handler.records[index] = record
+        token = current_command.set(command)
+        try:
+            await self.input_handler.handle_command(text)
+        except Exception as e:
+            record.errors.append(str(e))
+        finally:
+            current_command.reset(token)
+            del self.logger_handler.records[index]
+        record.ok = not record.errors
+        record.elapsed = round(command.elapsed, 3)
+        record.bytes_received = command.bytes_received
+        return record
+
+    async def run_commands(
+        self, commands: Iterable[str], emit: Callable[[CommandRecord], None]
+    ) -> bool:
+        """
+        Run commands and emit each record as soon as it completes.
+
+        Args:
+            commands: Command lines, in order
+            emit: Called with each finished command's record
+        Returns:
+            bool: True when every command succeeded
+        """
+        slots = asyncio.Semaphore(self.parallel)
+        # Unfinished commands and their text
+        running: Dict[asyncio.Task, str] = {}
+        succeeded = True
+
+        async def run(index: int, text: str, after: List[asyncio.Task]) -> None:
+            nonlocal succeeded
+            if after:
+                await asyncio.wait(after)
+            async with slots:
+                record = await self._run_one(index, text)
+            succeeded = succeeded and record.ok
+            emit(record)
+
+        try:
+            for index, text in enumerate(commands):
+                if self._stopped:
+                    break
+                alone = runs_alone(text)
+                if alone and running:
+                    # Connection changes must not race earlier commands
+                    await asyncio.wait(running)
+                after = [
+                    task
+                    for task, earlier in running.items()
+                    if waits_for(text, earlier)
+                ]
+                task = asyncio.ensure_future(run(index, text, after))
+                running[task] = text
+                task.add_done_callback(lambda done: running.pop(done, None))
+                if alone:
+                    await task
+            if running:
+                await asyncio.wait(running)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            self.on_unmount()
+        return succeeded
+
+
+def _split_line(line: str) -> List[str]:
+    """Split a script line on semicolons outside quoted strings."""
+    parts = []
+    current = []
+    quote = None
+    for char in line:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == ";":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def read_commands(lines: Iterable[str]) -> List[str]:
+    """Split script lines into commands, skipping blanks and # comments."""
+    commands = []
+    for line in lines:
+        if line.lstrip().startswith("#"):
+            continue
+        commands.extend(part.strip() for part in _split_line(line) if part.strip())
+    return commands
+
+
+def run_headless(
+    lines: Iterable[str],
+    output,
+    parallel: int = 4,
+    output_format: str = "ndjson",
+    frame_rows: int = FRAME_ROWS,
+) -> int:
+    """
+    Run a command script without the UI and write the results.
+
+    Args:
+        lines: Script lines; several commands may share a line separated by ;
+        output: Text stream the results are written to
+        parallel: Maximum commands running at once
+        output_format: ndjson to stream one record per line as commands
+            finish, json for a single array in script order
+        frame_rows: Rows of each loaded or queried frame to include
+    Returns:
+        int: Process exit code, 1 if any command failed
+    """
+    app = HeadlessCats(parallel=parallel, frame_rows=frame_rows)
+    records: List[CommandRecord] = []
+
+    def emit(record: CommandRecord) -> None:
+        if output_format == "ndjson":
+            output.write(json.dumps(asdict(record), default=str) + "\n")
+            output.flush()
+        else:
+            records.append(record)
+
+    succeeded = asyncio.run(app.run_commands(read_commands(lines), emit))
+    if output_format == "json":
+        records.sort(key=lambda record: record.index)
+        json.dump([asdict(record) for record in records], output, default=str)
+        output.write("\n")
+    return 0 if succeeded else 1
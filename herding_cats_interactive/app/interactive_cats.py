@@ -1,26 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+
 from textual.app import App
-from textual.widgets import Header, Input, Footer, RichLog, DataTable, Button
+from textual.widgets import Header, Input, Footer, RichLog, Button
 from textual.containers import Container, Horizontal
 
 from rich.text import Text
 from rich.style import Style
 from loguru import logger
 
+from herding_cats_interactive.cache.dataset_cache import DatasetCache
+from herding_cats_interactive.cache.explorer_memo import ExplorerMemo
+from herding_cats_interactive.cache.metadata_cache import MetadataCache
 from herding_cats_interactive.handlers.rich_log_handler import ExtendedRichLogHandler
 from herding_cats_interactive.ui.components.catalogue_button import CatalogButton
 from herding_cats_interactive.ui.components.command_button import CommandButton
-from herding_cats_interactive.handlers.input_handler import InputHandler
+from herding_cats_interactive.ui.components.command_monitor import CommandMonitor
+from herding_cats_interactive.ui.components.frame_table import FrameTable
+from herding_cats_interactive.handlers.input_handler import (
+    InputHandler,
+    runs_alone,
+    waits_for,
+)
 from herding_cats_interactive.handlers.binding_hanlder import BindingHandler
+from herding_cats_interactive.handlers.command_executor import CommandExecutor
+from herding_cats_interactive.handlers.session_manager import (
+    CatalogConnection,
+    SessionManager,
+    current_connection,
+)
+from herding_cats_interactive.handlers.command_scheduler import (
+    CommandScheduler,
+    current_command,
+    track_response_bytes,
+)
+from herding_cats_interactive.search.catalogue_index import CatalogueIndex
+from herding_cats_interactive.search.federated_search import FederatedSearch
 from herding_cats_interactive.ui.styles.app_css import APP_CSS
+from herding_cats_interactive.utils.catalogue_stats import catalogue_stats
+from herding_cats_interactive.utils import herding_cats as hc
 from herding_cats_interactive.utils.constants import catalogues
+from herding_cats_interactive.utils.sql_engine import SqlEngine
 
-from HerdingCats.session.session import CatSession, CatalogueType
-from HerdingCats.explorer.explore import (
-    CkanCatExplorer,
-    OpenDataSoftCatExplorer,
-    FrenchGouvCatExplorer,
-)
-from HerdingCats.loader.loader import CkanLoader, OpenDataSoftLoader, FrenchGouvLoader
+
+# Fetch catalogue listings in the background after every connect
+PREFETCH_LISTINGS = os.getenv("HERDING_CATS_PREFETCH", "").lower() in ("1", "true")
 
 
 class InteractiveCats(App):
@@ -34,6 +63,8 @@ class InteractiveCats(App):
         ("e", "show_commands", "Show Available Commands"),
         ("b", "previous_log", "Previous Log"),
         ("f", "next_log", "Next Log"),
+        ("n", "next_page", "Next Page"),
+        ("x", "cancel_command", "Cancel Command"),
         ("shift+left", "focus_log", "Focus RichLog"),
         ("shift+right", "focus_table", "Focus DataTable"),
         ("shift+down", "focus_input", "Focus Input"),
@@ -42,16 +73,57 @@ class InteractiveCats(App):
 
     def __init__(self):
         super().__init__()
-        self.session = None
-        self.loader = None
-        self.explorer = None
+        self.sessions = SessionManager()
         self.logger_handler = None
         self.no_connection_status_button = None
         self.active_catalog_button = None
         self.rich_log = None
         self.data_table = None
         self.catalogs = catalogues
+        self.metadata_cache = MetadataCache()
+        self.explorer_memo = ExplorerMemo()
+        self.dataset_cache = DatasetCache()
+        self.sql_engine = SqlEngine()
+        self.search_index = CatalogueIndex()
+        self.federated_search = FederatedSearch()
         self.input_handler = None
+        self.executor = CommandExecutor()
+        self.scheduler = None
+        self.monitor_timer = None
+
+    @property
+    def connection(self):
+        """The running command's catalogue connection, else the active one."""
+        return current_connection.get() or self.sessions.current
+
+    @property
+    def session(self):
+        """Session of the command's catalogue connection."""
+        connection = self.connection
+        return connection.session if connection else None
+
+    @property
+    def explorer(self):
+        """Explorer of the command's catalogue connection."""
+        connection = self.connection
+        return connection.explorer if connection else None
+
+    @property
+    def loader(self):
+        """Loader of the command's catalogue connection."""
+        connection = self.connection
+        return connection.loader if connection else None
+
+    @property
+    def loaded_frames(self):
+        """Loaded datasets, keyed by their SQL table name."""
+        return self.sql_engine.tables
+
+    @property
+    def catalog_name(self):
+        """Name of the command's catalogue connection."""
+        connection = current_connection.get()
+        return connection.name if connection else self.sessions.active
 
     def compose(self):
         """Create child widgets for the app."""
@@ -71,12 +143,13 @@ class InteractiveCats(App):
             ),
             Horizontal(
                 RichLog(highlight=True, markup=True, id="rich-log"),
-                DataTable(id="data-table"),
+                FrameTable(id="data-table"),
                 id="main-content",
             ),
             RichLog(highlight=True, markup=True, id="rich-log-2"),
             id="secondary-content",
         )
+        yield CommandMonitor(id="command-monitor")
         yield Input(placeholder="Enter command (connect <catalog> to start)")
         yield Footer()
 
@@ -89,13 +162,16 @@ class InteractiveCats(App):
         rich_log = self.query_one(RichLog)
         rich_log.focus()
         self.logger_handler = ExtendedRichLogHandler(rich_log)
+        # Render the next page of a long listing once the log is scrolled to the end
+        self.watch(rich_log, "scroll_y", self._on_log_scrolled, init=False)
 
         # Remove default logger handlers and add our custom handler
+        self._loop_thread = threading.get_ident()
         logger.remove()
-        logger.add(self.logger_handler, format="{message}")
+        logger.add(self._log_sink, format="{message}")
 
         # Set up Data Table
-        self.data_table = self.query_one(DataTable)
+        self.data_table = self.query_one(FrameTable)
 
         # Set up binding handler
         self.binding_handler = BindingHandler(self)
@@ -103,25 +179,71 @@ class InteractiveCats(App):
         # Set up input handler
         self.input_handler = InputHandler(self)
 
+        # Set up command scheduler and its progress panel
+        # Connection changes run alone, so later commands see the new
+        # connection; other commands only wait for what they depend on, such
+        # as sql for the tables earlier loads register
+        self.scheduler = CommandScheduler(
+            self,
+            self.input_handler.handle_command,
+            exclusive=runs_alone,
+            waits_for=waits_for,
+        )
+        # The timer only runs while commands are in flight
+        self.monitor_timer = self.set_interval(
+            0.1, self._refresh_command_monitor, pause=True
+        )
+        # Close background connections nobody has used for a while
+        self.set_interval(60, self._close_idle_sessions)
+
         # Set up no connection button
         self.no_connection_status_button = self.query_one("#no-connection-status")
 
         # Display welcome message
         self._show_welcome_message(rich_log)
 
+    def on_unmount(self):
+        """Release worker threads, the cache and the search index on shutdown."""
+        self.sessions.close_all()
+        self.executor.shutdown()
+        self.federated_search.shutdown()
+        self.metadata_cache.close()
+        self.search_index.close()
+        self.sql_engine.close()
+
+    def cancel_commands(self):
+        """Cancel every command that is still in flight."""
+        if self.scheduler:
+            self.scheduler.cancel_all()
+        self.executor.cancel_all()
+        self.federated_search.executor.cancel_all()
+        self.workers.cancel_group(self, "warm-up")
+        self._refresh_command_monitor()
+
+    def _refresh_command_monitor(self):
+        """Redraw the in-flight command panel."""
+        if not self.scheduler:
+            return
+        in_flight = self.scheduler.in_flight
+        self.query_one(CommandMonitor).update_commands(in_flight)
+        if not in_flight and self.monitor_timer:
+            self.monitor_timer.pause()
+
     def reset_app(self):
         """Reset the app to its initial state."""
-        # Close any existing session
-        if hasattr(self, "session") and self.session:
-            self.session.close_session()
-            self.session = None
+        # Stop anything still running before tearing down the session
+        self.cancel_commands()
+
+        # Close every open session
+        self.sessions.close_all()
 
         if self.data_table:
-            self.data_table.clear(columns=True)
+            self.data_table.clear()
 
         # Reset all variables to initial state
-        self.explorer = None
-        self.loader = None
+        self.explorer_memo.clear()
+        self.sql_engine.close()
+        self.query_one(CommandButton).update_explorer(None)
 
         # Remove the connected catalog button if it exists
         if hasattr(self, "active_catalog_button") and self.active_catalog_button:
@@ -139,8 +261,10 @@ class InteractiveCats(App):
         # Clear the input
         self.query_one(Input).value = ""
 
-        # Clear and reset the log
+        # Clear and reset the log and its history
         rich_log = self.query_one(RichLog)
+        if self.logger_handler:
+            self.logger_handler.reset()
         rich_log.clear()
 
         # Show welcome message again
@@ -232,6 +356,38 @@ class InteractiveCats(App):
         if self.logger_handler:
             self.logger_handler.show_next()
 
+    def action_next_page(self) -> None:
+        """Show the next page of a long listing."""
+        if self.logger_handler:
+            self.logger_handler.write_next_page()
+
+    def _on_log_scrolled(self, scroll_y: float) -> None:
+        """Load more of a paginated listing when the log reaches the bottom."""
+        rich_log = self.query_one(RichLog)
+        if (
+            self.logger_handler
+            and self.logger_handler.has_next_page
+            and scroll_y >= rich_log.max_scroll_y
+        ):
+            self.logger_handler.write_next_page()
+
+    def action_cancel_command(self) -> None:
+        """Cancel the most recently submitted command."""
+        if not self.scheduler:
+            return
+        command = self.scheduler.cancel_latest()
+        if command:
+            self.logger_handler.write(
+                Text(f"Cancelled: {command.text}\n", style=Style(color="yellow"))
+            )
+        self._refresh_command_monitor()
+
+    def profile_output(self) -> RichLog:
+        """Clear the secondary log panel and return it for a profile summary."""
+        panel = self.query_one("#rich-log-2", RichLog)
+        panel.clear()
+        return panel
+
     def format_catalog_list(self) -> Text:
         """Format the catalog list for display with rich text formatting."""
         # We can reuse the CatalogButton's formatting method
@@ -244,55 +400,153 @@ class InteractiveCats(App):
         command_button = self.query_one(CommandButton)
         return command_button._format_commands_list()
 
-    async def on_input_submitted(self, message: Input.Submitted):
+    def on_input_submitted(self, message: Input.Submitted):
         """Handle input commands."""
-        if self.input_handler:
-            await self.input_handler.handle_command(message)
+        if self.scheduler:
+            if not message.value.strip():
+                return
+            # Commands run as workers so the UI keeps processing input
+            self.scheduler.submit(message.value.strip())
+            message.input.value = ""
+            self.monitor_timer.resume()
         else:
             logger.error("Input handler not initialized")
 
-    async def create_explorer(self):
+    async def create_explorer(self, session: hc.CatSession):
         """Create the appropriate explorer and loader based on catalog type."""
-        if not self.session:
+        if not session:
             return None, None
 
-        catalog_type = self.session.catalogue_type
+        catalog_type = session.catalogue_type
         match catalog_type:
-            case CatalogueType.CKAN:
-                return CkanCatExplorer(self.session), CkanLoader()
-            case CatalogueType.OPENDATA_SOFT:
-                return OpenDataSoftCatExplorer(self.session), OpenDataSoftLoader()
-            case CatalogueType.GOUV_FR:
-                return FrenchGouvCatExplorer(self.session), FrenchGouvLoader()
+            case hc.CatalogueType.CKAN:
+                return hc.CkanCatExplorer(session), hc.CkanLoader()
+            case hc.CatalogueType.OPENDATA_SOFT:
+                return hc.OpenDataSoftCatExplorer(session), hc.OpenDataSoftLoader()
+            case hc.CatalogueType.GOUV_FR:
+                return hc.FrenchGouvCatExplorer(session), hc.FrenchGouvLoader()
 
         return None, None
 
-    async def _check_site_health(self) -> None:
-        """Check site health."""
-        if not self.explorer:
+    def _log_sink(self, message) -> None:
+        """
+        Loguru sink writing to the log handler on the event loop.
+
+        Explorer and loader calls log from pool threads, and neither the
+        RichLog nor the handler's history may be touched from there.
+        """
+        if threading.get_ident() == self._loop_thread:
+            self.logger_handler.write(message)
+            return
+        try:
+            self.call_from_thread(self.logger_handler.write, message)
+        except RuntimeError:
+            # The app has already stopped, so there is nowhere to show it
+            pass
+
+    async def _check_site_health(self, connection: CatalogConnection) -> None:
+        """Check site health, recording the outcome and latency on the connection."""
+        explorer = connection.explorer
+        if not explorer:
             return
+        started = time.perf_counter()
         try:
-            if isinstance(self.explorer, (CkanCatExplorer, OpenDataSoftCatExplorer)):
-                self.explorer.check_site_health()
-            elif isinstance(self.explorer, FrenchGouvCatExplorer):
-                self.explorer.check_health_check()
+            if isinstance(explorer, (hc.CkanCatExplorer, hc.OpenDataSoftCatExplorer)):
+                await self.executor.run(explorer.check_site_health)
+            elif isinstance(explorer, hc.FrenchGouvCatExplorer):
+                await self.executor.run(explorer.check_health_check)
+            connection.healthy = True
         except Exception as e:
+            connection.healthy = False
             logger.error(f"Error checking site health: {str(e)}")
+        connection.latency = time.perf_counter() - started
 
-    async def connect_to_catalog(self, catalog: str):
-        """Core operation to connect to a catalog."""
+    async def _fetch_catalogue_stats(self, connection: CatalogConnection) -> None:
+        """Count the catalogue's datasets and organisations."""
+        catalog_type, _ = self.catalogs[connection.name]
+        try:
+            connection.stats = await self.executor.run(
+                catalogue_stats,
+                catalog_type,
+                connection.url,
+                getattr(connection.session, "session", None),
+            )
+        except Exception as e:
+            logger.error(f"Error fetching catalogue stats: {str(e)}")
+
+    async def _warm_up(self, connection: CatalogConnection) -> None:
+        """Run the health check and catalogue stats concurrently after connecting."""
+        await asyncio.gather(
+            self._check_site_health(connection),
+            self._fetch_catalogue_stats(connection),
+        )
+        # The user may have switched or closed the connection meanwhile
+        if self.sessions.current is connection:
+            self.update_catalog_button(connection.name)
+
+    async def _prefetch_listings(self, connection: CatalogConnection) -> None:
+        """Fetch every listing of a catalogue into the cache, concurrently."""
+        calls = self.input_handler.listing_calls(connection)
+        results = await asyncio.gather(
+            *(
+                self.executor.run(
+                    self.input_handler.cached_listing, call, fetch, connection
+                )
+                for call, fetch in calls.items()
+            ),
+            return_exceptions=True,
+        )
+        for call, result in zip(calls, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error prefetching {call}: {str(result)}")
+
+    def _run_in_background(self, work) -> None:
+        """
+        Start connection warm-up work as a worker outside the current command.
+
+        The worker would otherwise inherit the command's context and its
+        log output would be held back as that command's, long after the
+        command itself has finished.
+        """
+        context = contextvars.copy_context()
+        context.run(current_command.set, None)
+        context.run(self.run_worker, work, group="warm-up")
+
+    async def connect_to_catalog(self, catalog: str, prefetch: bool = False):
+        """
+        Core operation to connect to a catalog.
+
+        With prefetch (or HERDING_CATS_PREFETCH set) the catalogue listings
+        are fetched into the cache in the background once connected.
+        """
         if catalog not in self.catalogs:
             return False, "Invalid catalog", None
 
+        catalog_type, catalog_enum = self.catalogs[catalog]
+        if self.use_catalog(catalog):
+            # Already connected: reuse the open session
+            return True, None, catalog_enum
+
         try:
-            catalog_type, catalog_enum = self.catalogs[catalog]
-            self.session = CatSession(catalog_enum)
-            self.session.start_session()
-            self.explorer, self.loader = await self.create_explorer()
-            await self._check_site_health()
-
-            command_button = self.query_one(CommandButton)
-            command_button.update_explorer(self.explorer)
+            session = hc.CatSession(catalog_enum)
+            await self.executor.run(session.start_session)
+            # Credit downloaded bytes to whichever command made the request
+            http_session = getattr(session, "session", None)
+            if http_session is not None:
+                http_session.hooks["response"].append(track_response_bytes)
+            explorer, loader = await self.create_explorer(session)
+            connection = CatalogConnection(
+                catalog, catalog_enum.value, session, explorer, loader
+            )
+            evicted = self.sessions.add(connection)
+            for name in evicted:
+                self.explorer_memo.clear(name)
+            # Report success now; health and stats update the button later
+            self._run_in_background(self._warm_up(connection))
+            if prefetch or PREFETCH_LISTINGS:
+                self._run_in_background(self._prefetch_listings(connection))
+
+            self._update_command_button()
             return True, None, catalog_enum
         except Exception as e:
             return False, str(e), None
@@ -304,38 +558,61 @@ class InteractiveCats(App):
 
         try:
             # Get info before closing
-            catalog_name = (
-                self.active_catalog_button.label.split(":")[-1]
-                if self.active_catalog_button
-                else "UNKNOWN"
-            )
+            catalog_name = self.catalog_name.upper()
             catalog_type = self.session.catalogue_type.value
 
             # Close connection and cleanup
-            self.session.close_session()
-            self.session = None
-            self.explorer = None
-            if self.active_catalog_button:
-                self.active_catalog_button.remove()
-
-            # Update command button
-            command_button = self.query_one(CommandButton)
-            command_button.update_explorer(None)
-
-            # Recreate and mount the no connection button if needed
-            button_container = self.query_one("#button-container")
-            if not self.no_connection_status_button:
-                self.no_connection_status_button = Button(
-                    "Not Connected",
-                    id="no-connection-status",
-                    classes="no-connection-status",
-                )
-            button_container.mount(self.no_connection_status_button)
+            closed = self.sessions.close(self.catalog_name)
+            self.explorer_memo.clear(closed.name)
+            if len(self.sessions):
+                # Carry on with the most recently used connection still open
+                remaining = next(reversed(self.sessions.connections))
+                self.use_catalog(remaining)
+                self.update_catalog_button(remaining)
+            else:
+                self._show_disconnected()
 
             return True, catalog_name, catalog_type
         except Exception as e:
             return False, str(e), None
 
+    def _update_command_button(self) -> None:
+        """Show the commands of the active catalogue's explorer."""
+        self.query_one(CommandButton).update_explorer(self.explorer)
+
+    def _show_disconnected(self) -> None:
+        """Swap the connected catalogue button for the not connected one."""
+        if self.active_catalog_button:
+            self.active_catalog_button.remove()
+            self.active_catalog_button = None
+
+        self._update_command_button()
+
+        # Recreate and mount the no connection button if needed
+        button_container = self.query_one("#button-container")
+        if not self.no_connection_status_button:
+            self.no_connection_status_button = Button(
+                "Not Connected",
+                id="no-connection-status",
+                classes="no-connection-status",
+            )
+        button_container.mount(self.no_connection_status_button)
+
+    def use_catalog(self, catalog: str) -> bool:
+        """Switch to an already open catalogue connection."""
+        if not self.sessions.use(catalog):
+            return False
+        self._update_command_button()
+        return True
+
+    def _close_idle_sessions(self) -> None:
+        """Close background connections that have been idle too long."""
+        closed = self.sessions.close_idle()
+        for name in closed:
+            self.explorer_memo.clear(name)
+        if closed and self.catalog_name:
+            self.update_catalog_button(self.catalog_name)
+
     def update_catalog_button(self, catalog: str):
         """Update UI after successful connection."""
 
@@ -345,8 +622,19 @@ class InteractiveCats(App):
         if self.active_catalog_button:
             self.active_catalog_button.remove()
 
+        # Mention other catalogues that are still connected in the background
+        others = len(self.sessions) - 1
+        label = f"Connected: {catalog.upper()}"
+        if others > 0:
+            label += f" (+{others})"
+
+        connection = self.sessions.connections.get(catalog)
+        if connection and connection.healthy is not None:
+            status = "✓" if connection.healthy else "✗"
+            label += f" {status} {connection.latency * 1000:.0f} ms"
+            if "datasets" in connection.stats:
+                label += f" · {connection.stats['datasets']:,} datasets"
+
         button_container = self.query_one("#button-container")
-        self.active_catalog_button = Button(
-            f"Connected: {catalog.upper()}", classes="connected-button"
-        )
+        self.active_catalog_button = Button(label, classes="connected-button")
         button_container.mount(self.active_catalog_button)
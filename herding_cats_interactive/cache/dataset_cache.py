@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+from herding_cats_interactive.cache.metadata_cache import DEFAULT_CACHE_DIR, DEFAULT_TTL
+
+if TYPE_CHECKING:
+    import polars as pl
+
+
+DEFAULT_MAX_BYTES = int(
+    os.getenv("HERDING_CATS_DATASET_CACHE_SIZE", 2 * 1024 * 1024 * 1024)
+)
+
+
+class DatasetCache:
+    """
+    Local Parquet cache for loaded datasets.
+
+    Files are content-addressed by resource URL, format and version: the
+    Last-Modified or ETag header of the resource, or the current TTL window
+    when the server sends neither. A changed resource therefore gets a new
+    key and is downloaded again. Hits are memory-mapped Parquet reads, and
+    the least recently used files are evicted once the cache grows past
+    its size budget.
+    """
+
+    def __init__(
+        self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None
+    ):
+        self.directory = Path(cache_dir or DEFAULT_CACHE_DIR) / "datasets"
+        self.max_bytes = max_bytes or DEFAULT_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version(
+        url: str,
+        http_session: Optional[requests.Session],
+        headers: Optional[Dict[str, str]],
+    ) -> str:
+        """Identify the current version of a resource from its headers."""
+        try:
+            response = (http_session or requests).head(
+                url, headers=headers, allow_redirects=True, timeout=10
+            )
+            validators = response.headers
+            validator = validators.get("Last-Modified") or validators.get("ETag")
+            if response.ok and validator:
+                return validator
+        except requests.RequestException:
+            pass
+        return f"window-{int(time.time() // DEFAULT_TTL)}"
+
+    def entry(
+        self,
+        url: str,
+        format_type: str,
+        http_session: Optional[requests.Session] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Path:
+        """
+        Path of the cache file for the current version of a resource.
+
+        Args:
+            url: Resource download URL
+            format_type: Format the resource is loaded as
+            http_session: Session used to check the resource version
+            headers: Extra request headers (e.g. an API key)
+        Returns:
+            Path: Where the resource is (or would be) cached
+        """
+        version = self._version(url, http_session, headers)
+        key = hashlib.sha256(
+            "\n".join([url, format_type.lower(), version]).encode("utf-8")
+        ).hexdigest()
+        return self.directory / f"{key}.parquet"
+
+    def read(self, path: Path) -> Optional[pl.DataFrame]:
+        """Read a cached dataset, or None on a miss."""
+        import polars as pl
+
+        try:
+            df = pl.read_parquet(path, memory_map=True)
+        except (FileNotFoundError, OSError, pl.exceptions.ComputeError):
+            self.misses += 1
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        self.hits += 1
+        return df
+
+    def write(self, path: Path, df: pl.DataFrame) -> Optional[str]:
+        """
+        Store a dataset, then evict old files beyond the size budget.
+
+        Returns:
+            Optional[str]: Why the dataset couldn't be cached, or None
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.write_parquet(temp_path)
+            # Readers never see a partly written file
+            os.replace(temp_path, path)
+        except Exception as e:
+            # Some frames (e.g. Object columns) can't be written as Parquet
+            Path(temp_path).unlink(missing_ok=True)
+            return f"Could not cache dataset: {str(e)}"
+        self._evict()
+        return None
+
+    def get_or_load(
+        self,
+        url: str,
+        format_type: str,
+        load: Callable[[], Any],
+        http_session: Optional[requests.Session] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        Return a cached dataset, calling load and caching its frame on a miss.
+
+        Args:
+            url: Resource download URL
+            format_type: Format the resource is loaded as
+            load: Blocking callable producing the dataset
+            http_session: Session used to check the resource version
+            headers: Extra request headers (e.g. an API key)
+        Returns:
+            Tuple[Any, Optional[str]]: The dataset, or whatever load returned
+                if it isn't a frame, and why it couldn't be cached, if so
+        """
+        path = self.entry(url, format_type, http_session, headers)
+        df = self.read(path)
+        if df is not None:
+            return df, None
+        result = load()
+        # Loading has imported polars already, so this is free
+        import polars as pl
+
+        if isinstance(result, pl.DataFrame):
+            return result, self.write(path, result)
+        return result, None
+
+    def _evict(self) -> None:
+        """Remove least recently used files until the cache fits its budget."""
+        with self._lock:
+            files = sorted(
+                (entry.stat().st_mtime, entry.stat().st_size, entry)
+                for entry in self.directory.glob("*.parquet")
+            )
+            total = sum(size for _, size, _ in files)
+            for _, size, entry in files:
+                if total <= self.max_bytes:
+                    break
+                entry.unlink(missing_ok=True)
+                total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarise cached datasets and hit rates."""
+        files = list(self.directory.glob("*.parquet"))
+        return {
+            "location": str(self.directory),
+            "files": len(files),
+            "bytes": sum(entry.stat().st_size for entry in files),
+            "max-bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self) -> int:
+        """
+        Remove every cached dataset.
+
+        Returns:
+            int: Number of files removed
+        """
+        with self._lock:
+            files = list(self.directory.glob("*.parquet"))
+            for entry in files:
+                entry.unlink(missing_ok=True)
+        return len(files)
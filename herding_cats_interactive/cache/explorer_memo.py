@@ -0,0 +1,90 @@
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class ExplorerMemo:
+    """
+    Session-scoped, size-bounded LRU cache for explorer lookups.
+
+    Lets info -> load sequences reuse the metadata fetched by the first
+    command instead of requesting it again. Concurrent misses on the same
+    key wait for the first call rather than repeating it.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        # Keys being fetched -> lock held while fetching
+        self._fetching: Dict[Hashable, threading.Lock] = {}
+
+    def get_or_call(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling func on a miss.
+
+        Args:
+            key: Hashable key identifying the lookup
+            func: Blocking callable producing the value
+        Returns:
+            Any: The cached or freshly fetched value
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            key_lock = self._fetching.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                # Filled in while waiting on another call for the same key
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+                self.misses += 1
+
+            try:
+                value = func()
+            except BaseException:
+                with self._lock:
+                    self._fetching.pop(key, None)
+                raise
+
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                self._fetching.pop(key, None)
+            return value
+
+    def stats(self) -> Dict[str, int]:
+        """Summarise memo usage."""
+        return {
+            "entries": len(self._entries),
+            "max-entries": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self, catalogue: Optional[str] = None) -> None:
+        """
+        Drop cached entries.
+
+        Args:
+            catalogue: Only drop this catalogue's entries when given,
+                otherwise drop everything and reset the counters
+        """
+        with self._lock:
+            if catalogue is not None:
+                for key in [key for key in self._entries if key[0] == catalogue]:
+                    del self._entries[key]
+                return
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
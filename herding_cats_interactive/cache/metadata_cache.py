@@ -0,0 +1,258 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv(
+        "HERDING_CATS_CACHE_DIR",
+        Path.home() / ".cache" / "herding-cats-interactive",
+    )
+)
+DEFAULT_TTL = float(os.getenv("HERDING_CATS_CACHE_TTL", 24 * 60 * 60))
+
+
+class MetadataCache:
+    """
+    Persistent SQLite cache for catalogue listings.
+
+    Entries are keyed by catalogue name and listing call and stored as
+    compressed JSON. Stale entries are revalidated with a conditional
+    request when the catalogue returned an ETag or Last-Modified header,
+    and re-fetched otherwise. Concurrent requests for the same listing wait
+    for the first fetch rather than repeating it.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: Optional[float] = None):
+        self.path = Path(cache_dir or DEFAULT_CACHE_DIR) / "metadata.sqlite"
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # One lock per listing, held while it is looked up or fetched
+        self._fetching: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the cache database on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS listings (
+                    catalogue TEXT NOT NULL,
+                    call TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (catalogue, call)
+                )
+                """
+            )
+        return self._conn
+
+    def get_or_fetch(
+        self,
+        catalogue: str,
+        call: str,
+        fetch: Callable[[], Any],
+        validate_url: Optional[str] = None,
+        http_session: Optional[requests.Session] = None,
+    ) -> Any:
+        """
+        Return a cached listing, fetching it when missing or stale.
+
+        Args:
+            catalogue: Name of the connected catalogue
+            call: Name of the listing call (e.g. "packages")
+            fetch: Blocking callable producing the listing
+            validate_url: Endpoint used for ETag/Last-Modified revalidation
+            http_session: Session used for revalidation requests
+        Returns:
+            Any: The listing, as returned by fetch
+        """
+        with self._lock:
+            listing_lock = self._fetching.setdefault(
+                (catalogue, call), threading.Lock()
+            )
+        with listing_lock:
+            return self._get_or_fetch(
+                catalogue, call, fetch, validate_url, http_session
+            )
+
+    def _get_or_fetch(
+        self,
+        catalogue: str,
+        call: str,
+        fetch: Callable[[], Any],
+        validate_url: Optional[str],
+        http_session: Optional[requests.Session],
+    ) -> Any:
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT payload, etag, last_modified, fetched_at FROM listings "
+                    "WHERE catalogue = ? AND call = ?",
+                    (catalogue, call),
+                )
+                .fetchone()
+            )
+
+        if row:
+            payload, etag, last_modified, fetched_at = row
+            if time.time() - fetched_at < self.ttl:
+                self.hits += 1
+                return self._decode(payload)
+            if validate_url and self._not_modified(
+                http_session, validate_url, etag, last_modified
+            ):
+                self.revalidated += 1
+                self._touch(catalogue, call)
+                return self._decode(payload)
+
+        self.misses += 1
+        data = fetch()
+        etag, last_modified = (
+            self._validators(http_session, validate_url)
+            if validate_url
+            else (None, None)
+        )
+        self._store(catalogue, call, data, etag, last_modified)
+        return data
+
+    @staticmethod
+    def _decode(payload: bytes) -> Any:
+        return json.loads(zlib.decompress(payload))
+
+    @staticmethod
+    def _encode(data: Any) -> bytes:
+        return zlib.compress(json.dumps(data, default=str).encode("utf-8"))
+
+    @staticmethod
+    def _validators(
+        http_session: Optional[requests.Session], url: str
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Fetch the ETag and Last-Modified headers for an endpoint."""
+        try:
+            # Stream so only the headers are read
+            with (http_session or requests).get(url, stream=True, timeout=10) as r:
+                return r.headers.get("ETag"), r.headers.get("Last-Modified")
+        except requests.RequestException:
+            return None, None
+
+    @staticmethod
+    def _not_modified(
+        http_session: Optional[requests.Session],
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> bool:
+        """Check whether the endpoint still matches the stored validators."""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        if not headers:
+            return False
+        try:
+            with (http_session or requests).get(
+                url, headers=headers, stream=True, timeout=10
+            ) as r:
+                return r.status_code == 304
+        except requests.RequestException:
+            return False
+
+    def _store(
+        self,
+        catalogue: str,
+        call: str,
+        data: Any,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?, ?)",
+                (catalogue, call, self._encode(data), etag, last_modified, time.time()),
+            )
+            conn.commit()
+
+    def _touch(self, catalogue: str, call: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE listings SET fetched_at = ? WHERE catalogue = ? AND call = ?",
+                (time.time(), catalogue, call),
+            )
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarise cache contents and hit rates."""
+        with self._lock:
+            rows = (
+                self._connection()
+                .execute(
+                    "SELECT catalogue, call, length(payload), fetched_at FROM listings "
+                    "ORDER BY catalogue, call"
+                )
+                .fetchall()
+            )
+        now = time.time()
+        return {
+            "location": str(self.path),
+            "ttl-seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "entries": [
+                {
+                    "catalogue": catalogue,
+                    "call": call,
+                    "compressed-bytes": size,
+                    "age-seconds": round(now - fetched_at),
+                    "stale": now - fetched_at >= self.ttl,
+                }
+                for catalogue, call, size, fetched_at in rows
+            ],
+        }
+
+    def clear(self, catalogue: Optional[str] = None) -> int:
+        """
+        Remove cached listings.
+
+        Args:
+            catalogue: Only clear this catalogue when given
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            conn = self._connection()
+            if catalogue:
+                cursor = conn.execute(
+                    "DELETE FROM listings WHERE catalogue = ?", (catalogue,)
+                )
+            else:
+                cursor = conn.execute("DELETE FROM listings")
+            conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,14 +1,15 @@
-from textual.widgets import RichLog, DataTable, Input
+from textual.widgets import RichLog, Input
 
 from herding_cats_interactive.ui.components.catalogue_button import CatalogButton
 from herding_cats_interactive.ui.components.command_button import CommandButton
+from herding_cats_interactive.ui.components.frame_table import FrameTable
 
 
 class BindingHandler:
     def __init__(self, app):
         self.app = app
         self.rich_log = app.query_one(RichLog)
-        self.data_table = app.query_one(DataTable)
+        self.data_table = app.query_one(FrameTable)
         self.actions = {
             "show_catalogs": lambda: self.app.query_one(
                 CatalogButton
@@ -0,0 +1,64 @@
+import asyncio
+import contextvars
+import functools
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Set
+
+from herding_cats_interactive.handlers.command_profiler import profiled
+
+
+class CommandExecutor:
+    """
+    Runs blocking HerdingCats calls on a bounded thread pool so the
+    Textual event loop keeps rendering while requests are in flight.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="herding-cats"
+        )
+        self._pending: Set[asyncio.Future] = set()
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        Args:
+            func: The blocking callable to run
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+        Returns:
+            Any: Whatever the callable returns
+        """
+        loop = asyncio.get_running_loop()
+        # Carry context variables over to the worker thread, which also
+        # profiles the call when its command is being profiled
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, profiled, func, *args, **kwargs)
+        future = loop.run_in_executor(self._pool, call)
+        self._pending.add(future)
+        try:
+            return await future
+        finally:
+            self._pending.discard(future)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently waiting on the pool."""
+        return len(self._pending)
+
+    def cancel_all(self) -> None:
+        """
+        Cancel every pending call.
+
+        Calls that have not started are dropped from the pool queue. Calls
+        already running finish in their thread but their result is discarded.
+        """
+        for future in list(self._pending):
+            future.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel pending calls and release the pool threads."""
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,149 @@
+import cProfile
+import pstats
+import re
+import threading
+import time
+
+from collections import defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class CommandProfile:
+    """
+    Deterministic profile of one command, across the event loop and the
+    pool threads doing its blocking work.
+
+    cProfile only sees the thread it is enabled on, so the event loop is
+    profiled for the whole command and every blocking call made on its
+    behalf is profiled on its own thread (see profiled), then merged in.
+    The event loop part includes whatever else the loop ran meanwhile,
+    such as Textual rendering.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.elapsed = 0.0
+        self.thread_calls = 0
+        # Calls that couldn't be profiled because another profiler was active
+        self.unprofiled = 0
+        self._loop_profile = cProfile.Profile()
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._started = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._loop_profile.enable()
+
+    def stop(self) -> None:
+        self._loop_profile.disable()
+        self.elapsed = time.perf_counter() - self._started
+
+    def add(self, profile: cProfile.Profile) -> None:
+        """Merge in the profile of a finished pool thread call."""
+        with self._lock:
+            self._thread_profiles.append(profile)
+            self.thread_calls += 1
+
+    def stats(self) -> pstats.Stats:
+        """All profiles merged into one set of statistics."""
+        stats = pstats.Stats()
+        with self._lock:
+            profiles = [self._loop_profile, *self._thread_profiles]
+        for profile in profiles:
+            try:
+                stats.add(profile)
+            except TypeError:
+                # pstats refuses profiles that recorded nothing
+                pass
+        return stats
+
+
+# The command being profiled in the current task (and the pool threads it uses)
+current_profile: ContextVar[Optional[CommandProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def profiled(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Call func, profiling it on this thread if its command is being profiled.
+
+    Used by the thread pools, inside the context copied from the command.
+    """
+    command_profile = current_profile.get()
+    if command_profile is None:
+        return func(*args, **kwargs)
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+ allows a single active profiler per interpreter
+        command_profile.unprofiled += 1
+        return func(*args, **kwargs)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.disable()
+        command_profile.add(profile)
+
+
+def _package(filename: str, function: str) -> str:
+    """Name the package a profiled function belongs to."""
+    if filename == "~":
+        # Built-ins, e.g. "<method 'recv_into' of '_socket.socket' objects>"
+        owner = re.search(r"of '([\w.]+)'|built-in method ([\w.]+)", function)
+        name = next((group for group in owner.groups() if group), "") if owner else ""
+        return f"built-in {name.split('.')[0]}".strip()
+    parts = Path(filename).parts
+    if "site-packages" in parts:
+        index = parts.index("site-packages") + 1
+        if index < len(parts):
+            return parts[index].split(".")[0]
+    if "herding_cats_interactive" in parts:
+        return "herding_cats_interactive"
+    # Standard library, e.g. .../lib/python3.11/json/decoder.py
+    for index, part in enumerate(parts[:-1]):
+        if re.fullmatch(r"python\d+\.\d+", part):
+            return Path(parts[index + 1]).stem
+    return Path(filename).stem
+
+
+def self_time_by_package(
+    stats: pstats.Stats, limit: int = 10
+) -> List[Tuple[str, float]]:
+    """
+    Time spent in each package's own code, excluding the functions it called.
+
+    Returns:
+        List[Tuple[str, float]]: Package names and seconds, largest first
+    """
+    totals: Dict[str, float] = defaultdict(float)
+    for (filename, _, function), (_, _, own_time, _, _) in stats.stats.items():
+        totals[_package(filename, function)] += own_time
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def top_cumulative(stats: pstats.Stats, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    The functions with the most cumulative time.
+
+    Returns:
+        List[Dict[str, Any]]: Call count, own and cumulative seconds and
+            location of each function, largest cumulative time first
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    top = []
+    for (filename, line, function), (_, calls, own_time, cumulative, _) in rows[:limit]:
+        location = f"{Path(filename).name}:{line}({function})"
+        top.append(
+            {
+                "calls": calls,
+                "own": own_time,
+                "cumulative": cumulative,
+                "function": function if filename == "~" else location,
+            }
+        )
+    return top
@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import time
+
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from textual.worker import Worker
+
+
+class ScheduledCommand:
+    """A submitted command and its progress."""
+
+    def __init__(self, command_id: int, text: str):
+        self.id = command_id
+        self.text = text
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.bytes_received = 0
+        self.cancelled = False
+        self.worker: Optional[Worker] = None
+        # Commands that must finish before this one starts
+        self.after: List["ScheduledCommand"] = []
+        self.finished = asyncio.Event()
+
+    @property
+    def state(self) -> str:
+        """Either 'queued' or 'running'."""
+        return "running" if self.started_at is not None else "queued"
+
+    @property
+    def age(self) -> float:
+        """Seconds since the command was submitted."""
+        return time.monotonic() - self.submitted_at
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the command started running (or was queued)."""
+        return time.monotonic() - (self.started_at or self.submitted_at)
+
+    def add_bytes(self, count: int) -> None:
+        """Record bytes received on behalf of this command."""
+        self.bytes_received += count
+
+
+# The command being executed in the current task (and the pool threads it uses)
+current_command: ContextVar[Optional[ScheduledCommand]] = ContextVar(
+    "current_command", default=None
+)
+
+
+class CommandCancelled(Exception):
+    """Raised in pool threads when the command they work for was cancelled."""
+
+
+def check_cancelled() -> None:
+    """Stop long-running blocking work once its command has been cancelled."""
+    command = current_command.get()
+    if command is not None and command.cancelled:
+        raise CommandCancelled(command.text)
+
+
+def track_response_bytes(response, *args, **kwargs):
+    """
+    Requests response hook crediting received bytes to the current command.
+
+    Streamed responses are skipped so the body is not consumed here; code
+    reading a stream credits each chunk as it arrives.
+    """
+    command = current_command.get()
+    if command is not None and not kwargs.get("stream"):
+        command.add_bytes(len(response.content or b""))
+    return response
+
+
+class CommandScheduler:
+    """
+    Runs submitted commands as Textual workers with bounded concurrency.
+
+    Commands beyond the concurrency limit wait in a queue; any queued or
+    running command can be cancelled. Exclusive commands (those changing
+    the active connection) wait for every earlier command to finish and run
+    alone, and commands submitted after them wait for them. Other commands
+    only wait for the earlier commands they depend on.
+    """
+
+    def __init__(
+        self,
+        app,
+        handler: Callable[[str], Awaitable[None]],
+        max_concurrent: int = 3,
+        exclusive: Optional[Callable[[str], bool]] = None,
+        waits_for: Optional[Callable[[str, str], bool]] = None,
+    ):
+        self.app = app
+        self._handler = handler
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._commands: Dict[int, ScheduledCommand] = {}
+        self._ids = itertools.count(1)
+        # Tells whether a command's text makes it exclusive
+        self._exclusive = exclusive or (lambda text: False)
+        # Tells whether a command depends on an earlier command's text
+        self._waits_for = waits_for or (lambda text, earlier: False)
+        # The latest exclusive command, which later commands wait for
+        self._barrier: Optional[ScheduledCommand] = None
+
+    def submit(self, text: str) -> ScheduledCommand:
+        """Queue a command for execution and return its progress record."""
+        command = ScheduledCommand(next(self._ids), text)
+        if self._exclusive(text):
+            command.after = self.in_flight
+            self._barrier = command
+        else:
+            command.after = [
+                earlier
+                for earlier in self.in_flight
+                if self._waits_for(text, earlier.text)
+            ]
+            if self._barrier:
+                # Also wait for what the barrier waits for, in case it is cancelled
+                command.after += [self._barrier, *self._barrier.after]
+        self._commands[command.id] = command
+        command.worker = self.app.run_worker(
+            self._run(command),
+            name=text,
+            group="commands",
+            exit_on_error=False,
+        )
+        return command
+
+    async def _run(self, command: ScheduledCommand) -> None:
+        token = current_command.set(command)
+        try:
+            for earlier in command.after:
+                await earlier.finished.wait()
+            async with self._semaphore:
+                command.started_at = time.monotonic()
+                await self._handler(command.text)
+        finally:
+            current_command.reset(token)
+            self._commands.pop(command.id, None)
+            command.finished.set()
+            # Show output other commands held back while this one had the log
+            self.app.logger_handler.finish(command)
+
+    @property
+    def in_flight(self) -> List[ScheduledCommand]:
+        """Queued and running commands, oldest first."""
+        return list(self._commands.values())
+
+    def cancel(self, command: ScheduledCommand) -> None:
+        """Cancel a single command."""
+        # Lets pool threads reading a stream stop early
+        command.cancelled = True
+        if command.worker:
+            command.worker.cancel()
+        self._commands.pop(command.id, None)
+        # A worker cancelled before it started never runs its cleanup
+        command.finished.set()
+
+    def cancel_latest(self) -> Optional[ScheduledCommand]:
+        """Cancel the most recently submitted command, if any."""
+        if not self._commands:
+            return None
+        command = self._commands[max(self._commands)]
+        self.cancel(command)
+        return command
+
+    def cancel_all(self) -> None:
+        """Cancel every queued and running command."""
+        for command in self.in_flight:
+            self.cancel(command)
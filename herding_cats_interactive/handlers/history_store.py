@@ -0,0 +1,164 @@
+import json
+import os
+import tempfile
+import threading
+import zlib
+
+from rich.style import Style
+from rich.text import Span, Text
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_MEMORY_BUDGET = int(os.getenv("HERDING_CATS_HISTORY_BUDGET", 16 * 1024 * 1024))
+DEFAULT_DISK_BUDGET = 512 * 1024 * 1024
+
+
+def text_size(text: Text) -> int:
+    """Rough number of bytes a Text holds: its characters plus its spans."""
+    return len(text.plain) + 64 * len(text.spans)
+
+
+def _encode_page(page: List[Text]) -> bytes:
+    """Serialise a page as compressed JSON of plain text and span tables."""
+    return zlib.compress(
+        json.dumps(
+            [
+                [
+                    text.plain,
+                    str(text.style or ""),
+                    [[span.start, span.end, str(span.style)] for span in text.spans],
+                ]
+                for text in page
+            ]
+        ).encode("utf-8")
+    )
+
+
+def _decode_page(payload: bytes) -> List[Text]:
+    """Rebuild a page of Texts from its serialised form."""
+    return [
+        Text(
+            plain,
+            style=Style.parse(style) if style else "",
+            spans=[Span(start, end, Style.parse(span)) for start, end, span in spans],
+        )
+        for plain, style, spans in json.loads(zlib.decompress(payload))
+    ]
+
+
+class HistoryStore:
+    """
+    Log history pages with a memory budget.
+
+    Recent pages are kept in memory. Once the budget is exceeded the oldest
+    ones are spilled to a temporary file as compressed plain text and span
+    tables, and read back lazily when navigated to. Spilled pages beyond
+    the disk budget are dropped.
+    """
+
+    def __init__(
+        self,
+        memory_budget: Optional[int] = None,
+        disk_budget: int = DEFAULT_DISK_BUDGET,
+    ):
+        self.memory_budget = memory_budget or DEFAULT_MEMORY_BUDGET
+        self.disk_budget = disk_budget
+        self.first = 0
+        self.next = 0
+        self._memory: Dict[int, List[Text]] = {}
+        self._memory_sizes: Dict[int, int] = {}
+        self.memory_bytes = 0
+        # Page number -> (offset, length) in the spill file
+        self._spilled: Dict[int, Tuple[int, int]] = {}
+        self._spill_file = None
+        self.disk_bytes = 0
+        # Seeking and reading the spill file must not interleave
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.next - self.first
+
+    def add(self, page: List[Text], size: int) -> int:
+        """
+        Store a page and return its number.
+
+        Args:
+            page: Texts written for one command
+            size: Estimated bytes held by the page
+        Returns:
+            int: The page number
+        """
+        with self._lock:
+            number = self.next
+            self._memory[number] = page
+            self._memory_sizes[number] = size
+            self.memory_bytes += size
+            self.next += 1
+
+            # Spill the oldest in-memory pages, never the one just added
+            while self.memory_bytes > self.memory_budget and len(self._memory) > 1:
+                self._spill(next(iter(self._memory)))
+        return number
+
+    def _spill(self, number: int) -> None:
+        """Move a page from memory to the spill file."""
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(prefix="herding-cats-history-")
+        payload = _encode_page(self._memory.pop(number))
+        self.memory_bytes -= self._memory_sizes.pop(number)
+
+        if self.disk_bytes + len(payload) > self.disk_budget:
+            # The spill file is append-only: start afresh and drop older pages
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._spilled.clear()
+            self.disk_bytes = 0
+            self.first = number
+
+        self._spill_file.seek(0, os.SEEK_END)
+        self._spilled[number] = (self._spill_file.tell(), len(payload))
+        self._spill_file.write(payload)
+        self.disk_bytes += len(payload)
+
+    def get(self, number: int) -> Optional[List[Text]]:
+        """
+        Return a page, reading it back from disk if it was spilled.
+
+        Returns:
+            Optional[List[Text]]: The page, or None if it was never stored or
+                has been dropped to stay within the disk budget
+        """
+        with self._lock:
+            if number in self._memory:
+                return self._memory[number]
+            if number not in self._spilled:
+                return None
+            offset, length = self._spilled[number]
+            self._spill_file.seek(offset)
+            payload = self._spill_file.read(length)
+        return _decode_page(payload)
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarise history memory and disk usage."""
+        return {
+            "pages": len(self),
+            "pages-in-memory": len(self._memory),
+            "memory-bytes": self.memory_bytes,
+            "memory-budget": self.memory_budget,
+            "pages-on-disk": len(self._spilled),
+            "disk-bytes": self.disk_bytes,
+            "disk-budget": self.disk_budget,
+        }
+
+    def clear(self) -> None:
+        """Drop every page, in memory and on disk."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_sizes.clear()
+            self._spilled.clear()
+            self.memory_bytes = 0
+            self.disk_bytes = 0
+            self.first = self.next = 0
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
@@ -1,16 +1,83 @@
-import asyncio
+import contextvars
+import functools
 import os
+import time
 
-from textual.widgets import RichLog, Input
+from textual.widgets import Input
 from rich.text import Text
 from rich.style import Style
 
-from HerdingCats.explorer.explore import (
-    CkanCatExplorer,
-    OpenDataSoftCatExplorer,
-    FrenchGouvCatExplorer,
+from herding_cats_interactive.utils import herding_cats as hc
+from herding_cats_interactive.utils.constants import listing_endpoints
+from herding_cats_interactive.utils.sql_engine import table_name
+from herding_cats_interactive.utils.paginated_fetch import (
+    fetch_french_gov_datasets,
+    fetch_opendatasoft_datasets,
 )
-from HerdingCats.loader.loader import CkanLoader, OpenDataSoftLoader, FrenchGouvLoader
+from herding_cats_interactive.handlers.command_profiler import (
+    CommandProfile,
+    current_profile,
+    self_time_by_package,
+    top_cumulative,
+)
+from herding_cats_interactive.handlers.command_scheduler import CommandCancelled
+from herding_cats_interactive.handlers.session_manager import current_connection
+from herding_cats_interactive.search.federated_search import FederatedSearch
+from herding_cats_interactive.utils.dataset_stream import (
+    resolve_resource_url,
+    stream_csv,
+)
+
+PREVIEW_ROWS = 100
+PROFILE_ROWS = 20
+# Commands that work on the active connection itself rather than through it
+CONNECTION_COMMANDS = {"connect", "use", "close", "quit"}
+# Options of the profile command, each taking a value
+PROFILE_OPTIONS = {"--out", "--top"}
+# Command options that take the following word as their value
+VALUE_OPTIONS = {"rows"}
+
+
+def command_words(command_text: str) -> list[str]:
+    """
+    Lower-cased words of the command a line runs, looking through profile
+    and its options to the command being profiled.
+    """
+    words = command_text.split()
+    while words and words[0].lower() == "profile":
+        words = words[1:]
+        while len(words) > 2 and words[0] in PROFILE_OPTIONS:
+            words = words[2:]
+    return [word.lower() for word in words]
+
+
+def runs_alone(command_text: str) -> bool:
+    """
+    Whether a command line changes the active connection, so it must wait
+    for every earlier command and run before any later one.
+    """
+    words = command_words(command_text)
+    return bool(words) and words[0] in CONNECTION_COMMANDS
+
+
+def waits_for(command_text: str, earlier_text: str) -> bool:
+    """
+    Whether a command depends on an earlier one still in flight.
+
+    sql queries the tables earlier loads register, a local search reads the
+    index an earlier index build writes, and the event loop has a single
+    profiler, so profiled commands take turns.
+    """
+    if command_text.split()[:1] == earlier_text.split()[:1] == ["profile"]:
+        return True
+    words, earlier = command_words(command_text), command_words(earlier_text)
+    if not words or not earlier:
+        return False
+    if words[0] == "sql":
+        return earlier[0] == "load"
+    if words[0] == "search" and "--all" not in words:
+        return earlier[:2] == ["index", "build"]
+    return False
 
 
 class InputHandler:
@@ -20,29 +87,32 @@ class InputHandler:
 
     def __init__(self, app):
         self.app = app
-        self.rich_log = app.query_one(RichLog)
-        self.input = app.query_one(Input)
+        # Written through the log handler so output lands in history
+        self.output = app.logger_handler
+        # The event loop has a single profiler, so one profile runs at a time
+        self.profiling = False
+
+    @property
+    def input(self) -> Input:
+        """The command input, looked up when needed so headless runs skip it."""
+        return self.app.query_one(Input)
 
-    async def handle_command(self, message: Input.Submitted) -> None:
+    async def handle_command(self, command_text: str) -> None:
         """Main command handler."""
         # Split and clean input
-        cmd = message.value.strip().split()
+        cmd = command_text.strip().split()
         if not cmd:
             return
 
         command = cmd[0].lower()
-        self.app.clear_log()
-
-        # Show loading animation
-        await self.compose_loading_dots(message.value)
-
-        self.input.value = ""
-        self.app.clear_log()
+        # Keep the active connection from idling out
+        self.app.sessions.touch()
 
         # Command routing
         command_handlers = {
             "connect": self._handle_connect,
             "close": self._handle_close,
+            "use": self._handle_use,
             "quit": self._handle_quit,
             "list": self._handle_list,
             "package": self._handle_info,
@@ -50,42 +120,186 @@ class InputHandler:
             "resource": self._handle_info,
             "load": self._handle_load,
             "search": self._handle_search,
+            "index": self._handle_index,
+            "cache": self._handle_cache,
+            "next": self._handle_next,
+            "history": self._handle_history,
+            # SQL keeps its original spacing, so pass the raw text along
+            "sql": functools.partial(self._handle_sql, command_text=command_text),
+            "profile": functools.partial(
+                self._handle_profile, command_text=command_text
+            ),
         }
 
-        handler = command_handlers.get(command)
-        if handler:
-            await handler(cmd)
-        else:
-            # Handle unknown command
-            self.rich_log.write(Text("❌ Unknown command\n", style=Style(color="red")))
-            self.rich_log.write(
-                Text("Available commands:\n", style=Style(color="yellow"))
-            )
-            self.rich_log.write(self.app.format_commands_list())
-
-    async def compose_loading_dots(self, command: str) -> None:
-        """Display loading dots animation."""
-        dots = ["   ", ".  ", ".. ", "..."]
-        for dot in dots:
-            text = Text()
-            text.append(
-                "⚡ Please Wait! Processing Command: ",
-                style=Style(color="cyan", italic=True),
-            )
-            text.append(command, style=Style(color="white"))
-            text.append(dot + "\n", style=Style(color="cyan"))
-            self.app.clear_log()
-            self.rich_log.write(text)
-            await asyncio.sleep(0.1)
+        # Pin the command (and the pool threads it uses) to the connection it
+        # started with, so a later `use` doesn't switch it part way through
+        pinned = None if command in CONNECTION_COMMANDS else self.app.sessions.current
+        token = current_connection.set(pinned)
+        if pinned is not None:
+            # Also keeps it open while the command runs in the background
+            self.app.sessions.pin(pinned.name)
+        try:
+            handler = command_handlers.get(command)
+            if handler:
+                await handler(cmd)
+            else:
+                # Handle unknown command
+                self.output.write(
+                    Text("❌ Unknown command\n", style=Style(color="red"))
+                )
+                self.output.write(
+                    Text("Available commands:\n", style=Style(color="yellow"))
+                )
+                self.output.write(self.app.format_commands_list())
+        finally:
+            current_connection.reset(token)
+            if pinned is not None:
+                self.app.sessions.unpin(pinned.name)
+
+    def cached_listing(self, call: str, fetch, connection=None):
+        """
+        Serve a catalogue listing through the persistent metadata cache, which
+        expires and revalidates it.
+
+        Args:
+            call: Name of the listing call (e.g. "packages")
+            fetch: Blocking callable producing the listing
+            connection: Catalogue connection, defaults to the active one
+        """
+        connection = connection or self.app.connection
+        catalog_type, _ = self.app.catalogs[connection.name]
+        path = listing_endpoints.get((catalog_type, call))
+        validate_url = connection.url.rstrip("/") + path if path else None
+        return self.app.metadata_cache.get_or_fetch(
+            connection.name,
+            call,
+            fetch,
+            validate_url=validate_url,
+            http_session=getattr(connection.session, "session", None),
+        )
+
+    @staticmethod
+    def listing_calls(connection) -> dict:
+        """
+        Listing calls offered by a connection, keyed by cache call name.
+
+        Dataset listings are fetched a page at a time in parallel rather
+        than through the explorer's sequential walk.
+        """
+        explorer = connection.explorer
+        http_session = getattr(connection.session, "session", None)
+        match explorer:
+            case hc.CkanCatExplorer():
+                return {
+                    "packages": explorer.get_package_list,
+                    "orgs": explorer.get_organisation_list,
+                }
+            case hc.OpenDataSoftCatExplorer():
+                return {
+                    "datasets": functools.partial(
+                        fetch_opendatasoft_datasets, connection.url, http_session
+                    ),
+                }
+            case hc.FrenchGouvCatExplorer():
+                return {
+                    "datasets": functools.partial(
+                        fetch_french_gov_datasets, connection.url, http_session
+                    ),
+                    "orgs": explorer.get_all_organisations,
+                }
+        return {}
+
+    def memoized(self, func, *args):
+        """Call an explorer method through the session LRU memo."""
+        key = (self.app.catalog_name, func.__name__, *args)
+        return self.app.explorer_memo.get_or_call(key, lambda: func(*args))
+
+    def french_resource_meta(self, dataset_id):
+        """Fetch resource metadata for a French Government dataset, memoized."""
+        key = (self.app.catalog_name, "get_dataset_resource_meta", dataset_id)
+        return self.app.explorer_memo.get_or_call(
+            key,
+            lambda: self.app.explorer.get_dataset_resource_meta(
+                self.memoized(self.app.explorer.get_dataset_meta, dataset_id)
+            ),
+        )
+
+    @staticmethod
+    def split_options(cmd: list) -> tuple[list, dict]:
+        """
+        Separate --options from the positional arguments of a command.
+
+        Options in VALUE_OPTIONS take the following word as their value,
+        any other option is a flag set to True.
+        """
+        args, options = [], {}
+        parts = iter(cmd)
+        for part in parts:
+            if not part.startswith("--"):
+                args.append(part)
+                continue
+            name = part[2:].lower()
+            options[name] = next(parts, None) if name in VALUE_OPTIONS else True
+        return args, options
+
+    @staticmethod
+    def opendatasoft_headers(api_key=None) -> dict:
+        """Request headers carrying an OpenDataSoft API key, if there is one."""
+        api_key = api_key or os.getenv("OPENDATASOFT_API_KEY")
+        return {"Authorization": f"Apikey {api_key}"} if api_key else {}
+
+    def resource_url(self, dataset_id, format_type):
+        """Resolve the download URL of a dataset resource in a given format."""
+        match self.app.explorer:
+            case hc.CkanCatExplorer():
+                dataset = self.memoized(self.app.explorer.show_package_info, dataset_id)
+                resources = self.app.explorer.extract_resource_url(dataset)
+            case hc.OpenDataSoftCatExplorer():
+                resources = self.memoized(
+                    self.app.explorer.show_dataset_export_options, dataset_id
+                )
+            case hc.FrenchGouvCatExplorer():
+                resources = self.french_resource_meta(dataset_id)
+            case _:
+                return None
+        return resolve_resource_url(resources, format_type)
+
+    def cached_load(self, load, dataset_id, format_type, *args, headers=None):
+        """
+        Load a dataset through the local Parquet cache.
+
+        Args:
+            load: One of the load_*_dataset methods
+            dataset_id: Dataset to load
+            format_type: Format to load it as
+            *args: Extra arguments for load
+            headers: Extra request headers used to check the resource version
+        Returns:
+            The dataset (or the loader's error message) and why it couldn't
+            be cached, if so
+        """
+        # Without a format the loader picks the resource itself, which may not
+        # be the one resource_url would key the cache on
+        url = self.resource_url(dataset_id, format_type) if format_type else None
+        if not url:
+            # Let the loader report what is missing
+            return load(dataset_id, format_type, *args), None
+        return self.app.dataset_cache.get_or_load(
+            url,
+            format_type,
+            lambda: load(dataset_id, format_type, *args),
+            http_session=getattr(self.app.session, "session", None),
+            headers=headers,
+        )
 
     def load_ckan_dataset(self, dataset_id, format_type):
         """Load a CKAN dataset into a Polars DataFrame"""
-        if not isinstance(self.app.explorer, CkanCatExplorer):
+        if not isinstance(self.app.explorer, hc.CkanCatExplorer):
             return "Not connected to a CKAN explorer. Use connect() first."
-        if not isinstance(self.app.loader, CkanLoader):
+        if not isinstance(self.app.loader, hc.CkanLoader):
             return "Not connected to a CKAN catalog"
         try:
-            dataset = self.app.explorer.show_package_info(dataset_id)
+            dataset = self.memoized(self.app.explorer.show_package_info, dataset_id)
             if not dataset:
                 raise ValueError(f"No dataset found with ID: {dataset_id}")
             resource_data = self.app.explorer.extract_resource_url(dataset)
@@ -101,16 +315,18 @@ class InputHandler:
 
     def load_opendatasoft_dataset(self, dataset_id, format_type, api_key=None):
         """Load an OpenDataSoft dataset into a Polars DataFrame"""
-        if not isinstance(self.app.explorer, OpenDataSoftCatExplorer):
+        if not isinstance(self.app.explorer, hc.OpenDataSoftCatExplorer):
             return "Not connected to a OpenDataSoft explorer. Use connect() first."
-        if not isinstance(self.app.loader, OpenDataSoftLoader):
+        if not isinstance(self.app.loader, hc.OpenDataSoftLoader):
             return "Not connected to an OpenDataSoft catalog"
 
         if api_key is None:
             api_key = os.getenv("OPENDATASOFT_API_KEY")
 
         try:
-            resource_data = self.app.explorer.show_dataset_export_options(dataset_id)
+            resource_data = self.memoized(
+                self.app.explorer.show_dataset_export_options, dataset_id
+            )
             if not resource_data:
                 raise ValueError(f"No dataset found with ID: {dataset_id}")
             return self.app.loader.polars_data_loader(
@@ -123,14 +339,13 @@ class InputHandler:
 
     def load_french_gouv_dataset(self, dataset_id, format_type):
         """Load an French Government dataset into a Polars DataFrame"""
-        if not isinstance(self.app.explorer, FrenchGouvCatExplorer):
+        if not isinstance(self.app.explorer, hc.FrenchGouvCatExplorer):
             return "Not connected to French Government explorer. Use connect() first."
-        if not isinstance(self.app.loader, FrenchGouvLoader):
+        if not isinstance(self.app.loader, hc.FrenchGouvLoader):
             return "Not connected to French Government catalog"
 
         try:
-            resource_data = self.app.explorer.get_dataset_meta(dataset_id)
-            data_to_load = self.app.explorer.get_dataset_resource_meta(resource_data)
+            data_to_load = self.french_resource_meta(dataset_id)
             if not data_to_load:
                 raise ValueError(f"No dataset found with ID: {dataset_id}")
             return self.app.loader.polars_data_loader(
@@ -143,89 +358,123 @@ class InputHandler:
 
     async def _handle_connect(self, cmd: list) -> None:
         """Handle the connect command."""
+        cmd, options = self.split_options(cmd)
         if len(cmd) < 2:
-            self.rich_log.write(
+            self.output.write(
                 Text("Please Specify a Catalog\n", style=Style(color="yellow"))
             )
-            self.rich_log.write(self.app.format_catalog_list())
+            self.output.write(self.app.format_catalog_list())
             return
 
         catalog = cmd[1].lower()
-        success, error, catalog_enum = await self.app.connect_to_catalog(catalog)
+        success, error, catalog_enum = await self.app.connect_to_catalog(
+            catalog, prefetch=options.get("prefetch", False)
+        )
 
         if not success:
-            self.rich_log.write(
+            self.output.write(
                 Text(f"Invalid Catalog: {catalog}\n", style=Style(color="red"))
             )
-            self.rich_log.write(self.app.format_catalog_list())
+            self.output.write(self.app.format_catalog_list())
             return
 
         # Update UI after successful connection
         self.app.update_catalog_button(catalog)
 
         catalog_type_name = self.app.session.catalogue_type
-        self.rich_log.write(
+        self.output.write(
             Text(
                 f"Connected to {catalog} ({catalog_type_name})\n",
                 style=Style(color="green"),
             )
         )
-        self.rich_log.write(
+        self.output.write(
             Text(f"URL: {catalog_enum.value}\n", style=Style(color="blue"))
         )
-        self.input.value = ""
-        self.app.set_timer(3, self.app.clear_log)
 
     async def _handle_close(self, cmd: list) -> None:
         """Handle the close command."""
 
         if not self.app.session:
-            self.rich_log.write(
+            self.output.write(
                 Text("No Active Connection...\n", style=Style(color="yellow"))
             )
-            self.input.value = ""
-            self.rich_log.write(
+            self.output.write(
                 Text("Please Specify a Catalog\n", style=Style(color="yellow"))
             )
-            self.rich_log.write(self.app.format_catalog_list())
+            self.output.write(self.app.format_catalog_list())
             return
 
         success, message, catalog_type = await self.app.close_catalog_connection()
 
         if not success:
-            self.rich_log.write(Text(f"{message}\n", style=Style(color="yellow")))
-            self.input.value = ""
-            self.app.set_timer(1, self.app.clear_log)
+            self.output.write(Text(f"{message}\n", style=Style(color="yellow")))
             return
 
-        # Remove button
-        if self.app.active_catalog_button:
-            self.app.active_catalog_button.remove()
-            self.app.active_catalog_button = None
-
         if self.app.data_table:
-            self.app.data_table.clear(columns=True)
+            self.app.data_table.clear()
 
         # Show close message
-        self.rich_log.write(
+        self.output.write(
             Text(
                 f"Connection Closed: {message} ({catalog_type})\n",
                 style=Style(color="green"),
             )
         )
-        self.input.value = ""
-        self.app.set_timer(1, self.app.clear_log)
+        if self.app.catalog_name:
+            # Another open connection took over
+            self.output.write(
+                Text(f"Using {self.app.catalog_name}\n", style=Style(color="green"))
+            )
+
+    async def _handle_use(self, cmd: list) -> None:
+        """Handle the use command, switching between open connections."""
+        if len(cmd) < 2:
+            if not len(self.app.sessions):
+                self.output.write(
+                    Text("No Active Connection...\n", style=Style(color="yellow"))
+                )
+                return
+            self.output.write(
+                Text("Open Connections\n\n", style=Style(color="green", bold=True))
+            )
+            connections = {
+                name: {
+                    "url": connection.url,
+                    "active": name == self.app.catalog_name,
+                    "idle": f"{connection.idle:.0f}s",
+                    "healthy": connection.healthy,
+                    **connection.stats,
+                }
+                for name, connection in self.app.sessions.connections.items()
+            }
+            self.output.write(
+                self.app.logger_handler.write_structured_data(connections)
+            )
+            return
+
+        catalog = cmd[1].lower()
+        if not self.app.use_catalog(catalog):
+            self.output.write(
+                Text(
+                    f"Not connected to {catalog}. Use 'connect {catalog}' first.\n",
+                    style=Style(color="yellow"),
+                )
+            )
+            return
+
+        self.app.update_catalog_button(catalog)
+        self.output.write(Text(f"Using {catalog}\n", style=Style(color="green")))
 
     async def _handle_quit(self, cmd: list) -> None:
         """Handle the quit command."""
-        if self.app.session:
-            self.app.session.close_session()
+        self.app.sessions.close_all()
         self.app.exit()
 
     async def _handle_list(self, cmd: list) -> None:
         """Handle the list command for different catalog types."""
         if not self.app.explorer:
-            self.rich_log.write(
+            self.output.write(
                 Text(
                     "No active connection. Please connect to a catalog first.\n",
                     style=Style(color="yellow"),
@@ -234,7 +483,7 @@ class InputHandler:
             return
 
         if len(cmd) < 2:
-            self.rich_log.write(
+            self.output.write(
                 Text(
                     "Please specify what to list (packages, datasets, orgs)\n",
                     style=Style(color="yellow"),
@@ -245,113 +494,119 @@ class InputHandler:
         subcommand = cmd[1].lower()
         try:
             match self.app.explorer:
-                case CkanCatExplorer():
+                case hc.CkanCatExplorer():
                     match subcommand:
                         case "packages":
-                            packages = self.app.explorer.get_package_list()
-                            self.rich_log.write(
+                            packages = await self.app.executor.run(
+                                self.cached_listing,
+                                "packages",
+                                self.app.explorer.get_package_list,
+                            )
+                            self.output.write(
                                 Text(
                                     f"Found {len(packages)} packages\n\n",
                                     style=Style(color="green", bold=True),
                                 )
                             )
-                            self.app.logger_handler.write_and_display_structured_data(
-                                packages
-                            )
+                            self.app.logger_handler.write_paginated(packages)
                         case "orgs":
-                            count, orgs = self.app.explorer.get_organisation_list()
-                            self.rich_log.write(
+                            count, orgs = await self.app.executor.run(
+                                self.cached_listing,
+                                "orgs",
+                                self.app.explorer.get_organisation_list,
+                            )
+                            self.output.write(
                                 Text(
                                     f"Found {count} organizations\n\n",
                                     style=Style(color="green", bold=True),
                                 )
                             )
-                            self.app.logger_handler.write_and_display_structured_data(
-                                orgs
-                            )
+                            self.app.logger_handler.write_paginated(orgs)
                         case _:
-                            self.rich_log.write(
+                            self.output.write(
                                 Text(
                                     f"Unknown list command: {subcommand}\n",
                                     style=Style(color="yellow"),
                                 )
                             )
 
-                case OpenDataSoftCatExplorer():
+                case hc.OpenDataSoftCatExplorer():
                     match subcommand:
                         case "datasets":
-                            datasets = self.app.explorer.fetch_all_datasets()
+                            datasets = await self.app.executor.run(
+                                self.cached_listing,
+                                "datasets",
+                                self.listing_calls(self.app.connection)["datasets"],
+                            )
                             if datasets:
-                                self.rich_log.write(
+                                self.output.write(
                                     Text(
                                         f"Found {len(datasets)} datasets\n\n",
                                         style=Style(color="green", bold=True),
                                     )
                                 )
-                                self.app.logger_handler.write_and_display_structured_data(
-                                    datasets
-                                )
+                                self.app.logger_handler.write_paginated(datasets)
                             else:
-                                self.rich_log.write(
+                                self.output.write(
                                     Text(
                                         "No datasets found\n",
                                         style=Style(color="yellow"),
                                     )
                                 )
                         case _:
-                            self.rich_log.write(
+                            self.output.write(
                                 Text(
                                     f"Unknown list command: {subcommand}\n",
                                     style=Style(color="yellow"),
                                 )
                             )
 
-                case FrenchGouvCatExplorer():
+                case hc.FrenchGouvCatExplorer():
                     match subcommand:
                         case "datasets":
-                            datasets = self.app.explorer.get_all_datasets()
+                            datasets = await self.app.executor.run(
+                                self.cached_listing,
+                                "datasets",
+                                self.listing_calls(self.app.connection)["datasets"],
+                            )
                             if datasets:
-                                self.rich_log.write(
+                                self.output.write(
                                     Text(
                                         f"Found {len(datasets)} datasets\n\n",
                                         style=Style(color="green", bold=True),
                                     )
                                 )
-                                datasets_formatted = (
-                                    self.app.logger_handler.write_structured_data(
-                                        datasets
-                                    )
-                                )
-                                self.rich_log.write(datasets_formatted)
+                                self.app.logger_handler.write_paginated(datasets)
                             else:
-                                self.rich_log.write(
+                                self.output.write(
                                     Text(
                                         "No datasets found\n",
                                         style=Style(color="yellow"),
                                     )
                                 )
                         case "orgs":
-                            orgs = self.app.explorer.get_all_organisations()
+                            orgs = await self.app.executor.run(
+                                self.cached_listing,
+                                "orgs",
+                                self.app.explorer.get_all_organisations,
+                            )
                             if orgs:
-                                self.rich_log.write(
+                                self.output.write(
                                     Text(
                                         f"Found {len(orgs)} organizations\n\n",
                                         style=Style(color="green", bold=True),
                                     )
                                 )
-                                orgs_formatted = (
-                                    self.app.logger_handler.write_structured_data(orgs)
-                                )
-                                self.rich_log.write(orgs_formatted)
+                                self.app.logger_handler.write_paginated(orgs)
                             else:
-                                self.rich_log.write(
+                                self.output.write(
                                     Text(
                                         "No organizations found\n",
                                         style=Style(color="yellow"),
                                     )
                                 )
                         case _:
-                            self.rich_log.write(
+                            self.output.write(
                                 Text(
                                     f"Unknown list command: {subcommand}\n",
                                     style=Style(color="yellow"),
@@ -359,12 +614,12 @@ class InputHandler:
                             )
 
         except Exception as e:
-            self.rich_log.write(Text(f"Error: {str(e)}\n", style=Style(color="red")))
+            self.output.write(Text(f"Error: {str(e)}\n", style=Style(color="red")))
 
     async def _handle_info(self, cmd: list) -> None:
         """Handle info commands for different catalog types."""
         if not self.app.explorer:
-            self.rich_log.write(
+            self.output.write(
                 Text(
                     "No active connection. Please connect to a catalog first.\n",
                     style=Style(color="yellow"),
@@ -373,7 +628,7 @@ class InputHandler:
             return
 
         if len(cmd) < 3:
-            self.rich_log.write(
+            self.output.write(
                 Text(
                     "Please provide both command type (package/dataset/resource) and ID\n",
                     style=Style(color="yellow"),
@@ -387,65 +642,78 @@ class InputHandler:
 
         try:
             match self.app.explorer:
-                case CkanCatExplorer() if command == "package":
+                case hc.CkanCatExplorer() if command == "package":
                     match subcommand:
                         case "info":
-                            info = self.app.explorer.show_package_info(identifier)
+                            info = await self.app.executor.run(
+                                self.memoized,
+                                self.app.explorer.show_package_info,
+                                identifier,
+                            )
                             info_formatted = (
                                 self.app.logger_handler.write_structured_data(info)
                             )
-                            self.rich_log.write(info_formatted)
+                            self.output.write(info_formatted)
                         case _:
-                            self.rich_log.write(
+                            self.output.write(
                                 Text(
                                     f"Unknown package command: {subcommand}\n",
                                     style=Style(color="yellow"),
                                 )
                             )
 
-                case OpenDataSoftCatExplorer() if command == "dataset":
+                case hc.OpenDataSoftCatExplorer() if command == "dataset":
                     match subcommand:
                         case "info":
-                            info = self.app.explorer.show_dataset_info(identifier)
+                            info = await self.app.executor.run(
+                                self.memoized,
+                                self.app.explorer.show_dataset_info,
+                                identifier,
+                            )
                             info_formatted = (
                                 self.app.logger_handler.write_structured_data(info)
                             )
-                            self.rich_log.write(info_formatted)
+                            self.output.write(info_formatted)
                         case "export":
-                            options = self.app.explorer.show_dataset_export_options(
-                                identifier
+                            options = await self.app.executor.run(
+                                self.memoized,
+                                self.app.explorer.show_dataset_export_options,
+                                identifier,
                             )
                             options_formatted = (
                                 self.app.logger_handler.write_structured_data(options)
                             )
-                            self.rich_log.write(options_formatted)
+                            self.output.write(options_formatted)
                         case _:
-                            self.rich_log.write(
+                            self.output.write(
                                 Text(
                                     f"Unknown dataset command: {subcommand}\n",
                                     style=Style(color="yellow"),
                                 )
                             )
 
-                case FrenchGouvCatExplorer():
+                case hc.FrenchGouvCatExplorer():
                     match command, subcommand:
                         case "dataset", "meta":
-                            meta = self.app.explorer.get_dataset_meta(identifier)
+                            meta = await self.app.executor.run(
+                                self.memoized,
+                                self.app.explorer.get_dataset_meta,
+                                identifier,
+                            )
                             meta_formatted = (
                                 self.app.logger_handler.write_structured_data(meta)
                             )
-                            self.rich_log.write(meta_formatted)
+                            self.output.write(meta_formatted)
                         case "resource", "meta":
-                            input_meta = self.app.explorer.get_dataset_meta(identifier)
-                            meta = self.app.explorer.get_dataset_resource_meta(
-                                input_meta
+                            meta = await self.app.executor.run(
+                                self.french_resource_meta, identifier
                             )
                             meta_formatted = (
                                 self.app.logger_handler.write_structured_data(meta)
                             )
-                            self.rich_log.write(meta_formatted)
+                            self.output.write(meta_formatted)
                         case _:
-                            self.rich_log.write(
+                            self.output.write(
                                 Text(
                                     f"Unknown {command} command: {subcommand}\n",
                                     style=Style(color="yellow"),
@@ -453,7 +721,7 @@ class InputHandler:
                             )
 
                 case _:
-                    self.rich_log.write(
+                    self.output.write(
                         Text(
                             f"Current explorer doesn't support {command} info commands\n",
                             style=Style(color="yellow"),
@@ -461,12 +729,14 @@ class InputHandler:
                     )
 
         except Exception as e:
-            self.rich_log.write(Text(f"Error: {str(e)}\n", style=Style(color="red")))
+            self.output.write(Text(f"Error: {str(e)}\n", style=Style(color="red")))
 
     async def _handle_load(self, cmd: list) -> None:
         """Handle the load command for different catalog types."""
+        cmd, options = self.split_options(cmd)
+
         if not self.app.explorer:
-            self.rich_log.write(
+            self.output.write(
                 Text(
                     "No active connection. Please connect to a catalog first.\n",
                     style=Style(color="yellow"),
@@ -475,104 +745,396 @@ class InputHandler:
             return
 
         if len(cmd) < 2:
-            self.rich_log.write(
+            self.output.write(
                 Text("Please provide the dataset ID\n", style=Style(color="yellow"))
             )
             return
 
         dataset_id = cmd[1]
 
+        rows = None
+        if "rows" in options:
+            rows = int(options["rows"]) if str(options["rows"]).isdigit() else 0
+            if rows < 1:
+                self.output.write(
+                    Text("--rows expects a positive number\n", style=Style(color="red"))
+                )
+                return
+
         try:
+            if "stream" in options or "preview" in options:
+                await self._stream_load(
+                    cmd, rows or PREVIEW_ROWS, full="preview" not in options
+                )
+                return
+
             # Load data based on explorer type
-            df = None
+            df = cache_error = None
             match self.app.explorer:
-                case CkanCatExplorer():
+                case hc.CkanCatExplorer():
                     format_type = cmd[2] if len(cmd) > 2 else None
-                    df = self.load_ckan_dataset(dataset_id, format_type)
-                case OpenDataSoftCatExplorer():
+                    df, cache_error = await self.app.executor.run(
+                        self.cached_load,
+                        self.load_ckan_dataset,
+                        dataset_id,
+                        format_type,
+                    )
+                case hc.OpenDataSoftCatExplorer():
                     format_type = cmd[2] if len(cmd) > 2 else "csv"
                     api_key = cmd[3] if len(cmd) > 3 else None
-                    df = self.load_opendatasoft_dataset(
-                        dataset_id, format_type, api_key
+                    df, cache_error = await self.app.executor.run(
+                        self.cached_load,
+                        self.load_opendatasoft_dataset,
+                        dataset_id,
+                        format_type,
+                        api_key,
+                        headers=self.opendatasoft_headers(api_key),
                     )
-                case FrenchGouvCatExplorer():
+                case hc.FrenchGouvCatExplorer():
                     format_type = cmd[2] if len(cmd) > 2 else "csv"
-                    df = self.load_french_gouv_dataset(dataset_id, format_type)
+                    df, cache_error = await self.app.executor.run(
+                        self.cached_load,
+                        self.load_french_gouv_dataset,
+                        dataset_id,
+                        format_type,
+                    )
                 case _:
                     raise ValueError("Unsupported catalog type")
 
             if isinstance(df, str):
                 # Handle error message
-                self.rich_log.write(Text(df + "\n", style=Style(color="red")))
+                self.output.write(Text(df + "\n", style=Style(color="red")))
                 return
 
-            # Display success message and metadata in RichLog
-            self.rich_log.write(
+            # --rows only limits the table; sql queries the whole dataset
+            shown = df.head(rows) if rows else df
+            self._show_frame(shown, "Data Loaded Successfully ✅\n")
+            await self._register_frame(dataset_id, df)
+            if cache_error:
+                self.output.write(Text(cache_error + "\n", style=Style(color="yellow")))
+
+        except Exception as e:
+            self.output.write(
+                Text(f"Error loading data: {str(e)}\n", style=Style(color="red"))
+            )
+
+    def _show_frame(self, df, heading: str) -> None:
+        """Write a frame's schema to the log and show it in the table."""
+        self.app.clear_log()
+
+        # Display heading and metadata in RichLog
+        self.output.write(Text(heading, style=Style(color="green", bold=True)))
+        self.output.write(
+            Text(
+                "\nDATA COLUMNS AND DATA TYPES\n",
+                style=Style(color="cyan", bold=True),
+            )
+        )
+
+        # Format column info
+        for col, dtype in zip(df.columns, df.dtypes):
+            self.output.write(Text(f"{col}: {dtype}\n", style=Style(color="white")))
+
+        # Hand the frame to the table, which only renders the rows in view
+        self.app.data_table.set_frame(df)
+
+        # Focus the data table
+        self.app.data_table.focus()
+
+    async def _register_frame(self, dataset_id: str, df) -> None:
+        """Make a loaded frame queryable with the sql command."""
+        name = table_name(dataset_id)
+        await self.app.executor.run(self.app.sql_engine.register, name, df)
+        self.output.write(
+            Text(
+                f"\nQuery it with: sql SELECT * FROM {name}\n",
+                style=Style(color="blue"),
+            )
+        )
+
+    async def _stream_load(self, cmd: list, preview_rows: int, full: bool) -> None:
+        """Load a CSV resource incrementally, showing the first rows early."""
+        dataset_id = cmd[1]
+        format_type = cmd[2] if len(cmd) > 2 else "csv"
+        if format_type.lower() != "csv":
+            self.output.write(
                 Text(
-                    "Data Loaded Successfully ✅\n",
-                    style=Style(color="green", bold=True),
+                    "Streaming is only supported for csv resources\n",
+                    style=Style(color="yellow"),
                 )
             )
-            self.rich_log.write(
+            return
+
+        headers = {}
+        if isinstance(self.app.explorer, hc.OpenDataSoftCatExplorer):
+            headers = self.opendatasoft_headers(cmd[3] if len(cmd) > 3 else None)
+
+        url = await self.app.executor.run(self.resource_url, dataset_id, format_type)
+        if not url:
+            self.output.write(
                 Text(
-                    "\nDATA COLUMNS AND DATA TYPES\n",
-                    style=Style(color="cyan", bold=True),
+                    f"No {format_type} resource found for dataset: {dataset_id}\n",
+                    style=Style(color="red"),
                 )
             )
+            return
 
-            # Format column info
-            for col, dtype in zip(df.columns, df.dtypes):
-                self.rich_log.write(
-                    Text(f"{col}: {dtype}\n", style=Style(color="white"))
-                )
+        http_session = getattr(self.app.session, "session", None)
+        cache_path = None
+        if full:
+            cache_path = await self.app.executor.run(
+                self.app.dataset_cache.entry, url, format_type, http_session, headers
+            )
+            df = await self.app.executor.run(self.app.dataset_cache.read, cache_path)
+            if df is not None:
+                self._show_frame(df, f"Data Loaded from cache ✅ ({df.height} rows)\n")
+                await self._register_frame(dataset_id, df)
+                return
 
-            # Update DataTable
-            # Clear existing data
-            self.app.data_table.clear()
+        def on_preview(preview):
+            # Called from the download thread as soon as the first rows arrive.
+            # Run in the command's context, so the log handler credits the
+            # output to this command rather than to none
+            self.app.call_from_thread(
+                contextvars.copy_context().run,
+                self._show_frame,
+                preview,
+                f"Preview of first {preview.height} rows - still loading... ⏳\n",
+            )
 
-            # Add columns
-            self.app.data_table.add_columns(*[str(col) for col in df.columns])
+        try:
+            df = await self.app.executor.run(
+                stream_csv,
+                url,
+                preview_rows,
+                on_preview,
+                full=full,
+                http_session=http_session,
+                headers=headers,
+            )
+        except CommandCancelled:
+            return
 
-            # Add rows - using Polars row iteration
-            for row in df.head(100).iter_rows():
-                self.app.data_table.add_row(*[str(val) for val in row])
+        if full:
+            self._show_frame(df, f"Data Loaded Successfully ✅ ({df.height} rows)\n")
+            await self._register_frame(dataset_id, df)
+            cache_error = await self.app.executor.run(
+                self.app.dataset_cache.write, cache_path, df
+            )
+            if cache_error:
+                self.output.write(Text(cache_error + "\n", style=Style(color="yellow")))
+        else:
+            self._show_frame(df, f"Preview of first {df.height} rows ✅\n")
 
-            # Focus the data table
-            self.app.data_table.focus()
+    async def _handle_sql(self, cmd: list, command_text: str) -> None:
+        """Handle the sql command, querying loaded datasets with DuckDB."""
+        query = command_text.strip()[len(cmd[0]) :].strip()
+        tables = self.app.loaded_frames
 
-        except Exception as e:
-            self.rich_log.write(
-                Text(f"Error loading data: {str(e)}\n", style=Style(color="red"))
+        if not query:
+            if not tables:
+                self.output.write(
+                    Text(
+                        "No datasets loaded yet. Use 'load <id>' first.\n",
+                        style=Style(color="yellow"),
+                    )
+                )
+                return
+            self.output.write(
+                Text("Loaded Tables\n\n", style=Style(color="green", bold=True))
             )
+            self.output.write(
+                self.app.logger_handler.write_structured_data(
+                    {
+                        name: {"rows": df.height, "columns": df.width}
+                        for name, df in tables.items()
+                    }
+                )
+            )
+            return
 
-    async def _handle_search(self, cmd: list) -> None:
-        """Handle search commands for different catalog types."""
-        if not self.app.explorer:
-            self.rich_log.write(
+        started = time.perf_counter()
+        try:
+            df = await self.app.executor.run(self.app.sql_engine.query, query)
+        except Exception as e:
+            self.output.write(Text(f"SQL error: {str(e)}\n", style=Style(color="red")))
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self._show_frame(
+            df, f"Query returned {df.height} rows in {elapsed:.1f} ms ✅\n"
+        )
+
+    async def _handle_profile(self, cmd: list, command_text: str) -> None:
+        """Handle profile [--out <file>] [--top <n>] <command>."""
+        usage = Text(
+            "Usage: profile [--out <file.prof>] [--top <n>] <command>\n",
+            style=Style(color="yellow"),
+        )
+        command = command_text.strip()[len(cmd[0]) :].strip()
+        options = {}
+        words = command.split(maxsplit=2)
+        while len(words) == 3 and words[0] in PROFILE_OPTIONS:
+            options[words[0]] = words[1]
+            command = words[2]
+            words = command.split(maxsplit=2)
+        top = options.get("--top", str(PROFILE_ROWS))
+        first = words[0].lower() if words else ""
+        if first in {"", "profile", *PROFILE_OPTIONS} or not top.isdigit():
+            self.output.write(usage)
+            return
+        if self.profiling:
+            self.output.write(
                 Text(
-                    "No active connection. Please connect to a catalog first.\n",
+                    "Another command is already being profiled\n",
                     style=Style(color="yellow"),
                 )
             )
             return
 
+        profile = CommandProfile(command)
+        try:
+            profile.start()
+        except ValueError as e:
+            # Another profiler (e.g. a debugger) is already active
+            self.output.write(
+                Text(f"Could not start profiler: {str(e)}\n", style=Style(color="red"))
+            )
+            return
+        self.profiling = True
+        token = current_profile.set(profile)
+        try:
+            await self.handle_command(command)
+        finally:
+            profile.stop()
+            current_profile.reset(token)
+            self.profiling = False
+
+        stats = await self.app.executor.run(profile.stats)
+        self._show_profile(profile, stats, int(top))
+        if "--out" in options:
+            path = os.path.expanduser(options["--out"])
+            try:
+                await self.app.executor.run(stats.dump_stats, path)
+            except OSError as e:
+                self.output.write(
+                    Text(
+                        f"Could not save profile: {str(e)}\n",
+                        style=Style(color="red"),
+                    )
+                )
+                return
+            self.output.write(
+                Text(
+                    f"Profile saved to {path} (open with pstats or snakeviz)\n",
+                    style=Style(color="green"),
+                )
+            )
+
+    def _show_profile(self, profile: CommandProfile, stats, rows: int) -> None:
+        """Summarise a command profile in the secondary log panel."""
+        panel = self.app.profile_output()
+        panel.write(
+            Text(
+                f"Profile of '{profile.text}': {profile.elapsed:.3f} s, "
+                f"{profile.thread_calls} pool thread calls\n",
+                style=Style(color="green", bold=True),
+            )
+        )
+        if profile.unprofiled:
+            panel.write(
+                Text(
+                    f"{profile.unprofiled} pool thread calls could not be profiled\n",
+                    style=Style(color="yellow"),
+                )
+            )
+
+        # Own time never overlaps, so it splits cleanly by package
+        total = sum(stat[2] for stat in stats.stats.values()) or 1
+        panel.write(
+            Text("\nSelf time by package\n", style=Style(color="cyan", bold=True))
+        )
+        for package, seconds in self_time_by_package(stats):
+            panel.write(
+                Text(
+                    f"  {package:<28} {seconds:8.3f} s {seconds / total:6.1%}\n",
+                    style=Style(color="white"),
+                )
+            )
+
+        panel.write(
+            Text(
+                "\nTop functions by cumulative time\n",
+                style=Style(color="cyan", bold=True),
+            )
+        )
+        panel.write(
+            Text(
+                f"  {'calls':>8} {'own s':>8} {'cum s':>8}  function\n",
+                style=Style(color="yellow"),
+            )
+        )
+        for row in top_cumulative(stats, rows):
+            panel.write(
+                Text(
+                    f"  {row['calls']:>8} {row['own']:8.3f} {row['cumulative']:8.3f}"
+                    f"  {row['function']}\n",
+                    style=Style(color="white"),
+                )
+            )
+
+    async def _handle_search(self, cmd: list) -> None:
+        """
+        Handle search commands.
+
+        Searches the local index when the current catalogue has been indexed,
+        or every indexed catalogue when there is no connection, and falls
+        back to the remote CKAN search otherwise. With --all, every catalogue
+        is searched remotely at once.
+        """
+        cmd, options = self.split_options(cmd)
         if len(cmd) < 2:
-            self.rich_log.write(
+            self.output.write(
                 Text("Please provide a search query\n", style=Style(color="yellow"))
             )
             return
 
         query = cmd[1]
-        num_rows = (
-            int(cmd[2]) if len(cmd) > 2 else 10
-        )  # Default to 10 results if not specified
+        try:
+            # Default to 10 results if not specified
+            num_rows = int(cmd[2]) if len(cmd) > 2 else 10
+        except ValueError as ve:
+            self.output.write(
+                Text(f"Invalid input: {str(ve)}\n", style=Style(color="red"))
+            )
+            return
+
+        if options.get("all"):
+            await self._search_all(query, num_rows)
+            return
+
+        indexed = await self.app.executor.run(self.app.search_index.indexed_catalogues)
+        if self.app.catalog_name in indexed or (not self.app.explorer and indexed):
+            await self._search_index(query, num_rows)
+            return
+
+        if not self.app.explorer:
+            self.output.write(
+                Text(
+                    "No active connection. Please connect to a catalog first.\n",
+                    style=Style(color="yellow"),
+                )
+            )
+            return
 
         try:
             match self.app.explorer:
-                case CkanCatExplorer():
-                    results = self.app.explorer.package_search_condense(query, num_rows)
+                case hc.CkanCatExplorer():
+                    results = await self.app.executor.run(
+                        self.app.explorer.package_search_condense, query, num_rows
+                    )
                     if results:
-                        self.rich_log.write(
+                        self.output.write(
                             Text(
                                 f"Found matches for: '{query}'\n\n",
                                 style=Style(color="green", bold=True),
@@ -581,26 +1143,248 @@ class InputHandler:
                         results_formatted = (
                             self.app.logger_handler.write_structured_data(results)
                         )
-                        self.rich_log.write(results_formatted)
+                        self.output.write(results_formatted)
                     else:
-                        self.rich_log.write(
+                        self.output.write(
                             Text(
                                 "No matching packages found\n",
                                 style=Style(color="yellow"),
                             )
                         )
                 case _:
-                    self.rich_log.write(
+                    self.output.write(
                         Text(
-                            "Search not supported for this catalog type\n",
+                            "Remote search not supported for this catalog type. "
+                            "Run 'index build' to search it locally\n",
                             style=Style(color="yellow"),
                         )
                     )
         except ValueError as ve:
-            self.rich_log.write(
+            self.output.write(
                 Text(f"Invalid input: {str(ve)}\n", style=Style(color="red"))
             )
         except Exception as e:
-            self.rich_log.write(
+            self.output.write(
                 Text(f"Error during search: {str(e)}\n", style=Style(color="red"))
             )
+
+    async def _search_all(self, query: str, num_rows: int) -> None:
+        """Search every catalogue concurrently, reporting each as it responds."""
+        catalogs = [
+            (name, catalog_type, catalog_enum.value)
+            for name, (catalog_type, catalog_enum) in self.app.catalogs.items()
+        ]
+        self.output.write(
+            Text(
+                f"Searching {len(catalogs)} catalogs for '{query}'...\n\n",
+                style=Style(color="blue"),
+            )
+        )
+
+        responses = []
+        async for response in self.app.federated_search.search(
+            catalogs, query, num_rows
+        ):
+            responses.append(response)
+            latency = f"{response.latency * 1000:.0f} ms"
+            if response.error:
+                self.output.write(
+                    Text(
+                        f"✗ {response.catalogue:<24} {latency:>8}  "
+                        f"{response.error}\n",
+                        style=Style(color="red"),
+                    )
+                )
+                continue
+
+            line = Text(f"✓ {response.catalogue:<24} {latency:>8}  ")
+            line.stylize(Style(color="green"), 0, 26)
+            line.append(
+                f"{len(response.results)} results\n", style=Style(color="white")
+            )
+            for result in response.results[:3]:
+                line.append(f"    {result['title']}", style=Style(color="cyan"))
+                line.append(f" ({result['id']})\n", style=Style(color="bright_black"))
+            self.output.write(line)
+
+        merged = FederatedSearch.merge(responses, query, limit=num_rows)
+        if not merged:
+            self.output.write(
+                Text("\nNo matching datasets found\n", style=Style(color="yellow"))
+            )
+            return
+
+        self.output.write(
+            Text(
+                f"\nTop {len(merged)} matches across catalogs\n\n",
+                style=Style(color="green", bold=True),
+            )
+        )
+        self.output.write(self.app.logger_handler.write_structured_data(merged))
+
+    async def _search_index(self, query: str, num_rows: int) -> None:
+        """Search the local index, within the current catalogue if connected."""
+        started = time.perf_counter()
+        results = await self.app.executor.run(
+            self.app.search_index.search, query, self.app.catalog_name, num_rows
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if not results:
+            self.output.write(
+                Text(
+                    f"No indexed datasets match '{query}' ({elapsed:.1f} ms)\n",
+                    style=Style(color="yellow"),
+                )
+            )
+            return
+
+        scope = self.app.catalog_name or "all indexed catalogs"
+        self.output.write(
+            Text(
+                f"{len(results)} matches for '{query}' in {scope} "
+                f"({elapsed:.1f} ms)\n\n",
+                style=Style(color="green", bold=True),
+            )
+        )
+        self.output.write(self.app.logger_handler.write_structured_data(results))
+
+    async def _handle_index(self, cmd: list) -> None:
+        """Handle the index command."""
+        subcommand = cmd[1].lower() if len(cmd) > 1 else ""
+
+        match subcommand:
+            case "build":
+                if not self.app.catalog_name:
+                    self.output.write(
+                        Text(
+                            "No active connection. Please connect to a catalog "
+                            "first.\n",
+                            style=Style(color="yellow"),
+                        )
+                    )
+                    return
+
+                catalog = self.app.catalog_name
+                catalog_type, catalog_enum = self.app.catalogs[catalog]
+                self.output.write(
+                    Text(f"Indexing {catalog}...\n", style=Style(color="blue"))
+                )
+                try:
+                    count = await self.app.executor.run(
+                        self.app.search_index.build,
+                        catalog,
+                        catalog_type,
+                        catalog_enum.value,
+                        getattr(self.app.session, "session", None),
+                    )
+                except CommandCancelled:
+                    self.output.write(
+                        Text("Indexing cancelled\n", style=Style(color="yellow"))
+                    )
+                    return
+                except Exception as e:
+                    self.output.write(
+                        Text(
+                            f"Error building index: {str(e)}\n",
+                            style=Style(color="red"),
+                        )
+                    )
+                    return
+                self.output.write(
+                    Text(
+                        f"Indexed {count} datasets from {catalog}\n",
+                        style=Style(color="green"),
+                    )
+                )
+            case "stats":
+                indexed = await self.app.executor.run(
+                    self.app.search_index.indexed_catalogues
+                )
+                self.output.write(
+                    Text("Search Index\n\n", style=Style(color="green", bold=True))
+                )
+                if not indexed:
+                    self.output.write(
+                        Text("No catalogs indexed yet\n", style=Style(color="yellow"))
+                    )
+                    return
+                self.output.write(
+                    self.app.logger_handler.write_structured_data(indexed)
+                )
+            case _:
+                self.output.write(
+                    Text(
+                        "Please specify an index command (build, stats)\n",
+                        style=Style(color="yellow"),
+                    )
+                )
+
+    async def _handle_next(self, cmd: list) -> None:
+        """Handle the next page command."""
+        # The next page adds to the listing already on display
+        self.app.logger_handler.continue_page()
+        if not self.app.logger_handler.write_next_page():
+            self.output.write(
+                Text("No more entries to show\n", style=Style(color="yellow"))
+            )
+
+    async def _handle_history(self, cmd: list) -> None:
+        """Handle the history command."""
+        if len(cmd) < 2 or cmd[1].lower() != "stats":
+            self.output.write(
+                Text(
+                    "Please specify a history command (stats)\n",
+                    style=Style(color="yellow"),
+                )
+            )
+            return
+
+        stats = self.app.logger_handler.history.stats()
+        self.output.write(
+            Text("Log History\n\n", style=Style(color="green", bold=True))
+        )
+        self.output.write(self.app.logger_handler.write_structured_data(stats))
+
+    async def _handle_cache(self, cmd: list) -> None:
+        """Handle the cache command."""
+        subcommand = cmd[1].lower() if len(cmd) > 1 else ""
+
+        match subcommand:
+            case "stats":
+                stats = await self.app.executor.run(self.app.metadata_cache.stats)
+                stats["session-memo"] = self.app.explorer_memo.stats()
+                stats["datasets"] = await self.app.executor.run(
+                    self.app.dataset_cache.stats
+                )
+                self.output.write(
+                    Text("Metadata Cache\n\n", style=Style(color="green", bold=True))
+                )
+                stats_formatted = self.app.logger_handler.write_structured_data(stats)
+                self.output.write(stats_formatted)
+            case "clear" if len(cmd) > 2 and cmd[2].lower() == "datasets":
+                removed = await self.app.executor.run(self.app.dataset_cache.clear)
+                self.output.write(
+                    Text(
+                        f"Removed {removed} cached datasets\n",
+                        style=Style(color="green"),
+                    )
+                )
+            case "clear":
+                catalog = cmd[2].lower() if len(cmd) > 2 else None
+                removed = await self.app.executor.run(
+                    self.app.metadata_cache.clear, catalog
+                )
+                self.output.write(
+                    Text(
+                        f"Removed {removed} cached listings\n",
+                        style=Style(color="green"),
+                    )
+                )
+            case _:
+                self.output.write(
+                    Text(
+                        "Please specify a cache command (stats, clear)\n",
+                        style=Style(color="yellow"),
+                    )
+                )
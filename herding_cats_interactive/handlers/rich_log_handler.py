@@ -1,16 +1,89 @@
-from rich.text import Text
+import functools
+import threading
+
+from collections import OrderedDict
+
+from rich.control import strip_control_codes
+from rich.text import Span, Text
 from rich.style import Style
 from textual.widgets import RichLog
 from typing import Any
-from collections import deque
-from typing import Deque, Optional
+from typing import Callable, Iterable, List, Optional, Set
+
+from herding_cats_interactive.handlers.command_scheduler import current_command
+from herding_cats_interactive.handlers.history_store import HistoryStore, text_size
+
+
+_HEADER_STYLE = Style(color="yellow")
+_LABEL_STYLE = Style(color="cyan", bold=True)
+_KEY_STYLE = Style(color="white")
+_VALUE_STYLE = Style(color="green")
+
+
+def _locked(method):
+    """Run a handler method holding the handler's lock."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class _TextBuffer:
+    """Accumulates plain text and style spans for a single Text."""
+
+    __slots__ = ("parts", "spans", "length")
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.spans: List[Span] = []
+        self.length = 0
+
+    def append(self, text: str, style: Optional[Style] = None) -> None:
+        # Text drops control codes such as \r, so measure without them or
+        # every later span would be shifted
+        text = strip_control_codes(text)
+        end = self.length + len(text)
+        if style is not None and text:
+            self.spans.append(Span(self.length, end, style))
+        self.parts.append(text)
+        self.length = end
+
+    def to_text(self) -> Text:
+        return Text("".join(self.parts), spans=self.spans)
 
 
 class ExtendedRichLogHandler:
-    def __init__(self, log_display: RichLog):
+    PAGE_SIZE = 500
+
+    def __init__(self, log_display: RichLog, history_budget: Optional[int] = None):
         self._rich_log = log_display
-        self._history: Deque[Text] = deque(maxlen=100000)
-        self._current_position: int = -1
+        # Writes are expected on the event loop (the loguru sink hands them
+        # over), but the lock keeps the live page, the page being viewed and
+        # the spill file consistent should one arrive from a pool thread
+        self._lock = threading.RLock()
+        # Each history page holds everything written for one command, keyed
+        # by an increasing page number so any page is reached in one lookup
+        self.history = HistoryStore(memory_budget=history_budget)
+        self._live: List[Text] = []
+        self._live_bytes = 0
+        # Page being browsed with show_previous/show_next, None when live
+        self._viewing: Optional[int] = None
+        self._listing: List[Any] = []
+        self._listing_is_dict = False
+        self._listing_is_names = False
+        self._listing_position = 0
+        self._page_size = self.PAGE_SIZE
+        # Commands run concurrently, but the live page shows one command's
+        # output at a time: the owner's writes are shown as they arrive, the
+        # others' are held back until the owner finishes
+        self._owner: Optional[int] = None
+        self._pending: OrderedDict[int, List[Callable[[], None]]] = OrderedDict()
+        # Commands that have ended; background work they started may still
+        # write, and must not take the live page with no finish to release it
+        self._finished: Set[int] = set()
         self.styles = {
             "INFO": Style(color="blue"),
             "SUCCESS": Style(color="green"),
@@ -21,86 +94,184 @@ class ExtendedRichLogHandler:
 
     def write_structured_data(self, data: Any, indent: int = 0) -> Text:
         """
-        Recursively format structured data with proper indentation.
+        Format structured data with proper indentation.
+
+        Everything is rendered in one pass into a single buffer of strings
+        and spans, so the cost is linear in the size of the output however
+        deeply the data is nested.
         Args:
             data: The data to format
             indent: Current indentation level
         Returns:
             Text: A Rich Text object with colored formatting
         """
+        buffer = _TextBuffer()
+        self._render_structured(buffer, data, indent)
+        return buffer.to_text()
+
+    def _render_structured(self, buffer: "_TextBuffer", data: Any, indent: int):
+        """Append the formatted data to the buffer."""
         indent_str = " " * indent
-        result = Text()
+        append = buffer.append
 
         if isinstance(data, (list, tuple)):
             if not data:  # Handle empty lists
-                result.append(f"{indent_str}(empty)\n")
-                return result
+                append(f"{indent_str}(empty)\n")
+                return
 
             # For packages list, handle it as a special case
             if all(isinstance(x, str) for x in data):
-                for i, item in enumerate(data, 1):
-                    # Format each package name nicely
-                    package_name = item.strip("-").replace("-", " ").title()
-                    result.append(f"{indent_str}{i}. {package_name}\n")
-                return result
+                self._render_names(buffer, data, indent)
+                return
 
             # For other lists
-            for item in data:
-                result.append(f"{indent_str}• ")
-                result.append(self.write_structured_data(item, indent + 2))
-            return result
+            self._render_items(buffer, data, indent)
 
         elif isinstance(data, dict):
             if not data:  # Handle empty dicts
-                result.append(f"{indent_str}(empty dictionary)\n")
-                return result
+                append(f"{indent_str}(empty dictionary)\n")
+                return
 
             # Add a header for the dictionary
-            result.append(
+            append(
                 f"{indent_str}Dictionary containing {len(data)} items:\n",
-                style=Style(color="yellow"),
+                _HEADER_STYLE,
             )
 
-            # For each key-value pair, format nicely with colors
-            for key, value in data.items():
-                # Clean up the key name
-                clean_key = key.strip("-").replace("-", " ").title()
+            self._render_pairs(buffer, data.items(), indent)
 
-                # Start the line with indentation
-                result.append(f"{indent_str}")
+        else:
+            # Handle basic types
+            value = str(data).strip()
+            # If it's a package name, clean it up
+            if isinstance(data, str) and "-" in value:
+                value = value.strip("-").replace("-", " ").title()
+            append(f"{indent_str}{value}\n")
 
-                # Add "Key:" label in blue
-                result.append("Key: ", style=Style(color="cyan", bold=True))
-                # Add the actual key in white
-                result.append(f"{clean_key}", style=Style(color="white"))
+    @staticmethod
+    def _render_names(
+        buffer: "_TextBuffer", names: Iterable[str], indent: int, start: int = 1
+    ):
+        """Append a numbered list of package names."""
+        indent_str = " " * indent
+        for i, item in enumerate(names, start):
+            # Format each package name nicely
+            package_name = item.strip("-").replace("-", " ").title()
+            buffer.append(f"{indent_str}{i}. {package_name}\n")
 
-                # Add separator
-                result.append(" | ")
+    def _render_items(self, buffer: "_TextBuffer", items: Iterable, indent: int):
+        """Append a bulleted list of structured items."""
+        indent_str = " " * indent
+        for item in items:
+            buffer.append(f"{indent_str}• ")
+            self._render_structured(buffer, item, indent + 2)
 
-                # Add "Value:" label in blue
-                result.append("Value: ", style=Style(color="cyan", bold=True))
+    def _render_pairs(self, buffer: "_TextBuffer", pairs: Iterable[tuple], indent: int):
+        """Append key-value pairs, formatted nicely with colors."""
+        indent_str = " " * indent
+        append = buffer.append
+        for key, value in pairs:
+            # Clean up the key name
+            clean_key = key.strip("-").replace("-", " ").title()
+
+            append(indent_str)
+            append("Key: ", _LABEL_STYLE)
+            append(clean_key, _KEY_STYLE)
+            append(" | ")
+            append("Value: ", _LABEL_STYLE)
+
+            # Handle the value based on its type
+            if isinstance(value, (dict, list, tuple)):
+                append("\n")
+                self._render_structured(buffer, value, indent + 2)
+            else:
+                append(f"{value}\n", _VALUE_STYLE)
+
+    @_locked
+    def write_paginated(self, data: Any, page_size: Optional[int] = None):
+        """
+        Write a large listing one page at a time.
+
+        Only the first page is rendered straight away; the rest is rendered
+        on demand by write_next_page, so time to first line and the size of
+        each Text stay bounded however long the listing is.
+
+        Args:
+            data: A list or dictionary to display
+            page_size: Number of entries per page
+        """
+        if not isinstance(data, (list, tuple, dict)) or not data:
+            self.write_and_display_structured_data(data)
+            return
+        if self._defer(functools.partial(self._paginate, data, page_size)):
+            return
+        self._paginate(data, page_size)
 
-                # Handle the value based on its type
-                if isinstance(value, (dict, list, tuple)):
-                    result.append("\n")
-                    result.append(self.write_structured_data(value, indent + 2))
-                else:
-                    # Add the actual value in green
-                    result.append(f"{value}\n", style=Style(color="green"))
-                # Create the formatted text
+    def _paginate(self, data: Any, page_size: Optional[int]) -> None:
+        """Start showing a listing on the live page."""
+        self._listing = list(data.items()) if isinstance(data, dict) else list(data)
+        self._listing_is_dict = isinstance(data, dict)
+        self._listing_is_names = not self._listing_is_dict and all(
+            isinstance(x, str) for x in self._listing
+        )
+        self._listing_position = 0
+        self._page_size = page_size or self.PAGE_SIZE
+        self.write_next_page()
 
-            return result
+    @property
+    def has_next_page(self) -> bool:
+        """Whether a paginated listing has entries left to show."""
+        return self._listing_position < len(self._listing)
 
+    @_locked
+    def write_next_page(self) -> bool:
+        """
+        Render the next page of the current listing.
+
+        Returns:
+            bool: False when there was nothing left to show
+        """
+        if not self.has_next_page:
+            return False
+
+        start = self._listing_position
+        stop = min(start + self._page_size, len(self._listing))
+        page = self._listing[start:stop]
+        buffer = _TextBuffer()
+        if self._listing_is_dict:
+            if start == 0:
+                buffer.append(
+                    f"Dictionary containing {len(self._listing)} items:\n",
+                    _HEADER_STYLE,
+                )
+            self._render_pairs(buffer, page, 0)
+        elif self._listing_is_names:
+            self._render_names(buffer, page, 0, start + 1)
         else:
-            # Handle basic types
-            value = str(data).strip()
-            # If it's a package name, clean it up
-            if isinstance(data, str) and "-" in value:
-                value = value.strip("-").replace("-", " ").title()
-            result.append(f"{indent_str}{value}\n")
-            return result
+            self._render_items(buffer, page, 0)
+        self._listing_position = stop
+
+        # Keep the view where it is so reaching the bottom can load more
+        self.write(buffer.to_text(), scroll_end=False)
+        if self.has_next_page:
+            self.write(
+                Text(
+                    f"Showing {stop} of {len(self._listing)}. Scroll down, "
+                    "press 'n' or type 'next page' for more.\n",
+                    style=Style(color="yellow", italic=True),
+                ),
+                scroll_end=False,
+            )
+        return True
+
+    @_locked
+    def discard_listing(self):
+        """Forget the current paginated listing."""
+        self._listing = []
+        self._listing_position = 0
 
-    def write(self, message):
+    @_locked
+    def write(self, message, scroll_end: Optional[bool] = None):
         """Write a message and store in history."""
         # Convert message to Text object if it isn't already
         if isinstance(message, Text):
@@ -116,13 +287,24 @@ class ExtendedRichLogHandler:
                 msg_str += "\n"
             text = Text.from_markup(msg_str)
 
+        if self._defer(functools.partial(self._write_text, text, scroll_end)):
+            return
+        self._write_text(text, scroll_end)
+
+    def _write_text(self, text: Text, scroll_end: Optional[bool] = None) -> None:
+        """Write to the live page and the RichLog."""
+        # New output always goes to the live page
+        if self._viewing is not None:
+            self._display(self._live)
+            self._viewing = None
+
         # Add to history only if it's not empty
         if text.plain.strip():
-            self._history.append(text)
-            self._current_position = len(self._history) - 1
+            self._live.append(text)
+            self._live_bytes += text_size(text)
 
         # Write to RichLog
-        self._rich_log.write(text)
+        self._rich_log.write(text, scroll_end=scroll_end)
 
     def write_and_display_structured_data(self, data: Any, indent: int = 0):
         """
@@ -140,31 +322,138 @@ class ExtendedRichLogHandler:
         # Then write it to the log
         self.write(formatted_text)
 
-    def show_previous(self) -> Optional[Text]:
-        """Show previous entry in history."""
-        if self._current_position > 0:
-            self._current_position -= 1
-            self._rich_log.clear()
-            for i in range(self._current_position + 1):
-                self._rich_log.write(self._history[i])
-            return self._history[self._current_position]
-        return None
+    def _display(self, page: List[Text], title: str = "") -> None:
+        """Replace the log contents with a single history page."""
+        self._rich_log.clear()
+        for text in page:
+            self._rich_log.write(text, scroll_end=False)
+        self._rich_log.border_title = title
 
-    def show_next(self) -> Optional[Text]:
-        """Show next entry in history."""
-        if self._current_position < len(self._history) - 1:
-            self._current_position += 1
-            self._rich_log.clear()
-            for i in range(self._current_position + 1):
-                self._rich_log.write(self._history[i])
-            return self._history[self._current_position]
+    def _show_page(self, number: int) -> Optional[List[Text]]:
+        """Display an archived page, if it is still in history."""
+        page = self.history.get(number)
+        if page is None:
+            return None
+        self._viewing = number
+        position = number - self.history.first + 1
+        self._display(page, f"History {position}/{len(self.history)}")
+        return page
+
+    @_locked
+    def show_previous(self) -> Optional[List[Text]]:
+        """Show the page written by the previous command."""
+        if self._viewing is None:
+            if not len(self.history):
+                return None
+            return self._show_page(self.history.next - 1)
+        if self._viewing > self.history.first:
+            return self._show_page(self._viewing - 1)
         return None
 
+    @_locked
+    def show_next(self) -> Optional[List[Text]]:
+        """Show the page written by the next command, or the live page."""
+        if self._viewing is None:
+            return None
+        if self._viewing < self.history.next - 1:
+            return self._show_page(self._viewing + 1)
+        self._viewing = None
+        self._display(self._live)
+        return self._live
+
+    def _archive_live(self) -> None:
+        """Move the live page into history."""
+        if not self._live:
+            return
+        self.history.add(self._live, self._live_bytes)
+        self._live = []
+        self._live_bytes = 0
+        # Adding may have dropped the oldest pages, including the one in view
+        if self._viewing is not None and self._viewing < self.history.first:
+            self._show_page(self.history.first)
+
+    def _defer(self, call: Callable[[], None]) -> bool:
+        """
+        Hold back output of a command that doesn't own the live page.
+
+        The first command to write after the live page is released starts a
+        new page and owns it. Output written outside any command (key
+        bindings, log scrolling) or on behalf of a command that has already
+        finished always goes straight to the live page.
+
+        Returns:
+            bool: True when the output was held back
+        """
+        command = current_command.get()
+        if command is None or command.id in self._finished:
+            return False
+        if self._owner is None:
+            self._start_page(command.id)
+        if self._owner == command.id:
+            return False
+        self._pending.setdefault(command.id, []).append(call)
+        return True
+
+    def _start_page(self, owner: Optional[int]) -> None:
+        """Archive the live page and start an empty one for a command."""
+        self._archive_live()
+        self._viewing = None
+        self._display([])
+        self.discard_listing()
+        self._owner = owner
+
+    @_locked
+    def continue_page(self) -> None:
+        """Let the current command add to the live page instead of replacing it."""
+        command = current_command.get()
+        if (
+            command is not None
+            and command.id not in self._finished
+            and self._owner is None
+        ):
+            self._owner = command.id
+
+    @_locked
+    def finish(self, command) -> None:
+        """
+        Release the live page when its command ends and show held back output.
+
+        Held back output of commands that have already finished becomes a
+        history page of its own; the last one stays on display.
+        """
+        self._finished.add(command.id)
+        if self._owner == command.id:
+            self._owner = None
+        while self._owner is None and self._pending:
+            command_id, calls = self._pending.popitem(last=False)
+            self._start_page(command_id)
+            for call in calls:
+                call()
+            if command_id in self._finished:
+                self._owner = None
+
+    @_locked
     def clear(self):
+        """Clear the display and start a new history page."""
+        command = current_command.get()
+        if command is not None and self._owner not in (None, command.id):
+            # Another command owns the display; only drop this one's output
+            self._pending.pop(command.id, None)
+            return
+        self._archive_live()
+        self._viewing = None
+        self._display([])
+
+    @_locked
+    def reset(self):
         """Clear both history and display."""
-        self._history.clear()
-        self._current_position = -1
-        self._rich_log.clear()
+        self.history.clear()
+        self._live = []
+        self._live_bytes = 0
+        self._viewing = None
+        self._owner = None
+        self._pending.clear()
+        self._display([])
 
     def flush(self):
         """Required for handler interface."""
@@ -0,0 +1,158 @@
+import os
+import time
+
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+
+# Seconds a background connection may stay unused before it is closed
+IDLE_TIMEOUT = float(os.getenv("HERDING_CATS_SESSION_IDLE", 15 * 60))
+MAX_SESSIONS = 5
+
+
+@dataclass
+class CatalogConnection:
+    """A connected catalogue with its session, explorer and loader."""
+
+    name: str
+    url: str
+    session: Any
+    explorer: Any
+    loader: Any
+    last_used: float = field(default_factory=time.monotonic)
+    # Filled in by the background health check and warm-up after connecting
+    healthy: Optional[bool] = None
+    latency: Optional[float] = None
+    stats: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def idle(self) -> float:
+        """Seconds since the connection was last used."""
+        return time.monotonic() - self.last_used
+
+
+# The connection the current command started with (and its pool threads use),
+# so switching with `use` doesn't affect commands already running
+current_connection: ContextVar[Optional[CatalogConnection]] = ContextVar(
+    "current_connection", default=None
+)
+
+
+class SessionManager:
+    """
+    Keeps several catalogue connections open at once.
+
+    Each connection holds its own CatSession, and with it a pooled
+    keep-alive HTTP session, so switching between catalogues with `use`
+    doesn't reconnect. Background connections are closed once they have
+    been idle for too long, unless a running command is still pinned to
+    them, or when too many are open.
+    """
+
+    def __init__(
+        self, idle_timeout: float = IDLE_TIMEOUT, max_sessions: int = MAX_SESSIONS
+    ):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        # Least recently used first
+        self.connections: OrderedDict[str, CatalogConnection] = OrderedDict()
+        self.active: Optional[str] = None
+        # Number of in-flight commands pinned to each connection
+        self.pinned: Counter[str] = Counter()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.connections
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    @property
+    def current(self) -> Optional[CatalogConnection]:
+        """The active connection, if any."""
+        return self.connections.get(self.active) if self.active else None
+
+    def add(self, connection: CatalogConnection) -> List[str]:
+        """
+        Register a new connection and make it the active one.
+
+        Args:
+            connection: The freshly connected catalogue
+        Returns:
+            List[str]: Catalogues closed to stay within max_sessions
+        """
+        if connection.name in self.connections:
+            self.close(connection.name)
+        self.connections[connection.name] = connection
+        self.active = connection.name
+
+        evicted = []
+        for name in list(self.connections):
+            if len(self.connections) <= self.max_sessions:
+                break
+            if name != self.active:
+                self.close(name)
+                evicted.append(name)
+        return evicted
+
+    def use(self, name: str) -> Optional[CatalogConnection]:
+        """Make an open connection the active one."""
+        connection = self.connections.get(name)
+        if connection is not None:
+            self.active = name
+            self.touch()
+        return connection
+
+    def touch(self) -> None:
+        """Mark the active connection as just used."""
+        connection = self.current
+        if connection is not None:
+            connection.last_used = time.monotonic()
+            self.connections.move_to_end(connection.name)
+
+    def pin(self, name: str) -> None:
+        """Keep a connection from idling out while a command uses it."""
+        self.pinned[name] += 1
+
+    def unpin(self, name: str) -> None:
+        """Release a pin taken with pin()."""
+        self.pinned[name] -= 1
+        if self.pinned[name] <= 0:
+            del self.pinned[name]
+
+    def close(self, name: str) -> Optional[CatalogConnection]:
+        """Close a connection, returning it if it was open."""
+        connection = self.connections.pop(name, None)
+        if connection is None:
+            return None
+        if self.active == name:
+            self.active = None
+        try:
+            connection.session.close_session()
+        except Exception as e:
+            logger.error(f"Error closing session for {name}: {str(e)}")
+        return connection
+
+    def close_idle(self) -> List[str]:
+        """
+        Close background connections idle for longer than the timeout, except
+        those in-flight commands are pinned to.
+        """
+        idle = [
+            name
+            for name, connection in self.connections.items()
+            if name != self.active
+            and name not in self.pinned
+            and connection.idle > self.idle_timeout
+        ]
+        for name in idle:
+            self.close(name)
+        return idle
+
+    def close_all(self) -> None:
+        """Close every connection."""
+        for name in list(self.connections):
+            self.close(name)
@@ -0,0 +1,261 @@
+import re
+import sqlite3
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+
+from herding_cats_interactive.cache.metadata_cache import DEFAULT_CACHE_DIR
+from herding_cats_interactive.handlers.command_scheduler import check_cancelled
+
+
+HARVEST_TIMEOUT = 30
+_TAGS = re.compile(r"<[^>]+>")
+
+
+def _clean(value: Any) -> str:
+    """Flatten a metadata value to plain text, dropping any HTML."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(_clean(item) for item in value)
+    return _TAGS.sub(" ", str(value))
+
+
+def _get_json(http_session, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    check_cancelled()
+    response = (http_session or requests).get(
+        url, params=params, timeout=HARVEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def harvest_ckan(base_url: str, http_session=None) -> Iterator[Dict[str, str]]:
+    """Yield metadata for every package of a CKAN catalogue."""
+    url = f"{base_url}/api/3/action/package_search"
+    start, rows = 0, 1000
+    while True:
+        params = {"rows": rows, "start": start}
+        result = _get_json(http_session, url, params)["result"]
+        for package in result.get("results", []):
+            yield {
+                "dataset_id": package.get("name") or package.get("id", ""),
+                "title": _clean(package.get("title")),
+                "description": _clean(package.get("notes")),
+                "tags": _clean([tag.get("name") for tag in package.get("tags") or []]),
+                "organisation": _clean(
+                    (package.get("organization") or {}).get("title")
+                ),
+            }
+        start += rows
+        if start >= result.get("count", 0):
+            return
+
+
+def harvest_opendatasoft(base_url: str, http_session=None) -> Iterator[Dict[str, str]]:
+    """Yield metadata for every dataset of an OpenDataSoft catalogue."""
+    url = f"{base_url}/api/explore/v2.1/catalog/datasets"
+    offset, limit = 0, 100
+    while True:
+        page = _get_json(http_session, url, {"limit": limit, "offset": offset})
+        for dataset in page.get("results", []):
+            meta = (dataset.get("metas") or {}).get("default") or {}
+            yield {
+                "dataset_id": dataset.get("dataset_id", ""),
+                "title": _clean(meta.get("title")),
+                "description": _clean(meta.get("description")),
+                "tags": _clean(meta.get("keyword")),
+                "organisation": _clean(meta.get("publisher")),
+            }
+        offset += limit
+        if offset >= page.get("total_count", 0):
+            return
+
+
+def harvest_french_gov(base_url: str, http_session=None) -> Iterator[Dict[str, str]]:
+    """Yield metadata for every dataset of the French Government catalogue."""
+    url = f"{base_url}/api/1/datasets/"
+    page_number, page_size = 1, 100
+    while True:
+        page = _get_json(
+            http_session, url, {"page": page_number, "page_size": page_size}
+        )
+        for dataset in page.get("data", []):
+            yield {
+                "dataset_id": dataset.get("id", ""),
+                "title": _clean(dataset.get("title")),
+                "description": _clean(dataset.get("description")),
+                "tags": _clean(dataset.get("tags")),
+                "organisation": _clean((dataset.get("organization") or {}).get("name")),
+            }
+        if not page.get("next_page"):
+            return
+        page_number += 1
+
+
+harvesters: Dict[str, Callable[..., Iterator[Dict[str, str]]]] = {
+    "ckan": harvest_ckan,
+    "opendatasoft": harvest_opendatasoft,
+    "french_gov": harvest_french_gov,
+}
+
+
+class CatalogueIndex:
+    """
+    Local full-text index over catalogue metadata.
+
+    Titles, descriptions, tags and organisation names harvested from each
+    catalogue are stored in an SQLite FTS5 table, so searches are answered
+    locally, offline and with BM25 ranking for every catalogue type.
+    """
+
+    # BM25 weights for catalogue, dataset_id, title, description, tags, organisation
+    WEIGHTS = (0.0, 0.0, 10.0, 1.0, 5.0, 3.0)
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.path = Path(cache_dir or DEFAULT_CACHE_DIR) / "search.sqlite"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the index database on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS datasets USING fts5(
+                    catalogue UNINDEXED,
+                    dataset_id UNINDEXED,
+                    title,
+                    description,
+                    tags,
+                    organisation,
+                    tokenize = 'porter unicode61 remove_diacritics 2'
+                );
+                CREATE TABLE IF NOT EXISTS catalogues (
+                    catalogue TEXT PRIMARY KEY,
+                    datasets INTEGER NOT NULL,
+                    built_at REAL NOT NULL
+                );
+                """
+            )
+        return self._conn
+
+    def build(
+        self,
+        catalogue: str,
+        catalogue_type: str,
+        base_url: str,
+        http_session: Optional[requests.Session] = None,
+    ) -> int:
+        """
+        Harvest a catalogue's metadata and (re)build its part of the index.
+
+        Args:
+            catalogue: Catalogue name
+            catalogue_type: One of ckan, opendatasoft, french_gov
+            base_url: Catalogue base URL
+            http_session: Session to harvest with
+        Returns:
+            int: Number of datasets indexed
+        """
+        harvest = harvesters[catalogue_type](base_url.rstrip("/"), http_session)
+        records = [
+            (
+                catalogue,
+                record["dataset_id"],
+                record["title"],
+                record["description"],
+                record["tags"],
+                record["organisation"],
+            )
+            for record in harvest
+        ]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM datasets WHERE catalogue = ?", (catalogue,))
+                conn.executemany(
+                    "INSERT INTO datasets VALUES (?, ?, ?, ?, ?, ?)", records
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO catalogues VALUES (?, ?, ?)",
+                    (catalogue, len(records), time.time()),
+                )
+        return len(records)
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """Turn free text into an FTS5 query matching every term as a prefix."""
+        terms = re.findall(r"\w+", query.lower())
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(
+        self, query: str, catalogue: Optional[str] = None, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank indexed datasets against a query.
+
+        Args:
+            query: Free text query
+            catalogue: Restrict results to this catalogue when given
+            limit: Maximum number of results
+        Returns:
+            List[Dict[str, Any]]: Best matches first
+        """
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        weights = ", ".join(str(weight) for weight in self.WEIGHTS)
+        sql = (
+            f"SELECT catalogue, dataset_id, title, organisation, "
+            f"bm25(datasets, {weights}) AS score FROM datasets "
+            f"WHERE datasets MATCH ?"
+        )
+        params: list = [expression]
+        if catalogue:
+            sql += " AND catalogue = ?"
+            params.append(catalogue)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        return [
+            {
+                "catalogue": row[0],
+                "id": row[1],
+                "title": row[2],
+                "organisation": row[3],
+                "score": round(abs(row[4]), 2),
+            }
+            for row in rows
+        ]
+
+    def indexed_catalogues(self) -> Dict[str, Dict[str, Any]]:
+        """Indexed catalogues with their dataset counts and build times."""
+        with self._lock:
+            rows = (
+                self._connection()
+                .execute("SELECT catalogue, datasets, built_at FROM catalogues")
+                .fetchall()
+            )
+        return {
+            catalogue: {
+                "datasets": datasets,
+                "built": time.strftime("%Y-%m-%d %H:%M", time.localtime(built_at)),
+            }
+            for catalogue, datasets, built_at in rows
+        }
+
+    def close(self) -> None:
+        """Close the index database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,228 @@
+import asyncio
+import re
+import threading
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from herding_cats_interactive.handlers.command_executor import CommandExecutor
+from herding_cats_interactive.handlers.command_scheduler import (
+    check_cancelled,
+    track_response_bytes,
+)
+
+
+SEARCH_TIMEOUT = 15
+# Requests allowed in flight against one host at a time
+PER_HOST_LIMIT = 2
+# Reciprocal rank fusion constant; keeps one catalogue's top hit from dominating
+RANK_CONSTANT = 60
+
+
+def search_ckan(
+    base_url: str, query: str, rows: int, http_session: requests.Session
+) -> List[Dict[str, str]]:
+    """Search a CKAN catalogue with package_search."""
+    response = http_session.get(
+        f"{base_url}/api/3/action/package_search",
+        params={"q": query, "rows": rows},
+        timeout=SEARCH_TIMEOUT,
+    )
+    response.raise_for_status()
+    return [
+        {
+            "id": package.get("name") or package.get("id", ""),
+            "title": package.get("title") or "",
+        }
+        for package in response.json()["result"].get("results", [])
+    ]
+
+
+def search_opendatasoft(
+    base_url: str, query: str, rows: int, http_session: requests.Session
+) -> List[Dict[str, str]]:
+    """Search an OpenDataSoft catalogue with its full-text search() filter."""
+    escaped = query.replace('"', '\\"')
+    response = http_session.get(
+        f"{base_url}/api/explore/v2.1/catalog/datasets",
+        params={"where": f'search("{escaped}")', "limit": rows},
+        timeout=SEARCH_TIMEOUT,
+    )
+    response.raise_for_status()
+    return [
+        {
+            "id": dataset.get("dataset_id", ""),
+            "title": ((dataset.get("metas") or {}).get("default") or {}).get("title")
+            or "",
+        }
+        for dataset in response.json().get("results", [])
+    ]
+
+
+def search_french_gov(
+    base_url: str, query: str, rows: int, http_session: requests.Session
+) -> List[Dict[str, str]]:
+    """Search the French Government catalogue."""
+    response = http_session.get(
+        f"{base_url}/api/1/datasets/",
+        params={"q": query, "page_size": rows},
+        timeout=SEARCH_TIMEOUT,
+    )
+    response.raise_for_status()
+    return [
+        {"id": dataset.get("id", ""), "title": dataset.get("title") or ""}
+        for dataset in response.json().get("data", [])
+    ]
+
+
+searchers: Dict[str, Callable[..., List[Dict[str, str]]]] = {
+    "ckan": search_ckan,
+    "opendatasoft": search_opendatasoft,
+    "french_gov": search_french_gov,
+}
+
+
+@dataclass
+class CatalogueResults:
+    """Results from one catalogue of a federated search."""
+
+    catalogue: str
+    latency: float
+    results: List[Dict[str, str]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class FederatedSearch:
+    """
+    Searches every catalogue at once.
+
+    Each catalogue is queried on its own pool thread through a shared
+    keep-alive HTTP session. A semaphore per host bounds how many requests
+    hit the same server concurrently, and results are yielded in the order
+    catalogues respond.
+    """
+
+    def __init__(self, max_workers: int = 8, per_host: int = PER_HOST_LIMIT):
+        self.executor = CommandExecutor(max_workers=max_workers)
+        self.per_host = per_host
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=per_host)
+        self.http_session.mount("https://", adapter)
+        self.http_session.mount("http://", adapter)
+        self.http_session.hooks["response"].append(track_response_bytes)
+
+    def _host_limit(self, base_url: str) -> threading.BoundedSemaphore:
+        """Return the concurrency limit for a catalogue's host."""
+        host = urlparse(base_url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _search_one(
+        self,
+        catalogue: str,
+        catalogue_type: str,
+        base_url: str,
+        query: str,
+        rows: int,
+    ) -> CatalogueResults:
+        """Query one catalogue, capturing its latency and any error."""
+        with self._host_limit(base_url):
+            check_cancelled()
+            started = time.perf_counter()
+            try:
+                results = searchers[catalogue_type](
+                    base_url.rstrip("/"), query, rows, self.http_session
+                )
+            except Exception as e:
+                return CatalogueResults(
+                    catalogue, time.perf_counter() - started, error=str(e)
+                )
+            return CatalogueResults(catalogue, time.perf_counter() - started, results)
+
+    async def search(
+        self,
+        catalogues: Iterable[Tuple[str, str, str]],
+        query: str,
+        rows: int = 10,
+    ) -> AsyncIterator[CatalogueResults]:
+        """
+        Search catalogues concurrently, yielding each one's results as it responds.
+
+        Args:
+            catalogues: (name, catalogue type, base URL) of each catalogue
+            query: Search query
+            rows: Maximum results per catalogue
+        Returns:
+            AsyncIterator[CatalogueResults]: Results in order of arrival
+        """
+        tasks = [
+            asyncio.ensure_future(
+                self.executor.run(
+                    self._search_one, name, catalogue_type, base_url, query, rows
+                )
+            )
+            for name, catalogue_type, base_url in catalogues
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def merge(
+        responses: List[CatalogueResults], query: str, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge per-catalogue results into one ranking.
+
+        Results are ranked by the share of query terms found in their title.
+        Reciprocal rank fusion of each catalogue's own ordering only breaks
+        ties: it is scaled below one term's share, so it never outranks a
+        result matching more terms.
+
+        Args:
+            responses: Results from each catalogue
+            query: The search query
+            limit: Maximum number of merged results
+        Returns:
+            List[Dict[str, Any]]: Best matches first
+        """
+        terms = set(re.findall(r"\w+", query.lower()))
+        # Coverage moves in steps of one term's share
+        step = 1 / len(terms) if terms else 1.0
+        scored = []
+        for response in responses:
+            for position, result in enumerate(response.results):
+                title_terms = set(re.findall(r"\w+", result["title"].lower()))
+                coverage = len(terms & title_terms) / len(terms) if terms else 0.0
+                # At most RANK_CONSTANT / (RANK_CONSTANT + 1), below one step
+                fusion = RANK_CONSTANT / (RANK_CONSTANT + position + 1)
+                scored.append((coverage + step * fusion, response.catalogue, result))
+        # Sort on the exact score, rounding would merge close ties
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {
+                "catalogue": catalogue,
+                "id": result["id"],
+                "title": result["title"],
+                "score": round(score, 3),
+            }
+            for score, catalogue, result in scored[:limit]
+        ]
+
+    def shutdown(self) -> None:
+        """Release pool threads and pooled connections."""
+        self.executor.shutdown()
+        self.http_session.close()
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from textual.widgets import Button
 from textual.message import Message
 
@@ -6,11 +8,7 @@ from rich.style import Style
 
 from typing import Optional
 
-from HerdingCats.explorer.explore import (
-    CkanCatExplorer,
-    OpenDataSoftCatExplorer,
-    FrenchGouvCatExplorer,
-)
+from herding_cats_interactive.utils import herding_cats as hc
 
 
 class CommandButton(Button):
@@ -26,7 +24,7 @@ class CommandButton(Button):
     def __init__(
         self,
         explorer: Optional[
-            CkanCatExplorer | OpenDataSoftCatExplorer | FrenchGouvCatExplorer
+            hc.CkanCatExplorer | hc.OpenDataSoftCatExplorer | hc.FrenchGouvCatExplorer
         ] = None,
         **kwargs,
     ):
@@ -37,7 +35,7 @@ class CommandButton(Button):
     def update_explorer(
         self,
         explorer: Optional[
-            CkanCatExplorer | OpenDataSoftCatExplorer | FrenchGouvCatExplorer
+            hc.CkanCatExplorer | hc.OpenDataSoftCatExplorer | hc.FrenchGouvCatExplorer
         ] = None,
     ) -> None:
         """Update the explorer and refresh the button's command list."""
@@ -70,14 +68,47 @@ class CommandButton(Button):
         _add_command_section(
             [
                 ("connect <catalog>", "Connect to a specific data catalog"),
+                ("connect <catalog> --prefetch", "Connect and fetch its listings"),
                 ("close", "Close the current connection"),
+                ("use [catalog]", "Switch to another open connection, or list them"),
+                ("next page", "Show the next page of a long listing"),
+                ("history stats", "Show log history memory and disk usage"),
+                ("sql [query]", "Query loaded datasets with DuckDB, or list them"),
+                ("cache stats", "Show cached catalogue listings and datasets"),
+                ("cache clear [catalog]", "Clear cached catalogue listings"),
+                ("cache clear datasets", "Clear cached datasets"),
+                ("index build", "Index the connected catalog for local search"),
+                ("index stats", "Show indexed catalogs"),
+                ("search <query> [rows]", "Search indexed catalogs, offline too"),
+                ("search --all <query>", "Search every catalog at once"),
+                ("profile <command>", "Run a command and show where time goes"),
                 ("quit", "Exit the application"),
             ]
         )
 
         # Catalog-specific commands using match statement
         match self.explorer:
-            case CkanCatExplorer():
+            # Checked first: class patterns import HerdingCats through the proxy
+            case None:
+                output.append(
+                    "\nYou Are Not Connected to a Catalog:\n",
+                    style=Style(color="yellow", bold=True),
+                )
+                output.append(
+                    "Use 'show catalogs' to see available catalogs, then connect to one:\n",
+                    style=Style(color="white"),
+                )
+                _add_examples(
+                    [
+                        (
+                            "connect london-datastore",
+                            "Connect to the London Data Store",
+                        ),
+                        ("connect uk-power-networks", "Connect to the UKPN Data Store"),
+                    ]
+                )
+
+            case hc.CkanCatExplorer():
                 output.append(
                     "\nCatalog-Specific Commands:\n",
                     style=Style(color="green", bold=True),
@@ -100,6 +131,14 @@ class CommandButton(Button):
                             "load <id> <format>",
                             "Load a data sample into a DataFrame with an optional format specified",
                         ),
+                        (
+                            "load <id> csv --stream",
+                            "Show the first rows while the rest downloads. Use --preview to stop after them.",
+                        ),
+                        (
+                            "load <id> <format> --rows <n>",
+                            "Only keep the first n rows in the table (or stream preview)",
+                        ),
                     ],
                     "CKAN Commands:",
                 )
@@ -117,7 +156,7 @@ class CommandButton(Button):
                     ]
                 )
 
-            case OpenDataSoftCatExplorer():
+            case hc.OpenDataSoftCatExplorer():
                 output.append(
                     "\nCatalog-Specific Commands:\n",
                     style=Style(color="green", bold=True),
@@ -139,6 +178,14 @@ class CommandButton(Button):
                             "load <id> <format> <api-key>",
                             "Load a data sample into a DataFrame. Api-key is optional.",
                         ),
+                        (
+                            "load <id> csv --stream",
+                            "Show the first rows while the rest downloads. Use --preview to stop after them.",
+                        ),
+                        (
+                            "load <id> <format> --rows <n>",
+                            "Only keep the first n rows in the table (or stream preview)",
+                        ),
                     ],
                     "OpenDataSoft Commands:",
                 )
@@ -156,7 +203,7 @@ class CommandButton(Button):
                     ]
                 )
 
-            case FrenchGouvCatExplorer():
+            case hc.FrenchGouvCatExplorer():
                 output.append(
                     "\nCatalog-Specific Commands:\n",
                     style=Style(color="green", bold=True),
@@ -176,6 +223,14 @@ class CommandButton(Button):
                         ),
                         ("list orgs", "Show all organizations in the catalog"),
                         ("load <id> <format>", "Load a data sample into a DataFrame."),
+                        (
+                            "load <id> csv --stream",
+                            "Show the first rows while the rest downloads. Use --preview to stop after them.",
+                        ),
+                        (
+                            "load <id> <format> --rows <n>",
+                            "Only keep the first n rows in the table (or stream preview)",
+                        ),
                     ],
                     "French Government Commands:",
                 )
@@ -193,25 +248,6 @@ class CommandButton(Button):
                     ]
                 )
 
-            case None:
-                output.append(
-                    "\nYou Are Not Connected to a Catalog:\n",
-                    style=Style(color="yellow", bold=True),
-                )
-                output.append(
-                    "Use 'show catalogs' to see available catalogs, then connect to one:\n",
-                    style=Style(color="white"),
-                )
-                _add_examples(
-                    [
-                        (
-                            "connect london-datastore",
-                            "Connect to the London Data Store",
-                        ),
-                        ("connect uk-power-networks", "Connect to the UKPN Data Store"),
-                    ]
-                )
-
             case _:  # Catch-all case for unknown explorer types
                 output.append(
                     "\nUnknown explorer type\n", style=Style(color="red", bold=True)
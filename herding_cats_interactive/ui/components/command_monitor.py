@@ -0,0 +1,62 @@
+import time
+
+from textual.widgets import Static
+
+from rich.text import Text
+from rich.style import Style
+
+from typing import List
+
+from herding_cats_interactive.handlers.command_scheduler import ScheduledCommand
+
+
+class CommandMonitor(Static):
+    """A status panel listing in-flight commands with their progress."""
+
+    # Commands finishing faster than this never show up in the panel
+    SHOW_AFTER = 0.3
+    SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+    def __init__(self, **kwargs):
+        super().__init__("", **kwargs)
+        self.display = False
+
+    @staticmethod
+    def _format_bytes(count: int) -> str:
+        """Format a byte count for display."""
+        if count < 1024:
+            return f"{count} B"
+        size = count / 1024
+        for unit in ("KB", "MB"):
+            if size < 1024:
+                return f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} GB"
+
+    def _format_commands(self, commands: List[ScheduledCommand]) -> Text:
+        """Format the in-flight commands with rich text formatting."""
+        output = Text()
+        tick = int(time.monotonic() * 10)
+        frame = self.SPINNER_FRAMES[tick % len(self.SPINNER_FRAMES)]
+        for command in commands:
+            if command.state == "running":
+                output.append(f"{frame} ", style=Style(color="cyan"))
+            else:
+                output.append("⏳ ", style=Style(color="yellow"))
+            output.append(f"[{command.id}] ", style=Style(color="cyan", bold=True))
+            output.append(f"{command.text:<40}", style=Style(color="white"))
+            output.append(f" {command.state:<8}", style=Style(color="yellow"))
+            output.append(f" {command.elapsed:6.1f}s", style=Style(color="green"))
+            output.append(
+                f"  {self._format_bytes(command.bytes_received):>9}\n",
+                style=Style(color="blue"),
+            )
+        output.append("Press 'x' to cancel the latest command", style=Style(dim=True))
+        return output
+
+    def update_commands(self, commands: List[ScheduledCommand]) -> None:
+        """Refresh the panel, hiding it when no slow command is in flight."""
+        commands = [command for command in commands if command.age >= self.SHOW_AFTER]
+        self.display = bool(commands)
+        if commands:
+            self.update(self._format_commands(commands))
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from rich.cells import cell_len, set_cell_size
+from rich.segment import Segment
+from rich.style import Style
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import polars as pl
+
+
+class FrameTable(ScrollView, can_focus=True):
+    """
+    A virtualized table backed by a Polars DataFrame.
+
+    Only the rows in view are formatted, a block at a time in a single
+    Polars select, so memory and render cost stay flat however tall the
+    frame is. A few recent blocks are kept so scrolling back and forth
+    across a block boundary doesn't format the same rows twice.
+    """
+
+    BLOCK_ROWS = 1000
+    CACHED_BLOCKS = 4
+    MAX_COLUMN_WIDTH = 40
+    SEPARATOR = " │ "
+
+    HEADER_STYLE = Style(color="cyan", bold=True)
+    GUTTER_STYLE = Style(color="bright_black")
+    ROW_STYLES = (Style(color="white"), Style(color="white", bgcolor="grey11"))
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frame: Optional[pl.DataFrame] = None
+        self._widths: List[int] = []
+        self._gutter = 0
+        self._blocks: OrderedDict[int, List[List[str]]] = OrderedDict()
+
+    @staticmethod
+    def _as_text(name: str) -> pl.Expr:
+        """Expression casting a column to single-line strings."""
+        # Polars is only needed once there is a frame to show
+        import polars as pl
+
+        column = pl.col(name).cast(pl.Utf8)
+        return column.fill_null("None").str.replace_all(r"[\r\n\t]", " ")
+
+    @staticmethod
+    def _stringify_nested(block: pl.DataFrame) -> pl.DataFrame:
+        """Replace nested and Object columns, which have no string cast, by str()."""
+        import polars as pl
+
+        # Through Python lists rather than map_elements, which warns on every call
+        nested = [
+            pl.Series(
+                name,
+                [
+                    None if value is None else str(value)
+                    for value in block[name].to_list()
+                ],
+                dtype=pl.Utf8,
+            )
+            for name, dtype in block.schema.items()
+            if dtype.is_nested() or dtype == pl.Object
+        ]
+        return block.with_columns(nested) if nested else block
+
+    def _format_block(self, block: pl.DataFrame) -> List[List[str]]:
+        """Format a slice of the frame column-wise into lists of strings."""
+        block = self._stringify_nested(block)
+        formatted = block.select([self._as_text(name) for name in block.columns])
+        return [series.to_list() for series in formatted.get_columns()]
+
+    def _block(self, number: int) -> List[List[str]]:
+        """Return a formatted block of rows, formatting it on first use."""
+        if number in self._blocks:
+            self._blocks.move_to_end(number)
+            return self._blocks[number]
+        block = self._format_block(
+            self.frame.slice(number * self.BLOCK_ROWS, self.BLOCK_ROWS)
+        )
+        self._blocks[number] = block
+        while len(self._blocks) > self.CACHED_BLOCKS:
+            self._blocks.popitem(last=False)
+        return block
+
+    def _layout(self, frame: pl.DataFrame) -> int:
+        """Size columns for a new frame from its first block; returns line width."""
+        self.frame = frame
+        self._blocks.clear()
+        first_block = self._block(0)
+        self._widths = [
+            min(
+                max([cell_len(name), *(cell_len(value) for value in column)]),
+                self.MAX_COLUMN_WIDTH,
+            )
+            for name, column in zip(frame.columns, first_block)
+        ]
+        self._gutter = len(str(frame.height))
+        return self._gutter + sum(width + len(self.SEPARATOR) for width in self._widths)
+
+    def set_frame(self, frame: pl.DataFrame) -> None:
+        """Display a new frame, sizing columns from its first block."""
+        line_width = self._layout(frame)
+        # One extra line for the header
+        self.virtual_size = Size(line_width, frame.height + 1)
+        self.scroll_home(animate=False)
+        self.refresh()
+
+    def clear(self) -> None:
+        """Remove the current frame."""
+        self.frame = None
+        self._widths = []
+        self._blocks.clear()
+        self.virtual_size = Size(0, 0)
+        self.refresh()
+
+    def _row(self, index: int) -> List[str]:
+        """Return the formatted cells of a row."""
+        number, offset = divmod(index, self.BLOCK_ROWS)
+        return [column[offset] for column in self._block(number)]
+
+    def _line(self, gutter: str, cells: List[str]) -> str:
+        """Lay out one table line with padded or truncated cells."""
+        return gutter.rjust(self._gutter) + "".join(
+            self.SEPARATOR + set_cell_size(cell, width)
+            for cell, width in zip(cells, self._widths)
+        )
+
+    def render_line(self, y: int) -> Strip:
+        """Render a single visible line of the table."""
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        if self.frame is None or not self.frame.width:
+            return Strip.blank(width)
+
+        if y == 0:
+            header = self._line("", self.frame.columns)
+            segments = [Segment(header, self.HEADER_STYLE)]
+        else:
+            index = scroll_y + y - 1
+            if index >= self.frame.height:
+                return Strip.blank(width)
+            line = self._line(str(index), self._row(index))
+            segments = [
+                Segment(line[: self._gutter], self.GUTTER_STYLE),
+                Segment(line[self._gutter :], self.ROW_STYLES[index % 2]),
+            ]
+
+        return Strip(segments).crop(scroll_x, scroll_x + width)
@@ -79,6 +79,14 @@ APP_CSS = """
     border: outer $primary-darken-2;
     }
 
+    #command-monitor {
+        height: auto;
+        max-height: 6;
+        padding: 0 2;
+        background: $panel;
+        color: $text;
+    }
+
     Screen {
         overflow: hidden;
     }
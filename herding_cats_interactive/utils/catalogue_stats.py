@@ -0,0 +1,54 @@
+from typing import Dict, Optional
+
+import requests
+
+
+STATS_TIMEOUT = 15
+
+
+def _get_json(http_session: Optional[requests.Session], url: str, params=None):
+    response = (http_session or requests).get(url, params=params, timeout=STATS_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def catalogue_stats(
+    catalog_type: str, base_url: str, http_session: Optional[requests.Session] = None
+) -> Dict[str, int]:
+    """
+    Count a catalogue's datasets and organisations with the cheapest requests
+    each API offers, without fetching the listings themselves.
+
+    Args:
+        catalog_type: One of ckan, opendatasoft, french_gov
+        base_url: Catalogue base URL
+        http_session: Session to query with
+    Returns:
+        Dict[str, int]: Dataset and, where available, organisation counts
+    """
+    base_url = base_url.rstrip("/")
+    match catalog_type:
+        case "ckan":
+            datasets = _get_json(
+                http_session, f"{base_url}/api/3/action/package_search", {"rows": 0}
+            )["result"]["count"]
+            orgs = _get_json(
+                http_session, f"{base_url}/api/3/action/organization_list"
+            )["result"]
+            return {"datasets": datasets, "orgs": len(orgs)}
+        case "opendatasoft":
+            page = _get_json(
+                http_session,
+                f"{base_url}/api/explore/v2.1/catalog/datasets",
+                {"limit": 0},
+            )
+            return {"datasets": page["total_count"]}
+        case "french_gov":
+            datasets = _get_json(
+                http_session, f"{base_url}/api/1/datasets/", {"page_size": 1}
+            )["total"]
+            orgs = _get_json(
+                http_session, f"{base_url}/api/1/organizations/", {"page_size": 1}
+            )["total"]
+            return {"datasets": datasets, "orgs": orgs}
+    return {}
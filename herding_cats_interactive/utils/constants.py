@@ -1,28 +1,74 @@
-from HerdingCats.config.sources import (
-    CkanDataCatalogues,
-    OpenDataSoftDataCatalogues,
-    FrenchGouvCatalogue,
-)
-
-catalogues = {
-    # CKAN Catalogs
-    "london-datastore": ("ckan", CkanDataCatalogues.LONDON_DATA_STORE),
-    "uk-gov": ("ckan", CkanDataCatalogues.UK_GOV),
-    "subak": ("ckan", CkanDataCatalogues.SUBAK),
-    "humanitarian-open-data": ("ckan", CkanDataCatalogues.HUMANITARIAN_DATA_STORE),
-    "open-africa": ("ckan", CkanDataCatalogues.OPEN_AFRICA),
-    # OpenDataSoft Catalogs
-    "uk-power-networks": (
-        "opendatasoft",
-        OpenDataSoftDataCatalogues.UK_POWER_NETWORKS_DNO,
-    ),
-    "infrabel": ("opendatasoft", OpenDataSoftDataCatalogues.INFRABEL),
-    "paris": ("opendatasoft", OpenDataSoftDataCatalogues.PARIS),
-    "toulouse": ("opendatasoft", OpenDataSoftDataCatalogues.TOULOUSE),
-    "elia-energy": ("opendatasoft", OpenDataSoftDataCatalogues.ELIA_BELGIAN_ENERGY),
-    "edf-energy": ("opendatasoft", OpenDataSoftDataCatalogues.EDF_ENERGY),
-    "cadent-gas": ("opendatasoft", OpenDataSoftDataCatalogues.CADENT_GAS_GDN),
-    "grd-france": ("opendatasoft", OpenDataSoftDataCatalogues.GRD_FRANCE),
-    # French Government Catalog
-    "french-gov": ("french_gov", FrenchGouvCatalogue.GOUV_FR),
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from herding_cats_interactive.utils import herding_cats as hc
+
+
+class _Catalogues(Mapping):
+    """
+    Catalogue name -> (catalogue type, HerdingCats source enum).
+
+    Built on first use so the HerdingCats import happens with the first
+    command that needs a catalogue rather than at startup.
+    """
+
+    def __init__(self, build: Callable[[], Dict[str, Tuple[str, Any]]]):
+        self._build = build
+        self._catalogues: Optional[Dict[str, Tuple[str, Any]]] = None
+
+    def _loaded(self) -> Dict[str, Tuple[str, Any]]:
+        if self._catalogues is None:
+            self._catalogues = self._build()
+        return self._catalogues
+
+    def __getitem__(self, name: str) -> Tuple[str, Any]:
+        return self._loaded()[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaded())
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+
+def _build_catalogues() -> Dict[str, Tuple[str, Any]]:
+    return {
+        # CKAN Catalogs
+        "london-datastore": ("ckan", hc.CkanDataCatalogues.LONDON_DATA_STORE),
+        "uk-gov": ("ckan", hc.CkanDataCatalogues.UK_GOV),
+        "subak": ("ckan", hc.CkanDataCatalogues.SUBAK),
+        "humanitarian-open-data": (
+            "ckan",
+            hc.CkanDataCatalogues.HUMANITARIAN_DATA_STORE,
+        ),
+        "open-africa": ("ckan", hc.CkanDataCatalogues.OPEN_AFRICA),
+        # OpenDataSoft Catalogs
+        "uk-power-networks": (
+            "opendatasoft",
+            hc.OpenDataSoftDataCatalogues.UK_POWER_NETWORKS_DNO,
+        ),
+        "infrabel": ("opendatasoft", hc.OpenDataSoftDataCatalogues.INFRABEL),
+        "paris": ("opendatasoft", hc.OpenDataSoftDataCatalogues.PARIS),
+        "toulouse": ("opendatasoft", hc.OpenDataSoftDataCatalogues.TOULOUSE),
+        "elia-energy": (
+            "opendatasoft",
+            hc.OpenDataSoftDataCatalogues.ELIA_BELGIAN_ENERGY,
+        ),
+        "edf-energy": ("opendatasoft", hc.OpenDataSoftDataCatalogues.EDF_ENERGY),
+        "cadent-gas": ("opendatasoft", hc.OpenDataSoftDataCatalogues.CADENT_GAS_GDN),
+        "grd-france": ("opendatasoft", hc.OpenDataSoftDataCatalogues.GRD_FRANCE),
+        # French Government Catalog
+        "french-gov": ("french_gov", hc.FrenchGouvCatalogue.GOUV_FR),
+    }
+
+
+catalogues = _Catalogues(_build_catalogues)
+
+# Endpoints behind each listing command, used to revalidate cached listings
+listing_endpoints = {
+    ("ckan", "packages"): "/api/3/action/package_list",
+    ("ckan", "orgs"): "/api/3/action/organization_list",
+    ("opendatasoft", "datasets"): "/api/explore/v2.1/catalog/datasets",
+    ("french_gov", "datasets"): "/api/1/datasets/",
+    ("french_gov", "orgs"): "/api/1/organizations/",
 }
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import io
+import re
+import tempfile
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+import requests
+
+from herding_cats_interactive.handlers.command_scheduler import (
+    check_cancelled,
+    current_command,
+)
+
+if TYPE_CHECKING:
+    import polars as pl
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+# Downloads larger than this are spooled to disk rather than held in memory
+SPOOL_MAX_SIZE = 32 * 1024 * 1024
+# The preview is given up once this much is buffered, or after this many
+# failed parses, so an unparseable start can't cost more than that
+PREVIEW_MAX_BYTES = 4 * 1024 * 1024
+PREVIEW_MAX_ATTEMPTS = 10
+# Field separators a CSV may use; OpenDataSoft exports use semicolons
+CSV_SEPARATORS = ",;\t|"
+
+
+def resolve_resource_url(resources: Any, format_type: Optional[str]) -> Optional[str]:
+    """
+    Pick the download URL matching a format from explorer resource metadata.
+
+    Handles the shapes returned by the CKAN, OpenDataSoft and French
+    Government explorers: lists of [.., format, .., url] entries or lists
+    of dicts with format and url keys.
+
+    Args:
+        resources: Resource metadata returned by the explorer
+        format_type: Desired format, defaults to csv
+    Returns:
+        Optional[str]: The matching URL, or None
+    """
+    wanted = (format_type or "csv").lower().lstrip(".")
+
+    for resource in resources or []:
+        if isinstance(resource, dict):
+            values = [
+                value for key, value in resource.items() if "format" in key.lower()
+            ]
+            urls = [
+                value
+                for key, value in resource.items()
+                if "url" in key.lower() and isinstance(value, str)
+            ]
+        elif isinstance(resource, (list, tuple)):
+            values = list(resource)
+            urls = [value for value in resource if isinstance(value, str)]
+        else:
+            continue
+
+        urls = [url for url in urls if url.startswith("http")]
+        formats = [str(value).lower().lstrip(".") for value in values]
+        if urls and (wanted in formats or urls[0].lower().endswith(f".{wanted}")):
+            return urls[0]
+    return None
+
+
+def sniff_separator(data: bytes) -> str:
+    """
+    Guess a CSV's field separator from its header line.
+
+    Args:
+        data: The start of the file, including its first line
+    Returns:
+        str: The separator occurring most often outside quotes, or a comma
+    """
+    header = re.sub(rb'"[^"]*"', b"", data.split(b"\n", 1)[0])
+    counts = {
+        separator: header.count(separator.encode()) for separator in CSV_SEPARATORS
+    }
+    separator = max(counts, key=counts.get)
+    return separator if counts[separator] else ","
+
+
+def _parse_preview(
+    buffer: bytes, rows: int, separator: str = ","
+) -> Optional[pl.DataFrame]:
+    """Parse the complete lines received so far, or None if not yet parseable."""
+    import polars as pl
+
+    end = buffer.rfind(b"\n") + 1
+    if not end:
+        return None
+    try:
+        return pl.read_csv(
+            io.BytesIO(buffer[:end]),
+            separator=separator,
+            n_rows=rows,
+            infer_schema_length=rows,
+        )
+    except Exception:
+        # A quoted field may span the cut; wait for more data
+        return None
+
+
+def stream_csv(
+    url: str,
+    preview_rows: int,
+    on_preview: Callable[[pl.DataFrame], None],
+    full: bool = True,
+    http_session: Optional[requests.Session] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> pl.DataFrame:
+    """
+    Download a CSV incrementally, reporting a preview as soon as it arrives.
+
+    The field separator is detected from the header line, so semicolon
+    separated exports load as well as comma separated files.
+
+    Args:
+        url: CSV download URL
+        preview_rows: Number of rows in the preview
+        on_preview: Called with the preview frame as soon as it is parsed
+        full: Keep downloading and return the whole dataset when True,
+            stop after the preview otherwise
+        http_session: Session to download with
+        headers: Extra request headers (e.g. an API key)
+    Returns:
+        pl.DataFrame: The full dataset, or the preview when full is False
+    """
+    import polars as pl
+
+    command = current_command.get()
+    buffer = bytearray()
+    newlines = 0
+    attempts = 0
+    preview = None
+    abandoned = False
+    separator = None
+
+    with (
+        tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool,
+        (http_session or requests).get(
+            url, headers=headers, stream=True, timeout=30
+        ) as response,
+    ):
+        response.raise_for_status()
+
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            check_cancelled()
+            if command is not None:
+                command.add_bytes(len(chunk))
+            if full:
+                spool.write(chunk)
+            if preview is not None or abandoned:
+                continue
+
+            buffer.extend(chunk)
+            if separator is None and b"\n" in buffer:
+                separator = sniff_separator(bytes(buffer))
+            chunk_lines = chunk.count(b"\n")
+            newlines += chunk_lines
+            # Only retry a failed parse once more complete lines have arrived
+            if newlines <= preview_rows or not chunk_lines:
+                continue
+            preview = _parse_preview(bytes(buffer), preview_rows, separator)
+            if preview is not None:
+                buffer.clear()
+                if not full:
+                    return preview
+                on_preview(preview)
+                continue
+
+            attempts += 1
+            if attempts >= PREVIEW_MAX_ATTEMPTS or len(buffer) >= PREVIEW_MAX_BYTES:
+                buffer.clear()
+                if not full:
+                    raise ValueError(
+                        f"Could not parse the first {preview_rows} rows of {url}"
+                    )
+                # Carry on without a preview; the full load still completes
+                abandoned = True
+
+        # A resource without a line break never had its header sniffed
+        separator = separator or sniff_separator(bytes(buffer))
+        if not full:
+            # The whole resource was shorter than the preview
+            return pl.read_csv(
+                io.BytesIO(bytes(buffer)), separator=separator, n_rows=preview_rows
+            )
+
+        spool.seek(0)
+        return pl.read_csv(spool, separator=separator)
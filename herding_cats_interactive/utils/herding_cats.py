@@ -0,0 +1,41 @@
+"""
+Deferred access to the HerdingCats library.
+
+Importing HerdingCats pulls in polars, pandas, duckdb, boto3 and pyarrow,
+which would dominate startup. Names are imported from their HerdingCats
+module on first attribute access instead, i.e. by the first command that
+needs them:
+
+    from herding_cats_interactive.utils import herding_cats as hc
+
+    session = hc.CatSession(catalogue)
+"""
+
+import importlib
+
+from typing import Any
+
+
+_exports = {
+    "CatSession": "HerdingCats.session.session",
+    "CatalogueType": "HerdingCats.session.session",
+    "CkanCatExplorer": "HerdingCats.explorer.explore",
+    "OpenDataSoftCatExplorer": "HerdingCats.explorer.explore",
+    "FrenchGouvCatExplorer": "HerdingCats.explorer.explore",
+    "CkanLoader": "HerdingCats.loader.loader",
+    "OpenDataSoftLoader": "HerdingCats.loader.loader",
+    "FrenchGouvLoader": "HerdingCats.loader.loader",
+    "CkanDataCatalogues": "HerdingCats.config.sources",
+    "OpenDataSoftDataCatalogues": "HerdingCats.config.sources",
+    "FrenchGouvCatalogue": "HerdingCats.config.sources",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Later lookups find the name directly and skip this hook
+    globals()[name] = value
+    return value
@@ -0,0 +1,215 @@
+import contextvars
+import math
+import random
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from herding_cats_interactive.handlers.command_profiler import profiled
+from herding_cats_interactive.handlers.command_scheduler import check_cancelled
+
+
+# Pages requested at once from one catalogue
+PAGE_CONCURRENCY = 8
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+# Longest wait before a retry, whatever Retry-After asks for
+MAX_BACKOFF = 30.0
+# Waits are slept in slices this long so a cancelled command stops promptly
+SLEEP_SLICE = 0.5
+PAGE_TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableStatus(requests.HTTPError):
+    """A response status worth retrying (rate limited or server error)."""
+
+
+def _retry_delay(attempt: int, response: Optional[requests.Response]) -> float:
+    """
+    Seconds to wait before a retry: Retry-After if given, else backoff,
+    capped at MAX_BACKOFF.
+    """
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), MAX_BACKOFF)
+    # Exponential backoff with jitter so parallel pages don't retry in lockstep
+    return min(BACKOFF_SECONDS * 2**attempt * (1 + random.random()), MAX_BACKOFF)
+
+
+def _wait(seconds: float) -> None:
+    """Sleep, checking between slices whether the command was cancelled."""
+    deadline = time.monotonic() + seconds
+    while True:
+        check_cancelled()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, SLEEP_SLICE))
+
+
+def fetch_page(
+    http_session: Optional[requests.Session],
+    url: str,
+    params: Dict[str, Any],
+    retries: int = MAX_RETRIES,
+) -> Dict[str, Any]:
+    """
+    Fetch one JSON page, retrying connection errors, timeouts, rate limits
+    and server errors with exponential backoff.
+
+    Args:
+        http_session: Session to fetch with
+        url: Page URL
+        params: Query parameters selecting the page
+        retries: Retries before giving up
+    Returns:
+        Dict[str, Any]: The decoded page
+    """
+    for attempt in range(retries + 1):
+        check_cancelled()
+        response = None
+        try:
+            response = (http_session or requests).get(
+                url, params=params, timeout=PAGE_TIMEOUT
+            )
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableStatus(
+                    f"{response.status_code} for {url}", response=response
+                )
+            response.raise_for_status()
+            return response.json()
+        except (requests.ConnectionError, requests.Timeout, RetryableStatus):
+            if attempt == retries:
+                raise
+            _wait(_retry_delay(attempt, response))
+
+
+def fetch_pages(
+    http_session: Optional[requests.Session],
+    url: str,
+    page_params: Callable[[int], Dict[str, Any]],
+    page_count: int,
+    concurrency: int = PAGE_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch pages 1..page_count-1 concurrently, in order.
+
+    Args:
+        http_session: Session to fetch with
+        url: Page URL
+        page_params: Query parameters for a page number
+        page_count: Total number of pages, including page 0
+        concurrency: Maximum pages in flight
+    Returns:
+        List[Dict[str, Any]]: Decoded pages, in page order
+    """
+    if page_count <= 1:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=min(concurrency, page_count - 1),
+        thread_name_prefix="herding-cats-page",
+    ) as pool:
+        # Each page keeps the calling command's context for cancellation and
+        # profiling
+        futures = [
+            pool.submit(
+                contextvars.copy_context().run,
+                profiled,
+                fetch_page,
+                http_session,
+                url,
+                page_params(number),
+            )
+            for number in range(1, page_count)
+        ]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def fetch_opendatasoft_datasets(
+    base_url: str,
+    http_session: Optional[requests.Session] = None,
+    concurrency: int = PAGE_CONCURRENCY,
+) -> Dict[str, str]:
+    """
+    List every dataset of an OpenDataSoft catalogue, fetching pages in parallel.
+
+    Returns:
+        Dict[str, str]: Dataset titles mapped to dataset ids
+    """
+    url = f"{base_url.rstrip('/')}/api/explore/v2.1/catalog/datasets"
+    limit = 100
+
+    def page_params(number: int) -> Dict[str, Any]:
+        return {
+            "limit": page_size,
+            "offset": number * page_size,
+            "select": "dataset_id,metas",
+        }
+
+    page_size = limit
+    first = fetch_page(http_session, url, page_params(0))
+    # The server may cap pages below the limit asked for, so page by what the
+    # first page actually held
+    page_size = min(len(first.get("results", [])), limit) or limit
+    page_count = math.ceil(first.get("total_count", 0) / page_size)
+    pages = [
+        first,
+        *fetch_pages(http_session, url, page_params, page_count, concurrency),
+    ]
+
+    datasets = {}
+    for page in pages:
+        for dataset in page.get("results", []):
+            title = ((dataset.get("metas") or {}).get("default") or {}).get("title")
+            if title and dataset.get("dataset_id"):
+                datasets[title] = dataset["dataset_id"]
+    return datasets
+
+
+def fetch_french_gov_datasets(
+    base_url: str,
+    http_session: Optional[requests.Session] = None,
+    concurrency: int = PAGE_CONCURRENCY,
+) -> Dict[str, str]:
+    """
+    List every dataset of the French Government catalogue, fetching pages in
+    parallel.
+
+    Returns:
+        Dict[str, str]: Dataset titles mapped to dataset ids
+    """
+    url = f"{base_url.rstrip('/')}/api/1/datasets/"
+    page_size = 100
+
+    def page_params(number: int) -> Dict[str, Any]:
+        # The API numbers pages from 1
+        return {"page": number + 1, "page_size": page_size}
+
+    first = fetch_page(http_session, url, page_params(0))
+    # The server may cap pages below the size asked for, so page by the size
+    # it reports (or the first page actually held)
+    page_size = (
+        first.get("page_size")
+        or min(len(first.get("data", [])), page_size)
+        or page_size
+    )
+    page_count = math.ceil(first.get("total", 0) / page_size)
+    pages = [
+        first,
+        *fetch_pages(http_session, url, page_params, page_count, concurrency),
+    ]
+
+    datasets = {}
+    for page in pages:
+        for dataset in page.get("data", []):
+            if dataset.get("title") and dataset.get("id"):
+                datasets[dataset["title"]] = dataset["id"]
+    return datasets
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import re
+import threading
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import duckdb
+    import polars as pl
+
+
+def table_name(dataset_id: str) -> str:
+    """Turn a dataset id into a valid, unquoted SQL table name."""
+    name = re.sub(r"\W+", "_", dataset_id.lower()).strip("_") or "dataset"
+    return f"t_{name}" if name[0].isdigit() else name
+
+
+class SqlEngine:
+    """
+    In-process DuckDB connection over loaded datasets.
+
+    Frames are registered as Arrow tables, which DuckDB scans in place
+    without copying, so queries over large datasets need no re-download
+    and no extra memory beyond their results.
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, pl.DataFrame] = {}
+        self._conn: Optional[duckdb.DuckDBPyConnection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> duckdb.DuckDBPyConnection:
+        """Open the DuckDB connection on first use."""
+        if self._conn is None:
+            # DuckDB is only imported once there is something to query
+            import duckdb
+
+            self._conn = duckdb.connect(":memory:")
+        return self._conn
+
+    def register(self, name: str, df: pl.DataFrame) -> None:
+        """Expose a frame as a table, replacing any table of the same name."""
+        with self._lock:
+            conn = self._connection()
+            if name in self.tables:
+                conn.unregister(name)
+            conn.register(name, df.to_arrow())
+            self.tables[name] = df
+
+    def query(self, sql: str) -> pl.DataFrame:
+        """
+        Run a query against the registered tables.
+
+        Args:
+            sql: DuckDB SQL
+        Returns:
+            pl.DataFrame: The query result
+        """
+        with self._lock:
+            return self._connection().execute(sql).pl()
+
+    def close(self) -> None:
+        """Drop every table and close the connection."""
+        with self._lock:
+            self.tables.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
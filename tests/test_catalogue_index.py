@@ -0,0 +1,75 @@
+"""
+Tests for CatalogueIndex harvesting and ranking.
+
+Usage:
+    pytest tests/test_catalogue_index.py
+"""
+
+import pytest
+
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+from herding_cats_interactive.search.catalogue_index import CatalogueIndex
+
+DATASETS = 60
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FixtureServer(FixtureConfig(datasets=DATASETS)) as server:
+        yield server
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = CatalogueIndex(tmp_path)
+    yield index
+    index.close()
+
+
+@pytest.mark.parametrize("catalogue_type", ["ckan", "opendatasoft", "french_gov"])
+def test_build_indexes_every_dataset(index, server, catalogue_type):
+    assert index.build("fixture", catalogue_type, server.url) == DATASETS
+    assert index.indexed_catalogues()["fixture"]["datasets"] == DATASETS
+
+
+def test_search_matches_prefixes_and_ranks_titles_first(index, server):
+    index.build("fixture", "ckan", server.url)
+    results = index.search("transp", limit=5)
+
+    assert len(results) == 5
+    assert all("Transport" in result["title"] for result in results)
+    scores = [result["score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_search_can_be_restricted_to_a_catalogue(index, server):
+    index.build("first", "ckan", server.url)
+    index.build("second", "opendatasoft", server.url)
+
+    results = index.search("crime", catalogue="second", limit=50)
+    assert results
+    assert {result["catalogue"] for result in results} == {"second"}
+    assert len(index.search("crime", limit=50)) == 2 * len(results)
+
+
+def test_query_without_terms_returns_nothing(index, server):
+    index.build("fixture", "ckan", server.url)
+    assert index.search("  -- ") == []
+
+
+def test_rebuild_replaces_a_catalogue(index, server):
+    index.build("fixture", "ckan", server.url)
+    index.build("fixture", "ckan", server.url)
+
+    assert len(index.search("statistics", limit=1000)) == DATASETS
+
+
+def test_index_persists_across_instances(tmp_path, server):
+    first = CatalogueIndex(tmp_path)
+    first.build("fixture", "french_gov", server.url)
+    first.close()
+    second = CatalogueIndex(tmp_path)
+
+    assert "fixture" in second.indexed_catalogues()
+    assert second.search("housing")
+    second.close()
@@ -0,0 +1,122 @@
+"""
+Tests for CommandProfile merging and the profile summary helpers.
+
+Usage:
+    pytest tests/test_command_profiler.py
+"""
+
+import contextvars
+import pstats
+import threading
+
+import pytest
+
+from herding_cats_interactive.handlers.command_profiler import (
+    CommandProfile,
+    _package,
+    current_profile,
+    profiled,
+    self_time_by_package,
+    top_cumulative,
+)
+
+SITE = "/venv/lib/python3.11/site-packages"
+
+
+def fake_stats(entries: dict) -> pstats.Stats:
+    """Stats over (filename, line, function): (calls, own, cumulative)."""
+    stats = pstats.Stats()
+    stats.stats = {
+        key: (calls, calls, own, cumulative, {})
+        for key, (calls, own, cumulative) in entries.items()
+    }
+    return stats
+
+
+@pytest.mark.parametrize(
+    "filename, function, package",
+    [
+        (f"{SITE}/polars/io/csv/functions.py", "read_csv", "polars"),
+        (f"{SITE}/requests/sessions.py", "send", "requests"),
+        (f"{SITE}/six.py", "iteritems", "six"),
+        (
+            "/src/herding_cats_interactive/handlers/input_handler.py",
+            "f",
+            "herding_cats_interactive",
+        ),
+        ("/usr/lib/python3.11/json/decoder.py", "decode", "json"),
+        ("/usr/lib/python3.11/ssl.py", "read", "ssl"),
+        ("~", "<method 'recv_into' of '_socket.socket' objects>", "built-in _socket"),
+        ("~", "<built-in method time.sleep>", "built-in time"),
+        ("~", "<built-in method builtins.exec>", "built-in builtins"),
+        ("/tmp/script.py", "main", "script"),
+    ],
+)
+def test_package(filename, function, package):
+    assert _package(filename, function) == package
+
+
+def test_self_time_is_summed_per_package_largest_first():
+    stats = fake_stats(
+        {
+            (f"{SITE}/polars/frame.py", 1, "a"): (1, 0.5, 2.0),
+            (f"{SITE}/polars/io.py", 2, "b"): (3, 1.0, 1.0),
+            (f"{SITE}/requests/api.py", 3, "get"): (1, 0.2, 3.0),
+            ("/usr/lib/python3.11/json/decoder.py", 4, "decode"): (5, 0.1, 0.1),
+        }
+    )
+
+    assert self_time_by_package(stats) == [
+        ("polars", 1.5),
+        ("requests", 0.2),
+        ("json", 0.1),
+    ]
+    assert self_time_by_package(stats, limit=1) == [("polars", 1.5)]
+
+
+def test_top_cumulative_orders_and_names_functions():
+    stats = fake_stats(
+        {
+            (f"{SITE}/polars/frame.py", 10, "a"): (1, 0.5, 2.0),
+            (f"{SITE}/requests/api.py", 20, "get"): (2, 0.2, 3.0),
+            ("~", 0, "<built-in method time.sleep>"): (4, 1.0, 1.0),
+        }
+    )
+
+    top = top_cumulative(stats, limit=2)
+    assert [row["function"] for row in top] == ["api.py:20(get)", "frame.py:10(a)"]
+    assert top[0] == {
+        "calls": 2,
+        "own": 0.2,
+        "cumulative": 3.0,
+        "function": "api.py:20(get)",
+    }
+    assert top_cumulative(stats)[-1]["function"] == "<built-in method time.sleep>"
+
+
+def busy_thread_work() -> int:
+    return sum(range(10_000))
+
+
+def test_profile_merges_pool_thread_calls():
+    profile = CommandProfile("load crime csv")
+    token = current_profile.set(profile)
+    try:
+        profile.start()
+        # Run as a pool thread would, inside the command's copied context
+        context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(profiled, busy_thread_work))
+        thread.start()
+        thread.join()
+        profile.stop()
+    finally:
+        current_profile.reset(token)
+
+    assert profile.thread_calls == 1
+    assert profile.elapsed > 0
+    functions = {function for _, _, function in profile.stats().stats}
+    assert "busy_thread_work" in functions
+
+
+def test_profiled_without_a_profile_just_calls():
+    assert profiled(busy_thread_work) == sum(range(10_000))
@@ -0,0 +1,225 @@
+"""
+Tests for CommandScheduler barriers and cancellation.
+
+Usage:
+    pytest tests/test_command_scheduler.py
+"""
+
+import asyncio
+
+from herding_cats_interactive.handlers.command_scheduler import CommandScheduler
+from herding_cats_interactive.handlers.input_handler import runs_alone, waits_for
+
+
+class NullLogHandler:
+    def finish(self, command) -> None:
+        pass
+
+
+class FakeApp:
+    """Runs workers as plain tasks, as the scheduler only awaits and cancels them."""
+
+    def __init__(self):
+        self.logger_handler = NullLogHandler()
+        self.tasks = []
+
+    def run_worker(self, work, *args, **kwargs):
+        task = asyncio.ensure_future(work)
+        self.tasks.append(task)
+        return task
+
+    async def wait(self) -> None:
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+def recording_handler(events: list, delays: dict):
+    async def handler(text: str) -> None:
+        events.append(("start", text))
+        await asyncio.sleep(delays.get(text, 0.01))
+        events.append(("end", text))
+
+    return handler
+
+
+def test_exclusive_command_waits_for_earlier_and_blocks_later():
+    events = []
+
+    async def run():
+        app = FakeApp()
+        scheduler = CommandScheduler(
+            app,
+            recording_handler(events, {"list packages": 0.05}),
+            exclusive=runs_alone,
+        )
+        scheduler.submit("list packages")
+        scheduler.submit("connect paris")
+        scheduler.submit("list datasets")
+        await app.wait()
+
+    asyncio.run(run())
+    assert events == [
+        ("start", "list packages"),
+        ("end", "list packages"),
+        ("start", "connect paris"),
+        ("end", "connect paris"),
+        ("start", "list datasets"),
+        ("end", "list datasets"),
+    ]
+
+
+def test_profiled_connection_command_is_exclusive():
+    events = []
+
+    async def run():
+        app = FakeApp()
+        scheduler = CommandScheduler(
+            app,
+            recording_handler(events, {"list packages": 0.05}),
+            exclusive=runs_alone,
+        )
+        scheduler.submit("list packages")
+        scheduler.submit("profile --top 5 use paris")
+        await app.wait()
+
+    asyncio.run(run())
+    assert events.index(("end", "list packages")) < events.index(
+        ("start", "profile --top 5 use paris")
+    )
+
+
+def test_non_exclusive_commands_run_concurrently():
+    events = []
+
+    async def run():
+        app = FakeApp()
+        scheduler = CommandScheduler(
+            app, recording_handler(events, {}), exclusive=runs_alone
+        )
+        scheduler.submit("list packages")
+        scheduler.submit("search crime")
+        await app.wait()
+
+    asyncio.run(run())
+    assert [kind for kind, _ in events] == ["start", "start", "end", "end"]
+
+
+def test_sql_waits_for_earlier_loads_only():
+    events = []
+
+    async def run():
+        app = FakeApp()
+        scheduler = CommandScheduler(
+            app,
+            recording_handler(events, {"load crime csv": 0.05}),
+            exclusive=runs_alone,
+            waits_for=waits_for,
+        )
+        scheduler.submit("load crime csv")
+        scheduler.submit("list packages")
+        scheduler.submit("sql SELECT * FROM crime")
+        await app.wait()
+
+    asyncio.run(run())
+    # The listing doesn't wait for the load, but the query does
+    assert events.index(("start", "list packages")) < events.index(
+        ("end", "load crime csv")
+    )
+    assert events.index(("end", "load crime csv")) < events.index(
+        ("start", "sql SELECT * FROM crime")
+    )
+
+
+def test_local_search_waits_for_index_build():
+    events = []
+
+    async def run():
+        app = FakeApp()
+        scheduler = CommandScheduler(
+            app,
+            recording_handler(events, {"index build": 0.05}),
+            exclusive=runs_alone,
+            waits_for=waits_for,
+        )
+        scheduler.submit("index build")
+        scheduler.submit("search --all crime")
+        scheduler.submit("search crime")
+        await app.wait()
+
+    asyncio.run(run())
+    assert events.index(("start", "search --all crime")) < events.index(
+        ("end", "index build")
+    )
+    assert events.index(("end", "index build")) < events.index(
+        ("start", "search crime")
+    )
+
+
+def test_dependencies_see_through_profile():
+    assert waits_for("profile sql SELECT 1", "load crime csv")
+    assert waits_for("sql SELECT 1", "profile --top 5 load crime csv")
+    assert waits_for("profile list packages", "profile search crime")
+    assert not waits_for("sql SELECT 1", "list packages")
+    assert not waits_for("load crime csv", "sql SELECT 1")
+    assert runs_alone("profile --out use.prof use paris")
+    assert not runs_alone("load crime csv")
+
+
+def test_cancel_latest_stops_the_command():
+    events = []
+
+    async def run():
+        app = FakeApp()
+        scheduler = CommandScheduler(
+            app, recording_handler(events, {"list packages": 10}), exclusive=runs_alone
+        )
+        command = scheduler.submit("list packages")
+        await asyncio.sleep(0.01)
+        assert scheduler.cancel_latest() is command
+        await app.wait()
+        return scheduler, command
+
+    scheduler, command = asyncio.run(run())
+    assert command.cancelled
+    assert command.finished.is_set()
+    assert scheduler.in_flight == []
+    assert ("end", "list packages") not in events
+
+
+def test_commands_behind_a_cancelled_barrier_still_run():
+    events = []
+
+    async def run():
+        app = FakeApp()
+        scheduler = CommandScheduler(
+            app,
+            recording_handler(events, {"list packages": 0.05}),
+            exclusive=runs_alone,
+        )
+        scheduler.submit("list packages")
+        barrier = scheduler.submit("connect paris")
+        scheduler.submit("list datasets")
+        scheduler.cancel(barrier)
+        await app.wait()
+
+    asyncio.run(run())
+    assert ("start", "connect paris") not in events
+    # Still waits for what the cancelled barrier waited for
+    assert events.index(("end", "list packages")) < events.index(
+        ("start", "list datasets")
+    )
+
+
+def test_cancel_all_empties_the_queue():
+    async def run():
+        app = FakeApp()
+        scheduler = CommandScheduler(
+            app, recording_handler([], {}), max_concurrent=1, exclusive=runs_alone
+        )
+        commands = [scheduler.submit(f"search term-{i}") for i in range(3)]
+        scheduler.cancel_all()
+        await app.wait()
+        return scheduler, commands
+
+    scheduler, commands = asyncio.run(run())
+    assert scheduler.in_flight == []
+    assert all(command.cancelled for command in commands)
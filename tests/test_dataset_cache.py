@@ -0,0 +1,158 @@
+"""
+Tests for the DatasetCache keys, Parquet files and their eviction.
+
+Usage:
+    pytest tests/test_dataset_cache.py
+"""
+
+import os
+
+import polars as pl
+import pytest
+import requests
+
+from benchmarks.fixture_server import FixtureServer
+from herding_cats_interactive.cache.dataset_cache import DatasetCache
+
+
+def frame(rows: int = 1_000) -> pl.DataFrame:
+    return pl.DataFrame({"id": range(rows), "value": [f"v{i}" for i in range(rows)]})
+
+
+def size_of(tmp_path, df: pl.DataFrame) -> int:
+    path = tmp_path / "probe.parquet"
+    df.write_parquet(path)
+    size = path.stat().st_size
+    path.unlink()
+    return size
+
+
+def age(path, seconds: float) -> None:
+    """Make a cache file look last used some seconds ago."""
+    used = path.stat().st_mtime - seconds
+    os.utime(path, (used, used))
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FixtureServer() as server:
+        yield server
+
+
+class VersionedSession:
+    """Answers HEAD requests with the given validator headers."""
+
+    def __init__(self, **headers):
+        self.headers = headers
+        self.ok = True
+
+    def head(self, url, **kwargs):
+        if self.headers.get("fail"):
+            raise requests.ConnectionError(url)
+        return self
+
+
+def test_key_depends_on_url_format_and_version(tmp_path):
+    cache = DatasetCache(tmp_path)
+    url = "https://example.org/crime.csv"
+    session = VersionedSession(**{"Last-Modified": "Mon, 01 Jan 2024"})
+    path = cache.entry(url, "csv", session)
+
+    assert path.parent == cache.directory
+    assert path.suffix == ".parquet"
+    assert cache.entry(url, "CSV", session) == path
+    assert cache.entry(url, "parquet", session) != path
+    assert cache.entry(url + "?v=2", "csv", session) != path
+
+    # A changed resource gets a new key
+    session.headers["Last-Modified"] = "Tue, 02 Jan 2024"
+    assert cache.entry(url, "csv", session) != path
+
+
+def test_key_falls_back_to_etag_then_ttl_window(tmp_path):
+    cache = DatasetCache(tmp_path)
+    url = "https://example.org/crime.csv"
+    etag = cache.entry(url, "csv", VersionedSession(ETag='"v1"'))
+    assert cache.entry(url, "csv", VersionedSession(ETag='"v2"')) != etag
+
+    # Without validators, or without a response, the TTL window is the version
+    window = cache.entry(url, "csv", VersionedSession())
+    assert window != etag
+    assert cache.entry(url, "csv", VersionedSession(fail=True)) == window
+
+
+def test_write_then_read(tmp_path):
+    cache = DatasetCache(tmp_path)
+    path = cache.directory / "entry.parquet"
+
+    assert cache.read(path) is None
+    assert cache.write(path, frame()) is None
+    assert cache.read(path).equals(frame())
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    df = frame()
+    # Room for two files but not three
+    cache = DatasetCache(tmp_path, max_bytes=size_of(tmp_path, df) * 2 + 100)
+    oldest, older, newest = (cache.directory / f"{n}.parquet" for n in range(3))
+
+    cache.write(oldest, df)
+    age(oldest, 20)
+    cache.write(older, df)
+    age(older, 10)
+    # Reading marks the oldest file as just used, so the other goes first
+    assert cache.read(oldest) is not None
+    cache.write(newest, df)
+
+    assert oldest.exists()
+    assert not older.exists()
+    assert newest.exists()
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_unwritable_frame_is_reported_not_cached(tmp_path):
+    cache = DatasetCache(tmp_path)
+    df = pl.DataFrame({"value": [object()]}, schema={"value": pl.Object})
+
+    error = cache.write(cache.directory / "entry.parquet", df)
+    assert error and error.startswith("Could not cache dataset")
+    assert cache.stats()["files"] == 0
+
+
+def test_get_or_load_caches_by_resource_version(tmp_path, server):
+    cache = DatasetCache(tmp_path)
+    url = f"{server.url}/files/dataset-00001-0.csv"
+    loads = []
+
+    def load():
+        loads.append(1)
+        return frame()
+
+    first, error = cache.get_or_load(url, "csv", load)
+    second, _ = cache.get_or_load(url, "csv", load)
+
+    assert error is None
+    assert first.equals(second)
+    assert len(loads) == 1
+    # Another format of the same resource is cached separately
+    cache.get_or_load(url, "parquet", load)
+    assert len(loads) == 2
+
+
+def test_loader_errors_pass_through_uncached(tmp_path, server):
+    cache = DatasetCache(tmp_path)
+    url = f"{server.url}/files/dataset-00001-0.csv"
+
+    result, error = cache.get_or_load(url, "csv", lambda: "No dataset found")
+    assert (result, error) == ("No dataset found", None)
+    assert cache.stats()["files"] == 0
+
+
+def test_clear_removes_every_file(tmp_path):
+    cache = DatasetCache(tmp_path)
+    for n in range(3):
+        cache.write(cache.directory / f"{n}.parquet", frame(10))
+
+    assert cache.clear() == 3
+    assert cache.stats()["files"] == 0
@@ -0,0 +1,195 @@
+"""
+Tests for stream_csv previews and separator detection.
+
+Usage:
+    pytest tests/test_dataset_stream.py
+"""
+
+import pytest
+
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+from herding_cats_interactive.utils import dataset_stream
+from herding_cats_interactive.utils.dataset_stream import sniff_separator, stream_csv
+
+
+class FakeResponse:
+    """A streamed response handing out fixed chunks, counting those read."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+class FakeSession:
+    def __init__(self, chunks):
+        self.response = FakeResponse(chunks)
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def csv_lines(count: int, separator: str = ",") -> list:
+    return [f"id{separator}name\n".encode()] + [
+        f"{i}{separator}row {i}\n".encode() for i in range(count)
+    ]
+
+
+class RecordingParse:
+    """Wraps the preview parser, recording the buffer size of each attempt."""
+
+    def __init__(self, parse):
+        self.parse = parse
+        self.sizes = []
+        # Make every attempt fail, as with an unparseable start
+        self.fail = False
+
+    def __call__(self, buffer, rows, separator=","):
+        self.sizes.append(len(buffer))
+        return None if self.fail else self.parse(buffer, rows, separator)
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    parse = RecordingParse(dataset_stream._parse_preview)
+    monkeypatch.setattr(dataset_stream, "_parse_preview", parse)
+    return parse
+
+
+@pytest.mark.parametrize(
+    "header, separator",
+    [
+        (b"id,name\n", ","),
+        (b"id;name;geo_point_2d\n", ";"),
+        (b"id\tname\n", "\t"),
+        # Separators inside quoted names don't count
+        (b'"a,b";"c,d";e\n', ";"),
+        (b"id\n", ","),
+    ],
+)
+def test_sniff_separator(header, separator):
+    assert sniff_separator(header) == separator
+
+
+def test_semicolon_separated_csv_loads(parses):
+    previews = []
+    frame = stream_csv(
+        "http://example/export.csv",
+        3,
+        previews.append,
+        http_session=FakeSession([b"".join(csv_lines(10, ";"))]),
+    )
+
+    assert frame.columns == ["id", "name"]
+    assert frame.height == 10
+    assert previews[0].columns == ["id", "name"]
+    assert previews[0].height == 3
+
+
+def test_preview_is_retried_only_once_new_lines_arrive(parses):
+    lines = csv_lines(6)
+    # A quoted field spans the first cut, so the first parse fails
+    chunks = [b"".join(lines[:4]) + b'7,"split\n', b"still open", b'"\n', *lines[4:]]
+    previews = []
+    frame = stream_csv(
+        "http://example/data.csv", 3, previews.append, http_session=FakeSession(chunks)
+    )
+
+    # No attempt for the chunk without a line break
+    assert len(parses.sizes) == 2
+    assert previews[0].height == 3
+    assert frame.height == 7
+
+
+def test_preview_gives_up_after_max_attempts(parses):
+    parses.fail = True
+    previews = []
+    session = FakeSession(csv_lines(30))
+    frame = stream_csv(
+        "http://example/data.csv", 3, previews.append, http_session=session
+    )
+
+    assert len(parses.sizes) == dataset_stream.PREVIEW_MAX_ATTEMPTS
+    assert previews == []
+    # The full load still completes
+    assert frame.height == 30
+
+
+def test_preview_gives_up_once_buffer_is_too_large(parses, monkeypatch):
+    monkeypatch.setattr(dataset_stream, "PREVIEW_MAX_BYTES", 64)
+    parses.fail = True
+    frame = stream_csv(
+        "http://example/data.csv", 3, print, http_session=FakeSession(csv_lines(30))
+    )
+
+    assert len(parses.sizes) < dataset_stream.PREVIEW_MAX_ATTEMPTS
+    assert parses.sizes[-1] >= 64
+    assert frame.height == 30
+
+
+def test_preview_only_stops_reading_after_preview(parses):
+    previews = []
+    session = FakeSession(csv_lines(30))
+    frame = stream_csv(
+        "http://example/data.csv",
+        3,
+        previews.append,
+        full=False,
+        http_session=session,
+    )
+
+    assert frame.height == 3
+    assert previews == []
+    assert session.response.read < len(session.response.chunks)
+
+
+def test_preview_only_raises_when_unparseable(parses):
+    parses.fail = True
+    with pytest.raises(ValueError, match="first 3 rows"):
+        stream_csv(
+            "http://example/data.csv",
+            3,
+            print,
+            full=False,
+            http_session=FakeSession(csv_lines(30)),
+        )
+
+
+def test_preview_only_of_short_resource_returns_all_rows(parses):
+    frame = stream_csv(
+        "http://example/data.csv",
+        10,
+        print,
+        full=False,
+        http_session=FakeSession([b"".join(csv_lines(4, ";"))]),
+    )
+
+    assert frame.columns == ["id", "name"]
+    assert frame.height == 4
+
+
+def test_opendatasoft_export_loads_from_fixture_server():
+    config = FixtureConfig(csv_rows=50, csv_columns=4)
+    with FixtureServer(config) as server:
+        url = (
+            f"{server.url}/api/explore/v2.1/catalog/datasets/dataset-00001/exports/csv"
+        )
+        previews = []
+        frame = stream_csv(url, 5, previews.append)
+
+    assert frame.columns == ["id", "area", "value", "col_3"]
+    assert frame.height == 50
+    assert previews[0].height == 5
@@ -0,0 +1,72 @@
+"""
+Tests for the ExplorerMemo session LRU.
+
+Usage:
+    pytest tests/test_explorer_memo.py
+"""
+
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from herding_cats_interactive.cache.explorer_memo import ExplorerMemo
+
+
+def test_concurrent_misses_call_once():
+    memo = ExplorerMemo()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        # Hold the first call until every caller is waiting on the key
+        release.wait(timeout=5)
+        return {"id": "dataset"}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [
+            pool.submit(memo.get_or_call, ("ckan", "show_package_info", "x"), fetch)
+            for _ in range(8)
+        ]
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result == {"id": "dataset"} for result in results)
+    assert memo.misses == 1
+    assert memo.hits == 7
+
+
+def test_failed_call_is_not_cached():
+    memo = ExplorerMemo()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        memo.get_or_call(("ckan", "info", "x"), fail)
+    assert memo.get_or_call(("ckan", "info", "x"), lambda: "ok") == "ok"
+
+
+def test_least_recently_used_entry_is_evicted():
+    memo = ExplorerMemo(maxsize=2)
+    memo.get_or_call(("ckan", "a"), lambda: 1)
+    memo.get_or_call(("ckan", "b"), lambda: 2)
+    # Touch a, so b is now the oldest
+    memo.get_or_call(("ckan", "a"), lambda: None)
+    memo.get_or_call(("ckan", "c"), lambda: 3)
+
+    assert memo.get_or_call(("ckan", "a"), lambda: "refetched") == 1
+    assert memo.get_or_call(("ckan", "b"), lambda: "refetched") == "refetched"
+
+
+def test_clear_one_catalogue():
+    memo = ExplorerMemo()
+    memo.get_or_call(("ckan", "a"), lambda: 1)
+    memo.get_or_call(("paris", "a"), lambda: 2)
+    memo.clear("ckan")
+
+    assert memo.get_or_call(("ckan", "a"), lambda: "refetched") == "refetched"
+    assert memo.get_or_call(("paris", "a"), lambda: "refetched") == 2
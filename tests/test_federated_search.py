@@ -0,0 +1,98 @@
+"""
+Tests for FederatedSearch result merging and concurrent search.
+
+Usage:
+    pytest tests/test_federated_search.py
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+from herding_cats_interactive.search.federated_search import (
+    CatalogueResults,
+    FederatedSearch,
+)
+
+
+def results(catalogue: str, *titles: str) -> CatalogueResults:
+    return CatalogueResults(
+        catalogue,
+        0.1,
+        [{"id": f"{catalogue}-{i}", "title": title} for i, title in enumerate(titles)],
+    )
+
+
+def test_more_matching_terms_outrank_catalogue_position():
+    merged = FederatedSearch.merge(
+        [
+            results("a", "Crime figures", "Crime by borough"),
+            results("b", "Housing", "Borough crime statistics"),
+        ],
+        "borough crime",
+    )
+
+    assert [result["id"] for result in merged[:2]] == ["a-1", "b-1"]
+    assert merged[0]["score"] > 1
+
+
+def test_ties_are_broken_by_each_catalogues_order():
+    merged = FederatedSearch.merge(
+        [
+            results("a", "Transport", "Transport hubs"),
+            results("b", "Transport stops"),
+        ],
+        "transport",
+    )
+
+    # Every title matches, so first results of each catalogue come first
+    assert [result["id"] for result in merged] == ["a-0", "b-0", "a-1"]
+    assert merged[0]["score"] == merged[1]["score"]
+
+
+def test_failed_catalogues_and_limit():
+    failed = CatalogueResults("down", 1.0, error="timed out")
+    merged = FederatedSearch.merge(
+        [failed, results("a", *(f"Energy {i}" for i in range(30)))], "energy", limit=5
+    )
+
+    assert len(merged) == 5
+    assert {result["catalogue"] for result in merged} == {"a"}
+
+
+def test_query_without_terms_keeps_catalogue_order():
+    merged = FederatedSearch.merge([results("a", "First", "Second")], "--")
+    assert [result["title"] for result in merged] == ["First", "Second"]
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FixtureServer(FixtureConfig(datasets=60)) as server:
+        yield server
+
+
+def test_search_reports_every_catalogue(server):
+    search = FederatedSearch()
+    catalogues = [
+        ("ckan", "ckan", server.url),
+        ("ods", "opendatasoft", server.url),
+        ("down", "ckan", "http://127.0.0.1:9"),
+    ]
+
+    async def collect():
+        return [response async for response in search.search(catalogues, "crime", 5)]
+
+    try:
+        responses = {
+            response.catalogue: response for response in asyncio.run(collect())
+        }
+    finally:
+        search.shutdown()
+
+    assert set(responses) == {"ckan", "ods", "down"}
+    assert responses["down"].error
+    for name in ("ckan", "ods"):
+        assert responses[name].error is None
+        assert 0 < len(responses[name].results) <= 5
+        assert all("Crime" in result["title"] for result in responses[name].results)
@@ -0,0 +1,96 @@
+"""
+Tests for reading and ordering headless command scripts.
+
+Usage:
+    pytest tests/test_headless.py
+"""
+
+import asyncio
+
+import pytest
+
+from herding_cats_interactive.app.headless import (
+    HeadlessCats,
+    _split_line,
+    read_commands,
+)
+
+
+@pytest.mark.parametrize(
+    "line, parts",
+    [
+        ("list packages", ["list packages"]),
+        ("connect paris; list datasets", ["connect paris", " list datasets"]),
+        ("a;;b", ["a", "", "b"]),
+        (
+            "sql SELECT * FROM t WHERE name = 'a;b'; list orgs",
+            ["sql SELECT * FROM t WHERE name = 'a;b'", " list orgs"],
+        ),
+        ('sql SELECT "x;y" FROM t', ['sql SELECT "x;y" FROM t']),
+        # A quote inside the other kind of quotes doesn't end the string
+        (
+            """sql SELECT "it's;here" FROM t; next""",
+            ['sql SELECT "it\'s;here" FROM t', " next"],
+        ),
+        # An unterminated quote runs to the end of the line
+        ("sql SELECT 'a; b", ["sql SELECT 'a; b"]),
+    ],
+)
+def test_split_line(line, parts):
+    assert _split_line(line) == parts
+
+
+def test_read_commands_skips_blanks_and_comments():
+    script = [
+        "# set up\n",
+        "connect london-datastore\n",
+        "\n",
+        "   # indented comment\n",
+        "list packages; list orgs\n",
+        "sql SELECT ';' AS semicolon;\n",
+    ]
+    assert read_commands(script) == [
+        "connect london-datastore",
+        "list packages",
+        "list orgs",
+        "sql SELECT ';' AS semicolon",
+    ]
+
+
+def test_commands_wait_only_for_what_they_depend_on():
+    events = []
+    delays = {"load crime csv": 0.05, "list packages": 0.02}
+
+    async def handle_command(text: str) -> None:
+        events.append(("start", text))
+        await asyncio.sleep(delays.get(text, 0.01))
+        events.append(("end", text))
+
+    app = HeadlessCats()
+    app.input_handler.handle_command = handle_command
+    script = [
+        "load crime csv",
+        "list packages",
+        "sql SELECT * FROM crime",
+        "connect paris",
+        "list datasets",
+    ]
+    records = []
+    assert asyncio.run(app.run_commands(script, records.append))
+
+    assert len(records) == len(script)
+    # The listing runs alongside the load; the query waits for it
+    assert events.index(("start", "list packages")) < events.index(
+        ("end", "load crime csv")
+    )
+    assert events.index(("end", "load crime csv")) < events.index(
+        ("start", "sql SELECT * FROM crime")
+    )
+    # connect runs alone, after everything before it
+    start = events.index(("start", "connect paris"))
+    assert events[start - 1 : start + 3] == [
+        ("end", "sql SELECT * FROM crime"),
+        ("start", "connect paris"),
+        ("end", "connect paris"),
+        ("start", "list datasets"),
+    ]
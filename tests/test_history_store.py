@@ -0,0 +1,80 @@
+"""
+Tests for HistoryStore spilling and disk budget truncation.
+
+Usage:
+    pytest tests/test_history_store.py
+"""
+
+from rich.style import Style
+from rich.text import Text
+
+from herding_cats_interactive.handlers.history_store import HistoryStore, text_size
+
+
+def page(number: int) -> list:
+    text = Text(f"page {number} ", style=Style(color="green"))
+    text.append("detail", style=Style(color="cyan", bold=True))
+    return [text, Text(f"{number}\n")]
+
+
+def add(store: HistoryStore, number: int) -> int:
+    texts = page(number)
+    return store.add(texts, sum(text_size(text) for text in texts))
+
+
+def test_pages_stay_in_memory_within_budget():
+    store = HistoryStore(memory_budget=1024 * 1024)
+    numbers = [add(store, i) for i in range(5)]
+
+    assert numbers == list(range(5))
+    assert len(store) == 5
+    assert store.stats()["pages-on-disk"] == 0
+    assert store.get(3) == page(3)
+
+
+def test_oldest_pages_spill_and_read_back_intact():
+    # Room for a single page in memory
+    store = HistoryStore(memory_budget=100)
+    for i in range(4):
+        add(store, i)
+
+    stats = store.stats()
+    assert stats["pages-in-memory"] == 1
+    assert stats["pages-on-disk"] == 3
+    assert stats["memory-bytes"] <= store.memory_budget
+    for i in range(4):
+        restored = store.get(i)
+        assert [text.plain for text in restored] == [text.plain for text in page(i)]
+        assert restored[0].style == Style(color="green")
+        assert restored[0].spans == page(i)[0].spans
+
+
+def test_disk_budget_drops_older_pages():
+    store = HistoryStore(memory_budget=100, disk_budget=300)
+    for i in range(10):
+        add(store, i)
+
+    assert store.first > 0
+    assert len(store) == store.next - store.first
+    assert store.disk_bytes <= store.disk_budget
+    assert store.get(0) is None
+    assert store.get(store.first) is not None
+    assert store.get(store.next - 1) == page(store.next - 1)
+
+
+def test_get_unknown_page_returns_none():
+    store = HistoryStore()
+    add(store, 0)
+    assert store.get(5) is None
+
+
+def test_clear_removes_everything():
+    store = HistoryStore(memory_budget=100)
+    for i in range(3):
+        add(store, i)
+    store.clear()
+
+    assert len(store) == 0
+    assert store.stats()["disk-bytes"] == 0
+    assert store.get(0) is None
+    assert add(store, 0) == 0
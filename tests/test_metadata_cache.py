@@ -0,0 +1,156 @@
+"""
+Tests for MetadataCache expiry and ETag/Last-Modified revalidation.
+
+Usage:
+    pytest tests/test_metadata_cache.py
+"""
+
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from herding_cats_interactive.cache.metadata_cache import MetadataCache
+
+
+class ValidatingHandler(BaseHTTPRequestHandler):
+    """Answers conditional requests with 304 while the ETag is unchanged."""
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        etag = self.server.etag
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def listing_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ValidatingHandler)
+    server.etag = '"v1"'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    server.url = f"http://{host}:{port}/api/3/action/package_list"
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class Fetch:
+    """A listing fetch counting its calls."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_fresh_entry_is_served_from_cache(tmp_path):
+    cache = MetadataCache(tmp_path)
+    fetch = Fetch(["a", "b"])
+
+    assert cache.get_or_fetch("ckan", "packages", fetch) == ["a", "b"]
+    assert cache.get_or_fetch("ckan", "packages", fetch) == ["a", "b"]
+    assert fetch.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_entries_persist_across_instances(tmp_path):
+    first = MetadataCache(tmp_path)
+    first.get_or_fetch("ckan", "packages", Fetch(["a"]))
+    first.close()
+    second = MetadataCache(tmp_path)
+    fetch = Fetch(["b"])
+
+    assert second.get_or_fetch("ckan", "packages", fetch) == ["a"]
+    assert fetch.calls == 0
+    second.close()
+
+
+def test_stale_entry_without_validators_is_refetched(tmp_path):
+    cache = MetadataCache(tmp_path, ttl=0)
+    cache.get_or_fetch("ckan", "packages", Fetch(["old"]))
+    fetch = Fetch(["new"])
+
+    assert cache.get_or_fetch("ckan", "packages", fetch) == ["new"]
+    assert fetch.calls == 1
+    assert cache.revalidated == 0
+    cache.close()
+
+
+def test_stale_entry_is_revalidated_while_unchanged(tmp_path, listing_server):
+    cache = MetadataCache(tmp_path, ttl=0)
+    cache.get_or_fetch(
+        "ckan", "packages", Fetch(["old"]), validate_url=listing_server.url
+    )
+    fetch = Fetch(["new"])
+
+    result = cache.get_or_fetch(
+        "ckan", "packages", fetch, validate_url=listing_server.url
+    )
+    assert result == ["old"]
+    assert fetch.calls == 0
+    assert cache.revalidated == 1
+
+    # Once the listing changes, the conditional request no longer matches
+    listing_server.etag = '"v2"'
+    result = cache.get_or_fetch(
+        "ckan", "packages", fetch, validate_url=listing_server.url
+    )
+    assert result == ["new"]
+    assert fetch.calls == 1
+    cache.close()
+
+
+class SlowFetch(Fetch):
+    """A fetch slow enough for concurrent callers to overlap."""
+
+    def __call__(self):
+        time.sleep(0.1)
+        return super().__call__()
+
+
+def test_concurrent_misses_fetch_once(tmp_path):
+    cache = MetadataCache(tmp_path)
+    fetch = SlowFetch(["a"])
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(
+            pool.map(lambda _: cache.get_or_fetch("ckan", "packages", fetch), range(4))
+        )
+
+    assert results == [["a"]] * 4
+    assert fetch.calls == 1
+    cache.close()
+
+
+def test_clear_one_catalogue(tmp_path):
+    cache = MetadataCache(tmp_path)
+    cache.get_or_fetch("ckan", "packages", Fetch(["a"]))
+    cache.get_or_fetch("paris", "datasets", Fetch({"b": "c"}))
+
+    assert cache.clear("ckan") == 1
+    fetch = Fetch(["refetched"])
+    assert cache.get_or_fetch("ckan", "packages", fetch) == ["refetched"]
+    assert cache.get_or_fetch("paris", "datasets", fetch) == {"b": "c"}
+    assert fetch.calls == 1
+    cache.close()
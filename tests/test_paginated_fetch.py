@@ -0,0 +1,32 @@
+"""
+Tests for the parallel paginated listing fetches.
+
+Usage:
+    pytest tests/test_paginated_fetch.py
+"""
+
+import pytest
+
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+from herding_cats_interactive.utils.paginated_fetch import (
+    fetch_french_gov_datasets,
+    fetch_opendatasoft_datasets,
+)
+
+
+@pytest.fixture(scope="module")
+def capped_server():
+    # Pages are capped well below the 100 the client asks for
+    with FixtureServer(FixtureConfig(datasets=230, max_page_size=30)) as server:
+        yield server
+
+
+@pytest.mark.parametrize(
+    "fetch", [fetch_opendatasoft_datasets, fetch_french_gov_datasets]
+)
+def test_fetch_respects_server_page_cap(capped_server, fetch):
+    datasets = fetch(capped_server.url)
+    expected = {
+        dataset["title"]: dataset["id"] for dataset in capped_server.catalogue.datasets
+    }
+    assert datasets == expected
@@ -0,0 +1,190 @@
+"""
+Tests for how ExtendedRichLogHandler shares the live page between commands
+and paginates long listings.
+
+Usage:
+    pytest tests/test_rich_log_handler.py
+"""
+
+import contextlib
+
+import pytest
+
+from herding_cats_interactive.handlers.command_scheduler import (
+    ScheduledCommand,
+    current_command,
+)
+from herding_cats_interactive.handlers.rich_log_handler import ExtendedRichLogHandler
+
+
+class RecordingLog:
+    """Stands in for the RichLog widget, keeping what is on display."""
+
+    border_title = ""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, text, scroll_end=None) -> None:
+        self.lines.append(text.plain.strip())
+
+    def clear(self) -> None:
+        self.lines = []
+
+
+@contextlib.contextmanager
+def running(command):
+    token = current_command.set(command)
+    try:
+        yield
+    finally:
+        current_command.reset(token)
+
+
+@pytest.fixture
+def log():
+    return RecordingLog()
+
+
+@pytest.fixture
+def handler(log):
+    return ExtendedRichLogHandler(log)
+
+
+def test_first_command_to_write_owns_the_page(handler, log):
+    first, second = ScheduledCommand(1, "list packages"), ScheduledCommand(2, "search")
+    with running(first):
+        handler.write("first output")
+    with running(second):
+        handler.write("second output")
+
+    assert log.lines == ["first output"]
+
+
+def test_held_back_output_is_shown_when_owner_finishes(handler, log):
+    first, second = ScheduledCommand(1, "list packages"), ScheduledCommand(2, "search")
+    with running(first):
+        handler.write("first output")
+    with running(second):
+        handler.write("second output")
+    handler.finish(first)
+
+    assert log.lines == ["second output"]
+    # The owner's page went to history
+    assert [text.plain.strip() for text in handler.history.get(0)] == ["first output"]
+    # The second command now owns the page and writes straight through
+    with running(second):
+        handler.write("more")
+    assert log.lines == ["second output", "more"]
+
+
+def test_output_of_finished_waiting_commands_gets_its_own_page(handler, log):
+    first = ScheduledCommand(1, "list packages")
+    second, third = ScheduledCommand(2, "search"), ScheduledCommand(3, "use")
+    with running(first):
+        handler.write("first")
+    with running(second):
+        handler.write("second")
+    with running(third):
+        handler.write("third")
+    handler.finish(second)
+    handler.finish(first)
+
+    # Second finished while waiting, so its page is archived and third shown
+    assert log.lines == ["third"]
+    assert [text.plain.strip() for text in handler.history.get(1)] == ["second"]
+
+
+def test_writes_outside_commands_go_straight_through(handler, log):
+    first = ScheduledCommand(1, "list packages")
+    with running(first):
+        handler.write("first")
+    handler.write("key binding")
+
+    assert log.lines == ["first", "key binding"]
+
+
+def test_finished_command_never_takes_the_page(handler, log):
+    connect = ScheduledCommand(1, "connect ckan")
+    with running(connect):
+        handler.write("Connected")
+    handler.finish(connect)
+
+    # A background worker started by connect logs after it finished
+    with running(connect):
+        handler.write("health check failed")
+        handler.continue_page()
+
+    later = ScheduledCommand(2, "list packages")
+    with running(later):
+        handler.write("Found 3 packages")
+    assert log.lines[-1] == "Found 3 packages"
+    handler.finish(later)
+
+    # Nothing is left waiting for a finish that never comes
+    another = ScheduledCommand(3, "list orgs")
+    with running(another):
+        handler.write("Found 2 organizations")
+    assert log.lines == ["Found 2 organizations"]
+
+
+def test_reset_releases_the_page(handler, log):
+    first, second = ScheduledCommand(1, "list packages"), ScheduledCommand(2, "search")
+    with running(first):
+        handler.write("first")
+    handler.reset()
+    with running(second):
+        handler.write("second")
+
+    assert log.lines == ["second"]
+    assert len(handler.history) == 0
+
+
+def test_listing_is_rendered_a_page_at_a_time(handler, log):
+    names = [f"dataset-{i}" for i in range(7)]
+    handler.write_paginated(names, page_size=3)
+
+    assert log.lines[0].splitlines() == ["1. Dataset 0", "2. Dataset 1", "3. Dataset 2"]
+    assert log.lines[-1].startswith("Showing 3 of 7")
+    assert handler.has_next_page
+
+    assert handler.write_next_page()
+    assert log.lines[-2].splitlines()[0] == "4. Dataset 3"
+    assert log.lines[-1].startswith("Showing 6 of 7")
+
+    # The last page has no prompt for more
+    assert handler.write_next_page()
+    assert log.lines[-1] == "7. Dataset 6"
+    assert not handler.has_next_page
+    assert not handler.write_next_page()
+
+
+def test_dictionary_header_is_only_on_the_first_page(handler, log):
+    handler.write_paginated({f"key-{i}": i for i in range(4)}, page_size=2)
+    handler.write_next_page()
+
+    pages = [line for line in log.lines if not line.startswith("Showing")]
+    assert pages[0].startswith("Dictionary containing 4 items:")
+    assert "Key 0" in pages[0] and "Key 1" in pages[0]
+    assert not pages[1].startswith("Dictionary")
+    assert "Key 3" in pages[1]
+
+
+def test_listing_of_a_waiting_command_is_held_back(handler, log):
+    first, second = ScheduledCommand(1, "list packages"), ScheduledCommand(2, "list")
+    with running(first):
+        handler.write("first")
+    with running(second):
+        handler.write_paginated(["a", "b", "c"], page_size=2)
+    assert log.lines == ["first"]
+
+    handler.finish(first)
+    assert log.lines[0].splitlines() == ["1. A", "2. B"]
+    assert handler.has_next_page
+
+
+def test_discarded_listing_has_no_next_page(handler, log):
+    handler.write_paginated(["a", "b", "c"], page_size=1)
+    handler.discard_listing()
+
+    assert not handler.write_next_page()
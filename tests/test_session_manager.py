@@ -0,0 +1,95 @@
+"""
+Tests for SessionManager connection switching and eviction.
+
+Usage:
+    pytest tests/test_session_manager.py
+"""
+
+import time
+
+from herding_cats_interactive.handlers.session_manager import (
+    CatalogConnection,
+    SessionManager,
+)
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    def close_session(self) -> None:
+        self.closed = True
+
+
+def connection(name: str) -> CatalogConnection:
+    return CatalogConnection(name, f"https://{name}.example", FakeSession(), None, None)
+
+
+def test_add_makes_connection_active():
+    sessions = SessionManager()
+    sessions.add(connection("ckan"))
+    sessions.add(connection("paris"))
+
+    assert sessions.active == "paris"
+    assert sessions.use("ckan") is sessions.current
+    assert sessions.active == "ckan"
+    assert sessions.use("missing") is None
+    assert sessions.active == "ckan"
+
+
+def test_most_recently_used_is_last():
+    sessions = SessionManager()
+    for name in ("a", "b", "c"):
+        sessions.add(connection(name))
+    sessions.use("a")
+
+    assert list(sessions.connections) == ["b", "c", "a"]
+
+
+def test_oldest_background_connections_are_evicted():
+    sessions = SessionManager(max_sessions=2)
+    first = connection("a")
+    sessions.add(first)
+    sessions.add(connection("b"))
+
+    assert sessions.add(connection("c")) == ["a"]
+    assert first.session.closed
+    assert list(sessions.connections) == ["b", "c"]
+
+
+def test_close_idle_keeps_the_active_connection():
+    sessions = SessionManager(idle_timeout=60)
+    sessions.add(connection("a"))
+    sessions.add(connection("b"))
+    for open_connection in sessions.connections.values():
+        open_connection.last_used = time.monotonic() - 120
+
+    assert sessions.close_idle() == ["a"]
+    assert "b" in sessions
+
+
+def test_closing_the_active_connection_clears_it():
+    sessions = SessionManager()
+    sessions.add(connection("a"))
+    closed = sessions.close("a")
+
+    assert closed.session.closed
+    assert sessions.current is None
+    assert sessions.close("a") is None
+
+
+def test_close_idle_skips_pinned_connections():
+    sessions = SessionManager(idle_timeout=60)
+    for name in ("a", "b", "c"):
+        sessions.add(connection(name))
+    for open_connection in sessions.connections.values():
+        open_connection.last_used = time.monotonic() - 120
+    # Two commands still running against "a"
+    sessions.pin("a")
+    sessions.pin("a")
+    sessions.unpin("a")
+
+    assert sessions.close_idle() == ["b"]
+    assert "a" in sessions
+    sessions.unpin("a")
+    assert sessions.close_idle() == ["a"]
@@ -0,0 +1,68 @@
+"""
+Tests for SQL table naming and querying loaded datasets with SqlEngine.
+
+Usage:
+    pytest tests/test_sql_engine.py
+"""
+
+import polars as pl
+import pytest
+
+from herding_cats_interactive.utils.sql_engine import SqlEngine, table_name
+
+
+@pytest.mark.parametrize(
+    "dataset_id, name",
+    [
+        ("london-crime", "london_crime"),
+        ("Air Quality 2023", "air_quality_2023"),
+        ("--trailing--", "trailing"),
+        ("2023-budget", "t_2023_budget"),
+        ("données-école", "données_école"),
+        ("---", "dataset"),
+    ],
+)
+def test_table_name(dataset_id, name):
+    assert table_name(dataset_id) == name
+
+
+@pytest.fixture
+def engine():
+    engine = SqlEngine()
+    yield engine
+    engine.close()
+
+
+def test_query_registered_frames(engine):
+    engine.register(
+        table_name("london-crime"),
+        pl.DataFrame({"borough": ["a", "b", "a"], "count": [1, 2, 3]}),
+    )
+
+    result = engine.query(
+        "SELECT borough, sum(count) AS total FROM london_crime "
+        "GROUP BY borough ORDER BY borough"
+    )
+    assert result.to_dict(as_series=False) == {"borough": ["a", "b"], "total": [4, 2]}
+
+
+def test_registering_again_replaces_the_table(engine):
+    engine.register("crime", pl.DataFrame({"id": [1, 2, 3]}))
+    engine.register("crime", pl.DataFrame({"id": [7]}))
+
+    assert engine.query("SELECT * FROM crime")["id"].to_list() == [7]
+    assert list(engine.tables) == ["crime"]
+
+
+def test_unknown_table_raises(engine):
+    with pytest.raises(Exception, match="missing"):
+        engine.query("SELECT * FROM missing")
+
+
+def test_close_drops_every_table(engine):
+    engine.register("crime", pl.DataFrame({"id": [1]}))
+    engine.close()
+
+    assert engine.tables == {}
+    with pytest.raises(Exception):
+        engine.query("SELECT * FROM crime")